@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.urls import reverse
+from PIL import Image, ImageOps
+from .storage import photo_storage
+import io
+import logging
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+SIZES = [64, 256, 1024]
+
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+derivative_pattern = re.compile(r'^(?P<original>.+)\.(?P<size>\d+)\.(?P<format>[a-z]+)$')
+
+def get_derivative_name(name, size, format):
+    """
+    Return the name of a derivative, stored next to its original: <original>.<size>.<format>.
+    """
+    return f'{name}.{size}.{format}'
+
+def get_derivative_names(name):
+    return [get_derivative_name(name, size, format) for size in SIZES for format in FORMATS]
+
+def parse_derivative_name(name):
+    """
+    Return (original, size, format) for a derivative name, or None for anything else.
+    """
+    match = derivative_pattern.match(name)
+
+    if match is None or int(match['size']) not in SIZES or match['format'] not in FORMATS:
+        return None
+
+    return match['original'], int(match['size']), match['format']
+
+def get_photo_url(name):
+    """
+    Return the URL of a stored photo, or of one of its derivatives, or None when there is no photo.
+    """
+    if not name:
+        return None
+
+    return reverse('get_candidate_photo', args=[name])
+
+def get_photo_variants(name):
+    """
+    Return {size: {format: url}} for a stored photo, or None when there is no photo.
+
+    The URLs point at the photo view, which generates a missing derivative on its first request.
+    """
+    if not name:
+        return None
+
+    return {str(size): {format: get_photo_url(get_derivative_name(name, size, format)) for format in FORMATS} for size in SIZES}
+
+class PhotoDerivatives:
+    """
+    Thumbnail pipeline for candidate photos: every size in SIZES, in every format in FORMATS, rendered with Pillow.
+
+    Uploads are processed on a background thread once their transaction commits; derivatives that are still missing when requested are
+    rendered synchronously by the view.
+    """
+    def __init__(self, storage, max_workers=2):
+        self.storage = storage
+        self.max_workers = max_workers
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='photo-derivatives')
+
+            return self.executor
+
+    def generate_on_commit(self, name):
+        transaction.on_commit(lambda: self.get_executor().submit(self.generate, name))
+
+    def generate(self, name, variants=None):
+        """
+        Render the missing derivatives of a photo, all of them by default; returns the names written.
+        """
+        variants = variants or [(size, format) for size in SIZES for format in FORMATS]
+        missing = [(size, format) for size, format in variants if not self.storage.exists(get_derivative_name(name, size, format))]
+
+        if not missing:
+            return []
+
+        written = []
+
+        try:
+            with self.storage.open(name) as file:
+                image = Image.open(file)
+                # JPEG can decode straight at a reduced scale, which is most of the cost for large photos
+                image.draft('RGB', (max(size for size, format in missing),) * 2)
+                image = ImageOps.exif_transpose(image)
+                image.load()
+
+            for size in sorted({size for size, format in missing}, reverse=True):
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+                for format in [format for variant_size, format in missing if variant_size == size]:
+                    written.append(self.save(name, resized, size, format))
+        except Exception:
+            logger.exception('Could not generate the derivatives of %s', name)
+            raise
+
+        return written
+
+    def save(self, name, image, size, format):
+        pillow_format, content_type, options = FORMATS[format]
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+        if pillow_format == 'JPEG' or not has_alpha:
+            image = image.convert('RGB')
+        else:
+            image = image.convert('RGBA')
+
+        buffer = io.BytesIO()
+        # No exif argument, so metadata (including GPS tags) is not copied into the derivative
+        image.save(buffer, pillow_format, **options)
+
+        return self.storage.save_as(get_derivative_name(name, size, format), ContentFile(buffer.getvalue()))
+
+    def ensure(self, name, size, format):
+        """
+        Return the name of a derivative, rendering it now if the background job has not produced it yet.
+        """
+        derivative = get_derivative_name(name, size, format)
+
+        if not self.storage.exists(derivative):
+            self.generate(name, [(size, format)])
+
+        return derivative
+
+photo_derivatives = PhotoDerivatives(photo_storage)
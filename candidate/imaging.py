@@ -0,0 +1,46 @@
+"""
+Image processing run inside the photo process pool; kept free of Django imports so spawned workers start fast.
+"""
+from PIL import Image, ImageOps
+import io
+
+class PhotoRejected(ValueError):
+    pass
+
+def process_photo(path, max_dimension, max_pixels, quality=85):
+    """
+    Decode the image at `path`, apply its EXIF orientation, downscale it to fit `max_dimension` and re-encode it without metadata.
+
+    Returns (content, extension): JPEG for opaque images, PNG when there is transparency to keep. Raises PhotoRejected for anything that
+    is not a decodable image or has more than `max_pixels` pixels, which is checked from the header before decoding.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+
+            if width * height > max_pixels:
+                raise Image.DecompressionBombError(width * height)
+
+            # JPEG can decode straight at a reduced scale, which is most of the cost for phone pictures
+            image.draft('RGB', (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(image)
+    except Image.DecompressionBombError:
+        raise PhotoRejected(f'The image cannot have more than {max_pixels} pixels.')
+    except (Image.UnidentifiedImageError, OSError):
+        raise PhotoRejected('The file is not a valid image.')
+
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    buffer = io.BytesIO()
+
+    # No exif argument: EXIF (camera, GPS...) and other metadata are not written back
+    if has_alpha:
+        image.convert('RGBA').save(buffer, 'PNG', optimize=True)
+        extension = '.png'
+    else:
+        image.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+        extension = '.jpg'
+
+    return buffer.getvalue(), extension
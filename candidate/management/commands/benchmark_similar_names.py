@@ -0,0 +1,133 @@
+from candidate.models import Candidate, Gender
+from candidate.signals import candidates_created
+from candidate.similarity import find_similar
+from candidate.views import SimilarCandidateNames
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from employee.models import Employee
+from rest_framework.test import APIRequestFactory, force_authenticate
+from utils.cache import response_cache
+import datetime
+import random
+import statistics
+import time
+
+# Frequent Brazilian names, most common first; picked with a Zipf-like weight so the trigram frequencies look like real data
+FIRST_NAMES = [
+    'Maria', 'José', 'Ana', 'João', 'Antônio', 'Francisco', 'Carlos', 'Paulo', 'Pedro', 'Lucas', 'Luiz', 'Marcos', 'Luís', 'Gabriel',
+    'Rafael', 'Francisca', 'Daniel', 'Marcelo', 'Bruno', 'Eduardo', 'Felipe', 'Raimundo', 'Rodrigo', 'Manoel', 'Mateus', 'André', 'Fernando',
+    'Fábio', 'Leonardo', 'Gustavo', 'Guilherme', 'Leandro', 'Tiago', 'Anderson', 'Ricardo', 'Márcio', 'Jorge', 'Sebastião', 'Alexandre',
+    'Roberto', 'Adriana', 'Juliana', 'Márcia', 'Fernanda', 'Patrícia', 'Aline', 'Sandra', 'Camila', 'Amanda', 'Bruna', 'Jéssica', 'Letícia',
+    'Júlia', 'Luciana', 'Vanessa', 'Mariana', 'Gabriela', 'Vera', 'Vitória', 'Larissa', 'Cláudia', 'Beatriz', 'Rita', 'Luana', 'Sônia',
+    'Renata', 'Eliane', 'Josefa', 'Simone', 'Natália', 'Cristiane', 'Carla', 'Débora', 'Rosângela', 'Jaqueline', 'Rosa', 'Daniela',
+    'Aparecida', 'Marlene', 'Terezinha', 'Raimunda', 'Andreia', 'Fabiana', 'Lúcia', 'Raquel', 'Ângela', 'Rafaela', 'Joana', 'Luzia',
+    'Elaine', 'Daiane', 'Regina', 'Valéria', 'Heloísa', 'Thaís', 'Otávio', 'Caio', 'Vinícius', 'Samuel', 'Murilo',
+]
+LAST_NAMES = [
+    'Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins',
+    'Carvalho', 'Almeida', 'Lopes', 'Soares', 'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes',
+    'Marques', 'Machado', 'Mendes', 'Freitas', 'Cardoso', 'Ramos', 'Gonçalves', 'Santana', 'Teixeira', 'Araújo', 'Pinto', 'Correia',
+    'Castro', 'Monteiro', 'Moura', 'Campos', 'Cavalcanti', 'Batista', 'Reis', 'Nogueira', 'Medeiros', 'Brito', 'Pires', 'Cunha', 'Bezerra',
+    'Fonseca', 'Tavares', 'Macedo', 'Azevedo', 'Cruz', 'Farias', 'Xavier', 'Sampaio', 'Guimarães', 'Queiroz', 'Peixoto', 'Coelho',
+    'Figueiredo', 'Miranda', 'Vasconcelos', 'Siqueira', 'Borges', 'Magalhães', 'Rezende', 'Bittencourt', 'Pacheco', 'Lacerda', 'Quintela',
+    'Wanderley', 'Zanetti', 'Yamamoto', 'Kowalski', 'Schneider', 'Oberdan',
+]
+# Exact names, common and rare ones, and typos of them
+QUERIES = [
+    'Maria Silva', 'Mraia Slva', 'Joao Santos', 'Jose Olivera', 'Gabriella Ferreira', 'Guilerme Carvalo', 'Vinicius Cavalcante',
+    'Heloisa Bittencour', 'Otavio Quintella', 'Yamamotto', 'Kowalsky', 'Wanderlei Zaneti', 'Ana', 'Luis Souza', 'Thais Magalhaes',
+    'Rafaela Vasconcelos Siqueira', 'Murilo Pacheco', 'Sebastiao Nogueira Medeiros', 'Schnieder', 'Oberdan Lacerda',
+]
+
+def percentile(values, fraction):
+    values = sorted(values)
+
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+class Command(BaseCommand):
+    help = 'Time the similar name search (find_similar and the endpoint) on the current database, optionally seeding synthetic candidates.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help='Insert this many synthetic candidates first; only allowed on an empty candidates table.')
+        parser.add_argument('--repeat', type=int, default=7, help='Number of timed runs per query.')
+        parser.add_argument('--query', action='append', dest='queries', help='Name to search for; may be repeated. Defaults to a built-in list.')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        if not Candidate.objects.exists():
+            raise CommandError('There are no candidates to search; use --seed on an empty database.')
+
+        view = SimilarCandidateNames.as_view()
+        factory = APIRequestFactory()
+        # Never saved, only used to pass the permission check
+        user = Employee(username='benchmark')
+        core, endpoint = [], []
+
+        def call_view(query):
+            # Invalidated instead of cleared, so entries of a shared cache are left alone
+            response_cache.bump('candidate')
+            request = factory.get('/api/candidates/similar-name/', {'q': query, 'page_size': 20})
+            force_authenticate(request, user=user)
+
+            return view(request)
+
+        for query in options['queries'] or QUERIES:
+            core_ms, matches = self.time(lambda: find_similar(query), options['repeat'])
+            endpoint_ms, result = self.time(lambda: call_view(query), options['repeat'])
+            core.append(core_ms)
+            endpoint.append(endpoint_ms)
+            top = result.data['data']['candidates'][:1]
+            best = f"{top[0]['first_name']} {top[0]['last_name']} ({top[0]['score']})" if top else '-'
+
+            self.stdout.write(f'{query:30} find_similar {core_ms:6.1f} ms  endpoint {endpoint_ms:6.1f} ms  {len(matches):5} matches  best {best}')
+
+        for label, values in (('find_similar', core), ('endpoint', endpoint)):
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: p50 {percentile(values, 0.5):.1f} ms, p95 {percentile(values, 0.95):.1f} ms, max {max(values):.1f} ms'
+            ))
+
+    def time(self, function, repeat):
+        # The first run warms the page cache and is not counted
+        result = function()
+        timings = []
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return statistics.median(timings), result
+
+    def seed(self, total):
+        if Candidate.objects.exists():
+            raise CommandError('--seed only runs on an empty candidates table.')
+
+        rng = random.Random(25)
+        first_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(FIRST_NAMES))]
+        last_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(LAST_NAMES))]
+        gender = Gender.objects.get_or_create(name='Não informado')[0]
+        start = time.perf_counter()
+
+        for offset in range(0, total, 10_000):
+            candidates = []
+
+            for index in range(offset, min(offset + 10_000, total)):
+                first_name = rng.choices(FIRST_NAMES, first_weights)[0]
+
+                if rng.random() < 0.3:
+                    first_name += ' ' + rng.choices(FIRST_NAMES, first_weights)[0]
+
+                last_name = ' '.join(rng.choices(LAST_NAMES, last_weights, k=rng.choice([1, 2, 2])))
+                # Unique but not valid CPFs; bulk_create skips the field validators
+                candidates.append(Candidate(first_name=first_name, last_name=last_name, date_of_birth=datetime.date(1990, 1, 1), gender=gender, cpf=f'{index:011d}'))
+
+            with transaction.atomic():
+                Candidate.objects.bulk_create(candidates)
+                candidates_created(candidates)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.stdout.write(f'{total} candidates inserted and indexed in {time.perf_counter() - start:.0f} s.')
@@ -0,0 +1,99 @@
+from candidate.derivatives import parse_derivative_name
+from candidate.models import Candidate
+from candidate.utils import PHOTOS_DIRECTORY
+from django.core.management.base import BaseCommand, CommandError
+from itertools import islice
+import os
+import time
+
+def iter_files(root):
+    """
+    Yield (path, stat) for every file below root, one directory listing at a time.
+    """
+    directories = [root]
+
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+class Command(BaseCommand):
+    help = 'Delete or quarantine candidate photos that no candidate references anymore.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the orphaned files without touching them.')
+        parser.add_argument('--grace-hours', type=float, default=24, help='Only collect files older than this, so uploads whose row is not committed yet are kept.')
+        parser.add_argument('--quarantine', help='Move orphaned files to this directory instead of deleting them.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of files checked against the database per query.')
+
+    def handle(self, *args, **options):
+        storage = Candidate._meta.get_field('photo').storage
+
+        try:
+            media_root = storage.path('')
+        except NotImplementedError:
+            raise CommandError('The photo storage has no local filesystem path.')
+
+        root = os.path.join(media_root, PHOTOS_DIRECTORY)
+        quarantine = os.path.abspath(options['quarantine']) if options['quarantine'] else None
+
+        if quarantine and os.path.commonpath([quarantine, root]) == root:
+            raise CommandError('The quarantine directory cannot be inside the photos directory.')
+
+        if not os.path.isdir(root):
+            self.stdout.write('No photos directory, nothing to collect.')
+            return
+
+        cutoff = time.time() - options['grace_hours'] * 3600
+        files = iter_files(root)
+        scanned = referenced = recent = collected = reclaimed = failed = 0
+
+        while True:
+            chunk = {
+                os.path.relpath(path, media_root).replace(os.sep, '/'): (path, stat)
+                for path, stat in islice(files, options['chunk_size'])
+            }
+
+            if not chunk:
+                break
+
+            # A derivative lives as long as the photo it was rendered from
+            originals = {name: (parse_derivative_name(name) or (name,))[0] for name in chunk}
+            scanned += len(chunk)
+            in_use = set(Candidate.objects.filter(photo__in=set(originals.values())).values_list('photo', flat=True))
+
+            for name, (path, stat) in chunk.items():
+                if originals[name] in in_use:
+                    referenced += 1
+                    continue
+
+                if stat.st_mtime > cutoff:
+                    recent += 1
+                    continue
+
+                if not options['dry_run']:
+                    try:
+                        if quarantine:
+                            target = os.path.join(quarantine, name)
+                            os.makedirs(os.path.dirname(target), exist_ok=True)
+                            os.replace(path, target)
+                        else:
+                            os.remove(path)
+                    except OSError as e:
+                        failed += 1
+                        self.stderr.write(f'Could not collect {name}: {e}')
+                        continue
+
+                collected += 1
+                reclaimed += stat.st_size
+
+        action = 'would be collected' if options['dry_run'] else ('quarantined' if quarantine else 'deleted')
+
+        self.stdout.write(f'{scanned} files scanned, {referenced} referenced, {recent} orphaned but inside the grace period.')
+        self.stdout.write(self.style.SUCCESS(f'{collected} orphaned files {action}, {reclaimed} bytes reclaimed.'))
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} files could not be collected.'))
@@ -0,0 +1,16 @@
+from candidate.similarity import rebuild_index
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+class Command(BaseCommand):
+    help = 'Rebuild the trigram index of the candidate names from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of candidates indexed per batch.')
+
+    def handle(self, *args, **options):
+        # Searches keep seeing the old index until the new one is committed
+        with transaction.atomic():
+            indexed = rebuild_index(options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(f'{indexed} candidates indexed.'))
@@ -0,0 +1,71 @@
+from candidate.derivatives import get_derivative_names, photo_derivatives
+from candidate.models import Candidate
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from utils.cache import response_cache
+
+def delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+class Command(BaseCommand):
+    help = 'Move candidate photos saved under the old file name scheme to their content-addressed location.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be moved without touching anything.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of distinct photo names read per query.')
+
+    def handle(self, *args, **options):
+        storage = Candidate._meta.get_field('photo').storage
+        photos = Candidate.objects.exclude(photo__isnull=True).exclude(photo='').order_by('photo').values_list('photo', flat=True).distinct()
+        checked = moved = merged = missing = 0
+        last_name = None
+
+        while True:
+            # Keyset over the indexed photo column; relocated names sorting after the cursor come back once and are skipped
+            chunk = photos if last_name is None else photos.filter(photo__gt=last_name)
+            names = list(chunk[:options['chunk_size']])
+
+            if not names:
+                break
+
+            last_name = names[-1]
+
+            for name in names:
+                checked += 1
+
+                if storage.is_content_addressed(name):
+                    continue
+
+                if not storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f'Missing file: {name}')
+                    continue
+
+                if options['dry_run']:
+                    moved += 1
+                    continue
+
+                with storage.open(name) as content:
+                    existed = storage.exists(storage.get_content_name(name, content))
+                    new_name = storage.save(name, content)
+
+                with transaction.atomic():
+                    # update() skips auto_now, and the conditional GET versions read updated_at
+                    Candidate.objects.filter(photo=name).update(photo=new_name, updated_at=timezone.now())
+                    transaction.on_commit(lambda name=name: delete_files(storage, [name, *get_derivative_names(name)]))
+
+                photo_derivatives.generate_on_commit(new_name)
+
+                moved += 1
+                merged += existed
+
+        if moved and not options['dry_run']:
+            # The photo variant URLs embed the photo name
+            response_cache.bump('candidate')
+
+        action = 'would be moved' if options['dry_run'] else 'moved'
+
+        self.stdout.write(f'{checked} photos checked, {missing} missing.')
+        self.stdout.write(self.style.SUCCESS(f'{moved} photos {action}, {merged} of them deduplicated into an existing file.'))
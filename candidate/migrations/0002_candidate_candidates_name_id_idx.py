@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['first_name', 'last_name', 'id'], name='candidates_name_id_idx'),
+        ),
+    ]
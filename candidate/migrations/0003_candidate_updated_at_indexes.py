@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0002_candidate_candidates_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['updated_at'], name='candidates_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['updated_at'], name='contacts_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['updated_at'], name='addresses_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialmedia',
+            index=models.Index(fields=['updated_at'], name='social_media_updated_at_idx'),
+        ),
+    ]
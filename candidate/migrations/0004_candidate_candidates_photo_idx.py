@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0003_candidate_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['photo'], name='candidates_photo_idx'),
+        ),
+    ]
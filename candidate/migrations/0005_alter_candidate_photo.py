@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:05
+
+import candidate.storage
+import candidate.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0004_candidate_candidates_photo_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=candidate.storage.get_photo_storage, upload_to=candidate.utils.generate_file_path, verbose_name='Foto'),
+        ),
+    ]
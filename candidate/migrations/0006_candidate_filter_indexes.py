@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0005_alter_candidate_photo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['city', 'candidate'], name='addresses_city_candidate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['date_of_birth'], name='candidates_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['gender', 'first_name', 'last_name', 'id'], name='candidates_gender_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['has_disability', 'first_name', 'last_name', 'id'], name='candidates_disability_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['has_drivers_license', 'first_name', 'last_name', 'id'], name='candidates_license_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['drivers_license_category', 'first_name', 'last_name', 'id'], name='candidates_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['is_first_job', 'first_name', 'last_name', 'id'], name='candidates_first_job_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['is_currently_employed', 'first_name', 'last_name', 'id'], name='candidates_employed_name_idx'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import utils.fields
+import utils.text
+
+NORMALIZED_FIELDS = {
+    'Candidate': ['normalized_first_name', 'normalized_last_name'],
+    'Contact': ['normalized_phone_number', 'normalized_email'],
+    'Gender': ['normalized_name'],
+    'DriversLicenseCategory': ['normalized_name'],
+    'State': ['normalized_name'],
+    'City': ['normalized_name'],
+}
+
+
+def normalize_fields(apps, schema_editor):
+    """
+    Fill the normalized shadow columns of existing rows, which new saves keep up to date.
+    """
+    for model_name, names in NORMALIZED_FIELDS.items():
+        model = apps.get_model('candidate', model_name)
+        fields = [model._meta.get_field(name) for name in names]
+        rows = model.objects.only('pk', *(field.source for field in fields)).order_by()
+        batch = []
+
+        for instance in rows.iterator(chunk_size=1000):
+            for field in fields:
+                setattr(instance, field.attname, field.normalizer(getattr(instance, field.source)))
+
+            batch.append(instance)
+
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, names)
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, names)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0006_candidate_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='normalized_first_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='first_name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='candidate',
+            name='normalized_last_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='last_name', verbose_name='Sobrenome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='normalized_phone_number',
+            field=utils.fields.NormalizedCharField(max_length=11, normalizer=utils.text.normalize_digits, source='phone_number', verbose_name='Número de telefone normalizado'),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='normalized_email',
+            field=utils.fields.NormalizedCharField(max_length=254, source='email', verbose_name='E-mail normalizado'),
+        ),
+        migrations.AddField(
+            model_name='gender',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='driverslicensecategory',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='state',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='city',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.RunPython(normalize_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['normalized_first_name'], name='candidates_norm_first_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candidate',
+            index=models.Index(fields=['normalized_last_name'], name='candidates_norm_last_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['normalized_phone_number'], name='contacts_norm_phone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['normalized_email'], name='contacts_norm_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='gender',
+            index=models.Index(fields=['normalized_name'], name='genders_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driverslicensecategory',
+            index=models.Index(fields=['normalized_name'], name='license_categories_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='state',
+            index=models.Index(fields=['normalized_name'], name='states_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=models.Index(fields=['normalized_name'], name='cities_norm_name_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0007_normalized_fields'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE candidate_trigram_sets (
+                    candidate_key INTEGER PRIMARY KEY,
+                    candidate_id CHAR(32) NOT NULL,
+                    size INTEGER NOT NULL,
+                    trigrams TEXT NOT NULL
+                )
+            """,
+            reverse_sql='DROP TABLE candidate_trigram_sets',
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE candidate_trigrams (
+                    trigram TEXT NOT NULL,
+                    candidate_key INTEGER NOT NULL,
+                    PRIMARY KEY (trigram, candidate_key)
+                ) WITHOUT ROWID
+            """,
+            reverse_sql='DROP TABLE candidate_trigrams',
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE candidate_trigram_frequencies (
+                    trigram TEXT NOT NULL PRIMARY KEY,
+                    frequency INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """,
+            reverse_sql='DROP TABLE candidate_trigram_frequencies',
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.4 on 2026-10-18 20:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+from utils.text import get_word_starts
+
+# Search path: shadow column holding its normalized value, as read from the candidate
+TOKEN_FIELDS = {
+    'first_name': 'normalized_first_name',
+    'last_name': 'normalized_last_name',
+    'contacts__email': 'contacts__normalized_email',
+    'contacts__phone_number': 'contacts__normalized_phone_number',
+}
+
+
+def build_search_tokens(apps, schema_editor):
+    """
+    Fill the search tokens of the existing candidates, which new writes keep up to date.
+    """
+    Candidate = apps.get_model('candidate', 'Candidate')
+    CandidateSearchToken = apps.get_model('candidate', 'CandidateSearchToken')
+    rows = Candidate.objects.order_by().values_list('pk', *TOKEN_FIELDS.values())
+    tokens = set()
+
+    for candidate_id, *values in rows.iterator(chunk_size=1000):
+        for path, value in zip(TOKEN_FIELDS, values):
+            for token in get_word_starts(value or ''):
+                tokens.add((candidate_id, path, token))
+
+        if len(tokens) >= 1000:
+            CandidateSearchToken.objects.bulk_create([CandidateSearchToken(candidate_id=candidate_id, field=path, token=token) for candidate_id, path, token in tokens])
+            tokens = set()
+
+    if tokens:
+        CandidateSearchToken.objects.bulk_create([CandidateSearchToken(candidate_id=candidate_id, field=path, token=token) for candidate_id, path, token in tokens])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0008_candidate_trigrams'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateSearchToken',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=255, verbose_name='Campo')),
+                ('token', models.CharField(max_length=255, verbose_name='Termo')),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='candidate.candidate', verbose_name='Candidato')),
+            ],
+            options={
+                'verbose_name': 'Termo de Busca do Candidato',
+                'verbose_name_plural': 'Termos de Busca dos Candidatos',
+                'db_table': 'candidate_search_tokens',
+                'indexes': [models.Index(fields=['token', 'field', 'candidate'], name='candidate_tokens_token_idx')],
+            },
+        ),
+        migrations.RunPython(build_search_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:35
+
+from django.db import migrations
+from candidate.similarity import rebuild_index
+
+
+def build_candidate_trigrams(apps, schema_editor):
+    """
+    Index the names of the existing candidates, which 0008 left out of the new trigram tables; new writes keep them up to date.
+    """
+    rebuild_index(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('candidate', '0009_candidatesearchtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_candidate_trigrams, migrations.RunPython.noop),
+    ]
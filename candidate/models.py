@@ -1,9 +1,13 @@
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-import os
+from utils.fields import NormalizedCharField
+from utils.files import file_cleaner
+from utils.text import normalize_digits
 import uuid
-from .utils import generate_file_path
+from .derivatives import get_derivative_names, photo_derivatives
+from .storage import get_photo_storage
+from .utils import generate_file_path, get_file_name
 from .validators import *
 
 # Create your models here.
@@ -12,6 +16,9 @@ class Gender(models.Model):
         db_table = 'genders'
         verbose_name = 'Gênero'
         verbose_name_plural = 'Gêneros'
+        indexes = [
+            models.Index(fields=['normalized_name'], name='genders_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -24,6 +31,10 @@ class Gender(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -41,6 +52,9 @@ class DriversLicenseCategory(models.Model):
         db_table = 'drivers_license_categories'
         verbose_name = 'Categoria da CNH'
         verbose_name_plural = 'Categorias da CNH'
+        indexes = [
+            models.Index(fields=['normalized_name'], name='license_categories_norm_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -53,6 +67,10 @@ class DriversLicenseCategory(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -71,6 +89,20 @@ class Candidate(models.Model):
         verbose_name = 'Candidato'
         verbose_name_plural = 'Candidatos'
         ordering = ['first_name', 'last_name']
+        indexes = [
+            models.Index(fields=['first_name', 'last_name', 'id'], name='candidates_name_id_idx'),
+            models.Index(fields=['updated_at'], name='candidates_updated_at_idx'),
+            models.Index(fields=['photo'], name='candidates_photo_idx'),
+            models.Index(fields=['date_of_birth'], name='candidates_dob_idx'),
+            models.Index(fields=['gender', 'first_name', 'last_name', 'id'], name='candidates_gender_name_idx'),
+            models.Index(fields=['has_disability', 'first_name', 'last_name', 'id'], name='candidates_disability_name_idx'),
+            models.Index(fields=['has_drivers_license', 'first_name', 'last_name', 'id'], name='candidates_license_name_idx'),
+            models.Index(fields=['drivers_license_category', 'first_name', 'last_name', 'id'], name='candidates_category_name_idx'),
+            models.Index(fields=['is_first_job', 'first_name', 'last_name', 'id'], name='candidates_first_job_name_idx'),
+            models.Index(fields=['is_currently_employed', 'first_name', 'last_name', 'id'], name='candidates_employed_name_idx'),
+            models.Index(fields=['normalized_first_name'], name='candidates_norm_first_name_idx'),
+            models.Index(fields=['normalized_last_name'], name='candidates_norm_last_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -88,6 +120,14 @@ class Candidate(models.Model):
         validators=[lambda value: validate_name(value, _('Last name'))],
         verbose_name='Sobrenome'
     )
+    normalized_first_name = NormalizedCharField(
+        source='first_name',
+        verbose_name='Nome normalizado'
+    )
+    normalized_last_name = NormalizedCharField(
+        source='last_name',
+        verbose_name='Sobrenome normalizado'
+    )
     date_of_birth = models.DateField(
         validators=[validate_date_of_birth],
         verbose_name='Data de nascimento'
@@ -141,6 +181,7 @@ class Candidate(models.Model):
     )
     photo = models.ImageField(
         upload_to=generate_file_path,
+        storage=get_photo_storage,
         null=True,
         blank=True,
         verbose_name='Foto'
@@ -171,29 +212,53 @@ class Candidate(models.Model):
             print(errors)
             raise ValidationError(errors)
 
-    def save(self, *args, **kwargs):
-        if self.pk:
-            try:
-                old_instance = Candidate.objects.get(pk=self.pk)
+    loaded_photo = models.DEFERRED
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Candidate, cls).from_db(db, field_names, values)
+
+        if 'photo' in instance.__dict__:
+            instance.loaded_photo = get_file_name(instance.__dict__['photo'])
+
+        return instance
+
+    def get_loaded_photo(self):
+        """
+        Return the photo name stored in the row being saved, reading it from the database only if the instance was loaded without it.
+        """
+        if self._state.adding or 'photo' not in self.__dict__:
+            return None
 
-                if old_instance.photo != self.photo:
-                    if old_instance.photo and os.path.isfile(old_instance.photo.path):
-                        os.remove(old_instance.photo.path)
-            except Candidate.DoesNotExist:
-                old_instance = None
+        if self.loaded_photo is models.DEFERRED:
+            return get_file_name(Candidate.objects.filter(pk=self.pk).values_list('photo', flat=True).first())
+
+        return self.loaded_photo
+
+    def save(self, *args, **kwargs):
+        loaded_photo = self.get_loaded_photo()
 
         self.full_clean()
         super(Candidate, self).save(*args, **kwargs)
 
+        photo = get_file_name(self.__dict__.get('photo'))
+
+        if loaded_photo and loaded_photo != photo:
+            file_cleaner.delete_on_commit(Candidate, 'photo', loaded_photo, companions=get_derivative_names(loaded_photo))
+
+        if photo and photo != loaded_photo:
+            photo_derivatives.generate_on_commit(photo)
+
+        self.loaded_photo = photo
+
     def delete(self, *args, **kwargs):
-        if self.photo:
-            if os.path.exists(self.photo.path):
-                try:
-                    os.remove(self.photo.path)
-                except Exception as e:
-                    print(f'Error deleting photo: {e}')
+        photo = get_file_name(self.photo)
+        result = super(Candidate, self).delete(*args, **kwargs)
+
+        if photo:
+            file_cleaner.delete_on_commit(Candidate, 'photo', photo, companions=get_derivative_names(photo))
 
-        super(Candidate, self).delete(*args, **kwargs)
+        return result
 
     def __str__(self):
         return self.get_full_name()
@@ -203,6 +268,11 @@ class Contact(models.Model):
         db_table = 'contacts'
         verbose_name = 'Informação de Contato'
         verbose_name_plural = 'Informações de Contato'
+        indexes = [
+            models.Index(fields=['updated_at'], name='contacts_updated_at_idx'),
+            models.Index(fields=['normalized_phone_number'], name='contacts_norm_phone_idx'),
+            models.Index(fields=['normalized_email'], name='contacts_norm_email_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -219,6 +289,17 @@ class Contact(models.Model):
         blank=True,
         verbose_name='E-mail'
     )
+    normalized_phone_number = NormalizedCharField(
+        source='phone_number',
+        normalizer=normalize_digits,
+        max_length=11,
+        verbose_name='Número de telefone normalizado'
+    )
+    normalized_email = NormalizedCharField(
+        source='email',
+        max_length=254,
+        verbose_name='E-mail normalizado'
+    )
     candidate = models.ForeignKey(
         Candidate,
         on_delete=models.CASCADE,
@@ -242,6 +323,9 @@ class State(models.Model):
         db_table = 'states'
         verbose_name = 'Estado'
         verbose_name_plural = 'Estados'
+        indexes = [
+            models.Index(fields=['normalized_name'], name='states_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -254,6 +338,10 @@ class State(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     abbreviation = models.CharField(
         max_length=2,
         unique=True,
@@ -276,6 +364,9 @@ class City(models.Model):
         db_table = 'cities'
         verbose_name = 'Cidade'
         verbose_name_plural = 'Cidades'
+        indexes = [
+            models.Index(fields=['normalized_name'], name='cities_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -287,6 +378,10 @@ class City(models.Model):
         max_length=255,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     state = models.ForeignKey(
         State,
         on_delete=models.PROTECT,
@@ -309,6 +404,10 @@ class Address(models.Model):
         db_table = 'addresses'
         verbose_name = 'Endereço'
         verbose_name_plural = 'Endereços'
+        indexes = [
+            models.Index(fields=['updated_at'], name='addresses_updated_at_idx'),
+            models.Index(fields=['city', 'candidate'], name='addresses_city_candidate_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -366,6 +465,9 @@ class SocialMedia(models.Model):
         db_table = 'social_media'
         verbose_name = 'Rede Social'
         verbose_name_plural = 'Redes Sociais'
+        indexes = [
+            models.Index(fields=['updated_at'], name='social_media_updated_at_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -397,3 +499,36 @@ class SocialMedia(models.Model):
 
     def __str__(self):
         return self.candidate.get_full_name()
+
+class CandidateSearchToken(models.Model):
+    class Meta:
+        db_table = 'candidate_search_tokens'
+        verbose_name = 'Termo de Busca do Candidato'
+        verbose_name_plural = 'Termos de Busca dos Candidatos'
+        indexes = [
+            models.Index(fields=['token', 'field', 'candidate'], name='candidate_tokens_token_idx'),
+        ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        verbose_name='ID'
+    )
+    candidate = models.ForeignKey(
+        Candidate,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name='Candidato'
+    )
+    field = models.CharField(
+        max_length=255,
+        verbose_name='Campo'
+    )
+    token = models.CharField(
+        max_length=255,
+        verbose_name='Termo'
+    )
+
+    def __str__(self):
+        return self.token
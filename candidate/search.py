@@ -0,0 +1,71 @@
+from contextlib import contextmanager
+from utils.helpers import QuerysetHelper
+from utils.text import get_word_starts
+from .models import Candidate, CandidateSearchToken
+import threading
+
+# Matched as accent- and case-insensitive prefixes of any word, through the search tokens
+search_fields = ['first_name', 'last_name', 'contacts__email', 'contacts__phone_number']
+
+_state = threading.local()
+
+def build_tokens(ids):
+    """
+    Return the search tokens of the given candidates: every word start of the normalized value of each search field.
+    """
+    # Grouped by relation, so the candidate columns and each related collection are read with one query
+    lookups = {}
+
+    for path in search_fields:
+        *relations, name = path.split('__')
+        shadow = QuerysetHelper.get_normalized_field(Candidate, path)
+        lookups.setdefault(tuple(relations), {})[path] = '__'.join([*relations, shadow.name])
+
+    tokens = set()
+
+    for paths in lookups.values():
+        for candidate_id, *values in Candidate.objects.filter(pk__in=ids).values_list('pk', *paths.values()):
+            for path, value in zip(paths, values):
+                for token in get_word_starts(value or ''):
+                    tokens.add((candidate_id, path, token))
+
+    return [CandidateSearchToken(candidate_id=candidate_id, field=path, token=token) for candidate_id, path, token in tokens]
+
+def refresh_tokens(ids):
+    ids = list(ids)
+
+    if ids:
+        CandidateSearchToken.objects.filter(candidate_id__in=ids).delete()
+        CandidateSearchToken.objects.bulk_create(build_tokens(ids))
+
+def mark_tokens_stale(ids):
+    """
+    Refresh the search tokens of the given candidates, or collect them when inside defer_token_refresh().
+    """
+    pending = getattr(_state, 'pending', None)
+
+    if pending is None:
+        refresh_tokens(ids)
+    else:
+        pending.update(ids)
+
+@contextmanager
+def defer_token_refresh():
+    """
+    Refresh the tokens of every candidate touched inside the block once, when the block exits.
+
+    Nested writes (a candidate plus its contacts) would otherwise rebuild the same tokens once per signal.
+    """
+    if getattr(_state, 'pending', None) is not None:
+        yield
+        return
+
+    _state.pending = set()
+
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+
+    refresh_tokens(pending)
@@ -1,7 +1,32 @@
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Prefetch, Q
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.validators import UniqueValidator
+from utils.helpers import BulkHelper
+from utils.mixins import DynamicFieldsMixin
+from utils.serializers import ValuesSerializer
+from .derivatives import get_photo_url, get_photo_variants
 from .models import *
+from .search import defer_token_refresh
+from .signals import candidates_created
+from .utils import get_file_name
+
+class GenderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Gender
+        fields = ['id', 'name']
+
+class DriversLicenseCategorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DriversLicenseCategory
+        fields = ['id', 'name']
+
+class CandidateSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Candidate
+        fields = ['id', 'first_name', 'last_name']
 
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
@@ -27,14 +52,49 @@ class SocialMediaSerializer(serializers.ModelSerializer):
             'id': {'read_only': False, 'required': False}
         }
 
-class CandidateSerializer(serializers.ModelSerializer):
+class ContactValuesSerializer(ValuesSerializer):
+    model = Contact
+    fields = ContactSerializer.Meta.fields
+    parent_field = 'candidate'
+
+class AddressValuesSerializer(ValuesSerializer):
+    model = Address
+    fields = AddressSerializer.Meta.fields
+    parent_field = 'candidate'
+
+class SocialMediaValuesSerializer(ValuesSerializer):
+    model = SocialMedia
+    fields = SocialMediaSerializer.Meta.fields
+    parent_field = 'candidate'
+
+class PhotoUrlField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        return get_photo_url(get_file_name(value))
+
+class PhotoVariantsField(serializers.ReadOnlyField):
+    def to_representation(self, value):
+        return get_photo_variants(get_file_name(value))
+
+class CandidateSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
+    photo = PhotoUrlField()
+    photo_variants = PhotoVariantsField(source='photo')
     contacts = ContactSerializer(many=True, required=False)
     addresses = AddressSerializer(many=True, required=False)
     social_media = SocialMediaSerializer(many=True, required=False)
 
+    prefetch_related_fields = {
+        'contacts': Prefetch('contacts', queryset=Contact.objects.all()),
+        'addresses': Prefetch('addresses', queryset=Address.objects.all()),
+        'social_media': Prefetch('social_media', queryset=SocialMedia.objects.all()),
+    }
+    expandable_fields = {
+        'gender': GenderSerializer,
+        'drivers_license_category': DriversLicenseCategorySerializer,
+    }
+
     class Meta:
         model = Candidate
-        fields = ['id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'cpf', 'rg', 'has_disability', 'disability_description', 'has_drivers_license', 'drivers_license_category', 'is_first_job', 'contacts', 'addresses', 'social_media', 'created_at', 'updated_at']
+        fields = ['id', 'first_name', 'last_name', 'date_of_birth', 'gender', 'cpf', 'rg', 'has_disability', 'disability_description', 'has_drivers_license', 'drivers_license_category', 'is_first_job', 'photo', 'photo_variants', 'contacts', 'addresses', 'social_media', 'created_at', 'updated_at']
         extra_kwargs = {
             'id': {'read_only': True, 'required': False},
             'created_at': {'read_only': True},
@@ -76,24 +136,20 @@ class CandidateSerializer(serializers.ModelSerializer):
         addresses_data = validated_data.pop('addresses', None)
         social_media_data = validated_data.pop('social_media', None)
 
-        with transaction.atomic():
+        with transaction.atomic(), defer_token_refresh():
             candidate = Candidate.objects.create(**validated_data)
 
-            for contact_data in contacts_data:
-                Contact.objects.create(candidate=candidate, **contact_data)
-
-            for address_data in addresses_data:
-                Address.objects.create(candidate=candidate, **address_data)
-
-            for social_media_data in social_media_data:
-                SocialMedia.objects.create(candidate=candidate, **social_media_data)
+            # One INSERT per collection; the post_save of the candidate already invalidates the cache and refreshes the search tokens for them
+            BulkHelper.create_children(Contact, 'candidate', candidate, contacts_data)
+            BulkHelper.create_children(Address, 'candidate', candidate, addresses_data)
+            BulkHelper.create_children(SocialMedia, 'candidate', candidate, social_media_data)
 
         return candidate
     
     def update(self, instance, validated_data):
         related_fields = ['contacts', 'addresses', 'social_media']
 
-        with transaction.atomic():
+        with transaction.atomic(), defer_token_refresh():
             related_data = {field: validated_data.pop(field, None) for field in related_fields}
 
             for attr, value in validated_data.items():
@@ -101,78 +157,143 @@ class CandidateSerializer(serializers.ModelSerializer):
             instance.save()
 
             if related_data['contacts'] is not None:
-                existing_ids = []
+                BulkHelper.reconcile_children(Contact, 'candidate', instance, related_data['contacts'], 'contacts')
 
-                for contact_data in related_data['contacts']:
-                    contact_id = contact_data.pop('id', None)
+            if related_data['addresses'] is not None:
+                BulkHelper.reconcile_children(Address, 'candidate', instance, related_data['addresses'], 'addresses')
 
-                    if contact_id:
-                        contact = Contact.objects.get(id=contact_id, candidate=instance)
+            if related_data['social_media'] is not None:
+                BulkHelper.reconcile_children(SocialMedia, 'candidate', instance, related_data['social_media'], 'social_media')
 
-                        for field in ['phone_number', 'email']:
-                            if field not in contact_data:
-                                contact_data[field] = getattr(contact, field)
+        return instance
 
-                        for key, value in contact_data.items():
-                            setattr(contact, key, value)
+class CandidateValuesSerializer(ValuesSerializer):
+    model = Candidate
+    fields = CandidateSerializer.Meta.fields
+    children = {
+        'contacts': ContactValuesSerializer,
+        'addresses': AddressValuesSerializer,
+        'social_media': SocialMediaValuesSerializer,
+    }
+    computed = {
+        'photo': ('photo', get_photo_url),
+        'photo_variants': ('photo', get_photo_variants),
+    }
 
-                        contact.save()
-                        existing_ids.append(contact_id)
-                    else:
-                        contact = Contact.objects.create(candidate=instance, **contact_data)
+class CandidateBatchItemSerializer(CandidateSerializer):
+    unique_fields = ['cpf', 'rg']
 
-                        existing_ids.append(contact.id)
+    def get_fields(self):
+        fields = super().get_fields()
 
-                instance.contacts.exclude(id__in=existing_ids).delete()
+        # Uniqueness is checked once for the whole batch by CandidateBatchSerializer instead of one query per field and item
+        for name in self.unique_fields:
+            fields[name].validators = [validator for validator in fields[name].validators if not isinstance(validator, UniqueValidator)]
 
-            if related_data['addresses'] is not None:
-                existing_ids = []
+        return fields
 
-                for address_data in related_data['addresses']:
-                    address_id = address_data.pop('id', None)
+class CandidateBatchSerializer(serializers.Serializer):
+    MODES = ['atomic', 'best_effort']
 
-                    if address_id:
-                        address = Address.objects.get(id=address_id, candidate=instance)
+    mode = serializers.ChoiceField(choices=MODES, default='atomic')
+    candidates = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=settings.CANDIDATE_BATCH_MAX_SIZE)
 
-                        for field in ['street', 'number', 'complement', 'neighborhood', 'zip_code', 'city']:
-                            if field not in address_data:
-                                address_data[field] = getattr(address, field)
+    def get_unique_errors(self, items):
+        """
+        Return {index: errors} for items whose CPF/RG repeat inside the batch or already exist, with a single query.
+        """
+        unique_fields = CandidateBatchItemSerializer.unique_fields
+        values = {name: {item[name] for item in items.values() if item.get(name)} for name in unique_fields}
+        query = Q()
 
-                        for key, value in address_data.items():
-                            setattr(address, key, value)
+        for name in unique_fields:
+            if values[name]:
+                query |= Q(**{f'{name}__in': values[name]})
 
-                        address.save()
-                        existing_ids.append(address_id)
-                    else:
-                        address = Address.objects.create(candidate=instance, **address_data)
+        taken = {name: set() for name in unique_fields}
 
-                        existing_ids.append(address.id)
+        if query:
+            for row in Candidate.objects.filter(query).values(*unique_fields):
+                for name in unique_fields:
+                    taken[name].add(row[name])
 
-                instance.addresses.exclude(id__in=existing_ids).delete()
+        seen = {name: set() for name in unique_fields}
+        errors = {}
 
-            if related_data['social_media'] is not None:
-                existing_ids = []
+        for index, item in items.items():
+            for name in unique_fields:
+                value = item.get(name)
+
+                if not value:
+                    continue
+
+                if value in taken[name]:
+                    error = Candidate().unique_error_message(Candidate, [name])
+                    errors.setdefault(index, {})[name] = [error.message % error.params]
+                elif value in seen[name]:
+                    errors.setdefault(index, {})[name] = [f'Duplicated {Candidate._meta.get_field(name).verbose_name} in this batch.']
+
+                seen[name].add(value)
+
+        return errors
+
+    def create_candidates(self, items):
+        """
+        Insert the candidates and all their nested rows with one INSERT per table; returns {index: candidate}.
+        """
+        candidates = {}
+        children = {Contact: [], Address: [], SocialMedia: []}
+        related_models = {'contacts': Contact, 'addresses': Address, 'social_media': SocialMedia}
+
+        for index, item in items.items():
+            item = dict(item)
+            related_data = {field: item.pop(field, None) or [] for field in related_models}
+            candidate = Candidate(**item)
+            candidates[index] = candidate
+
+            for field, model in related_models.items():
+                children[model].extend(model(candidate=candidate, **child) for child in related_data[field])
+
+        with transaction.atomic():
+            Candidate.objects.bulk_create(candidates.values())
+
+            for model, instances in children.items():
+                if instances:
+                    model.objects.bulk_create(instances)
+
+            candidates_created(candidates.values())
+
+        return candidates
+
+    def save(self):
+        """
+        Validate every item, then create the valid ones; atomic mode creates nothing unless the whole batch is valid.
 
-                for social_media_data in related_data['social_media']:
-                    social_media_id = social_media_data.pop('id', None)
+        Returns one result per item, in the order they were sent.
+        """
+        items = self.validated_data['candidates']
+        results = [{'index': index} for index in range(len(items))]
+        valid = {}
 
-                    if social_media_id:
-                        social_media = SocialMedia.objects.get(id=social_media_id, candidate=instance)
+        for index, item in enumerate(items):
+            serializer = CandidateBatchItemSerializer(data=item)
 
-                        for field in ['name', 'url']:
-                            if field not in social_media_data:
-                                social_media_data[field] = getattr(social_media, field)
+            if serializer.is_valid():
+                valid[index] = serializer.validated_data
+            else:
+                results[index].update(status='error', errors=serializer.errors)
 
-                        for key, value in social_media_data.items():
-                            setattr(social_media, key, value)
+        for index, errors in self.get_unique_errors(valid).items():
+            del valid[index]
+            results[index].update(status='error', errors=errors)
 
-                        social_media.save()
-                        existing_ids.append(social_media_id)
-                    else:
-                        social_media = SocialMedia.objects.create(candidate=instance, **social_media_data)
+        if self.validated_data['mode'] == 'atomic' and len(valid) < len(items):
+            for index in valid:
+                results[index]['status'] = 'skipped'
 
-                        existing_ids.append(social_media.id)
+            return results
 
-                instance.social_media.exclude(id__in=existing_ids).delete()
+        for index, candidate in self.create_candidates(valid).items():
+            results[index].update(status='created', id=str(candidate.pk))
 
-        return instance
\ No newline at end of file
+        return results
@@ -0,0 +1,82 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from counter.models import Counter
+from utils.cache import response_cache
+from .models import *
+from .search import mark_tokens_stale
+from .similarity import index_candidates, unindex_candidates
+
+LOOKUP_MODELS = [Gender, DriversLicenseCategory, State, City]
+
+def candidates_created(candidates):
+    """
+    Bookkeeping normally done by post_save for candidates inserted with bulk_create, which sends no signals.
+    """
+    candidates = list(candidates)
+
+    if candidates:
+        Counter.objects.increment(Candidate, delta=len(candidates))
+        index_candidates(candidates)
+        # Called once the nested rows are in, so their tokens are included
+        mark_tokens_stale(candidate.pk for candidate in candidates)
+        response_cache.bump_on_commit('candidate:list')
+
+def is_candidate_deletion(origin):
+    return isinstance(origin, Candidate) or getattr(origin, 'model', None) is Candidate
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_delete, sender=Candidate)
+def candidate_changed(sender, instance, **kwargs):
+    response_cache.bump_on_commit('candidate:list', f'candidate:{instance.pk}')
+
+@receiver(post_save, sender=Candidate)
+def candidate_saved(sender, instance, **kwargs):
+    # Trigram entries whose name did not change are left as they are
+    index_candidates([instance])
+    mark_tokens_stale([instance.pk])
+
+@receiver(post_delete, sender=Candidate)
+def candidate_deleted(sender, instance, **kwargs):
+    unindex_candidates([instance.pk])
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def contact_changed(sender, instance, origin=None, **kwargs):
+    if is_candidate_deletion(origin):
+        # Deleted along with the candidate, whose tokens go with it
+        return
+
+    mark_tokens_stale([instance.candidate_id])
+
+@receiver(post_save, sender=Contact)
+@receiver(post_save, sender=Address)
+@receiver(post_save, sender=SocialMedia)
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Address)
+@receiver(post_delete, sender=SocialMedia)
+def candidate_child_changed(sender, instance, **kwargs):
+    response_cache.bump_on_commit('candidate:list', f'candidate:{instance.candidate_id}')
+
+@receiver(post_delete, sender=Contact)
+@receiver(post_delete, sender=Address)
+@receiver(post_delete, sender=SocialMedia)
+def candidate_child_deleted(sender, instance, origin=None, **kwargs):
+    if is_candidate_deletion(origin):
+        return
+
+    # A queryset delete sends one signal per row, but each candidate only needs to be touched once per delete
+    touched = origin.__dict__.setdefault('_touched_candidate_ids', set()) if origin is not None else set()
+
+    if instance.candidate_id not in touched:
+        touched.add(instance.candidate_id)
+        # A deleted row leaves no updated_at behind, so the candidate's is moved forward to keep the conditional GET versions honest
+        Candidate.objects.filter(pk=instance.candidate_id).update(updated_at=timezone.now())
+
+def lookup_changed(sender, instance, **kwargs):
+    # Lookup names show up in expanded payloads, so every cached candidate read depends on them
+    response_cache.bump_on_commit('candidate')
+
+for model in LOOKUP_MODELS:
+    post_save.connect(lookup_changed, sender=model)
+    post_delete.connect(lookup_changed, sender=model)
@@ -0,0 +1,237 @@
+from collections import Counter
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection
+from utils.text import normalize_text
+import math
+import re
+import uuid
+
+SETS_TABLE = 'candidate_trigram_sets'
+TRIGRAMS_TABLE = 'candidate_trigrams'
+FREQUENCIES_TABLE = 'candidate_trigram_frequencies'
+
+word_pattern = re.compile(r'[^\W_]+')
+
+def get_key(candidate_id):
+    """
+    Map a candidate UUID to the integer key of its index entries: its leading 63 bits, as resume.search.get_rowid does.
+    """
+    return uuid.UUID(str(candidate_id)).int >> 65
+
+def get_trigrams(text):
+    """
+    Return the set of trigrams of every word of `text`, each padded with two spaces in front and one behind as pg_trgm does, so the
+    beginning of a word weighs more than its middle.
+    """
+    trigrams = set()
+
+    for word in word_pattern.findall(normalize_text(text)):
+        padded = f'  {word} '
+        trigrams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+
+    return trigrams
+
+def encode_trigrams(trigrams):
+    # Trigrams only hold letters, digits and spaces
+    return '|' + '|'.join(sorted(trigrams)) + '|'
+
+def decode_trigrams(encoded):
+    return set(encoded.strip('|').split('|')) if encoded != '||' else set()
+
+def write_frequencies(cursor, deltas):
+    rows = [(trigram, delta) for trigram, delta in deltas.items() if delta]
+
+    if rows:
+        cursor.executemany(
+            f'INSERT INTO {FREQUENCIES_TABLE} (trigram, frequency) VALUES (%s, %s) '
+            f'ON CONFLICT (trigram) DO UPDATE SET frequency = frequency + excluded.frequency',
+            rows
+        )
+
+def read_sets(cursor, keys):
+    if not keys:
+        return {}
+
+    placeholders = ', '.join(['%s'] * len(keys))
+    cursor.execute(f'SELECT candidate_key, trigrams FROM {SETS_TABLE} WHERE candidate_key IN ({placeholders})', list(keys))
+
+    return dict(cursor.fetchall())
+
+def remove_entries(cursor, entries):
+    """
+    Delete the postings of {key: encoded trigrams} and take them off the trigram frequencies.
+    """
+    deltas = Counter()
+    postings = []
+
+    for key, encoded in entries.items():
+        for trigram in decode_trigrams(encoded):
+            postings.append((trigram, key))
+            deltas[trigram] -= 1
+
+    if postings:
+        cursor.executemany(f'DELETE FROM {TRIGRAMS_TABLE} WHERE trigram = %s AND candidate_key = %s', postings)
+        write_frequencies(cursor, deltas)
+
+def index_candidates(candidates):
+    """
+    Bring the trigram entries of the given Candidate instances up to date; candidates whose name did not change are left alone.
+    """
+    entries = {}
+
+    for candidate in candidates:
+        trigrams = get_trigrams(f'{candidate.first_name} {candidate.last_name}')
+        entries[get_key(candidate.pk)] = (candidate.pk.hex, trigrams, encode_trigrams(trigrams))
+
+    with connection.cursor() as cursor:
+        existing = read_sets(cursor, entries)
+        changed = {key: entry for key, entry in entries.items() if existing.get(key) != entry[2]}
+
+        if not changed:
+            return
+
+        remove_entries(cursor, {key: existing[key] for key in changed if key in existing})
+
+        deltas = Counter()
+        postings = []
+
+        for key, (candidate_id, trigrams, encoded) in changed.items():
+            for trigram in trigrams:
+                postings.append((trigram, key))
+                deltas[trigram] += 1
+
+        cursor.executemany(f'INSERT INTO {TRIGRAMS_TABLE} (trigram, candidate_key) VALUES (%s, %s)', postings)
+        write_frequencies(cursor, deltas)
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {SETS_TABLE} (candidate_key, candidate_id, size, trigrams) VALUES (%s, %s, %s, %s)',
+            [(key, candidate_id, len(trigrams), encoded) for key, (candidate_id, trigrams, encoded) in changed.items()]
+        )
+
+def unindex_candidates(ids):
+    keys = [get_key(candidate_id) for candidate_id in ids]
+
+    with connection.cursor() as cursor:
+        existing = read_sets(cursor, keys)
+
+        if existing:
+            remove_entries(cursor, existing)
+            cursor.executemany(f'DELETE FROM {SETS_TABLE} WHERE candidate_key = %s', [(key,) for key in existing])
+
+def clear_index():
+    with connection.cursor() as cursor:
+        for table in (TRIGRAMS_TABLE, FREQUENCIES_TABLE, SETS_TABLE):
+            cursor.execute(f'DELETE FROM {table}')
+
+def rebuild_index(chunk_size=1000, apps=global_apps):
+    """
+    Replace the whole index with entries built from every candidate, `chunk_size` candidates at a time; returns the number indexed.
+
+    Meant to run inside a transaction, so searches keep seeing the old index until the new one is committed. `apps` is the registry the
+    candidates are read from, so migrations can pass their historical one.
+    """
+    Candidate = apps.get_model('candidate', 'Candidate')
+    indexed = 0
+    last_id = None
+
+    clear_index()
+
+    while True:
+        candidates = Candidate.objects.order_by('id').only('id', 'first_name', 'last_name')
+
+        if last_id is not None:
+            candidates = candidates.filter(id__gt=last_id)
+
+        candidates = list(candidates[:chunk_size])
+
+        if not candidates:
+            return indexed
+
+        last_id = candidates[-1].pk
+        index_candidates(candidates)
+        indexed += len(candidates)
+
+def find_similar(text, threshold=None):
+    """
+    Return [(candidate id as hex, score)] for the candidates whose name is at least `threshold` similar to `text`, best score first. The
+    score is the Jaccard index of the two trigram sets, which is what pg_trgm calls similarity.
+
+    Names are pulled by their shared trigrams, rarest first: those are read whole while they fit in half of SIMILAR_NAME_MAX_POSTINGS, so
+    distinctive names are always found. The postings of the remaining, common trigrams are only read for a slice of the candidate keys
+    sized to the rest of the budget; the keys being random, that is a uniform sample, and the names sharing the most trigrams are still
+    among the results. The SIMILAR_NAME_MAX_CANDIDATES names sharing the most trigrams are then scored exactly. Within both bounds the
+    result is exact; past them, very common names return their best matches from the sample instead of costing a full scan.
+    """
+    threshold = settings.SIMILAR_NAME_THRESHOLD if threshold is None else threshold
+    budget = settings.SIMILAR_NAME_MAX_POSTINGS
+    trigrams = get_trigrams(text)
+    size = len(trigrams)
+
+    if not size:
+        return []
+
+    with connection.cursor() as cursor:
+        placeholders = ', '.join(['%s'] * size)
+        cursor.execute(f'SELECT trigram, frequency FROM {FREQUENCIES_TABLE} WHERE trigram IN ({placeholders}) AND frequency > 0', list(trigrams))
+        frequencies = dict(cursor.fetchall())
+
+        if not frequencies:
+            return []
+
+        full, sampled = [], []
+        postings = 0
+
+        for trigram in sorted(frequencies, key=lambda trigram: (frequencies[trigram], trigram)):
+            if not sampled and postings + frequencies[trigram] <= budget // 2:
+                full.append(trigram)
+                postings += frequencies[trigram]
+            else:
+                sampled.append(trigram)
+
+        remaining = sum(frequencies[trigram] for trigram in sampled)
+
+        if remaining <= budget - postings:
+            full, sampled = full + sampled, []
+
+        # A name can share every sampled trigram without being in the sample, so only the rest of the required ones count here
+        required = max(math.ceil(threshold * size - 1e-9) - len(sampled), 1)
+        queries = []
+        params = []
+
+        if full:
+            queries.append(f'SELECT candidate_key FROM {TRIGRAMS_TABLE} WHERE trigram IN ({", ".join(["%s"] * len(full))})')
+            params += full
+
+        if sampled:
+            # Keys are the leading bits of random UUIDs, so a key range is a uniform sample of the candidates
+            limit = int(2 ** 63 * max(budget - postings, 0) / remaining)
+            queries.append(f'SELECT candidate_key FROM {TRIGRAMS_TABLE} WHERE trigram IN ({", ".join(["%s"] * len(sampled))}) AND candidate_key < %s')
+            params += [*sampled, limit]
+
+        cursor.execute(
+            f'''
+            SELECT sets.candidate_id, sets.size, sets.trigrams FROM (
+                SELECT candidate_key, COUNT(*) AS shared FROM ({' UNION ALL '.join(queries)})
+                GROUP BY candidate_key
+                HAVING COUNT(*) >= %s
+                ORDER BY shared DESC, candidate_key
+                LIMIT %s
+            ) AS postings
+            INNER JOIN {SETS_TABLE} AS sets ON sets.candidate_key = postings.candidate_key
+            ''',
+            [*params, required, settings.SIMILAR_NAME_MAX_CANDIDATES]
+        )
+        rows = cursor.fetchall()
+
+    matches = []
+
+    for candidate_id, other_size, encoded in rows:
+        # The empty strings around the separators never match a trigram
+        shared = len(trigrams.intersection(encoded.split('|')))
+        score = shared / (size + other_size - shared)
+
+        if score >= threshold - 1e-9:
+            matches.append((candidate_id, score))
+
+    # The candidate id breaks ties so every position is unique for the cursor
+    return sorted(matches, key=lambda match: (-match[1], match[0]))
@@ -0,0 +1,73 @@
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+import hashlib
+import os
+import posixpath
+import re
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files after the SHA-256 of their content, fanned out as <directory>/ab/cd/abcd...<ext>.
+
+    Saving bytes that are already stored writes nothing and returns the existing name, so identical photos share one file. Only the
+    directory and the extension of the requested name are kept.
+    """
+    hashed_name = re.compile(r'(?:^|/)(?P<a>[0-9a-f]{2})/(?P<b>[0-9a-f]{2})/(?P=a)(?P=b)[0-9a-f]{60}(?:\.\w+)?$')
+
+    def __init__(self, **kwargs):
+        # Two uploads of the same bytes may race for the same name; overwriting with identical content is harmless
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def get_digest(content):
+        digest = hashlib.sha256()
+
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        for chunk in content.chunks():
+            digest.update(chunk)
+
+        if hasattr(content, 'seek'):
+            content.seek(0)
+
+        return digest.hexdigest()
+
+    def get_content_name(self, name, content):
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        digest = self.get_digest(content)
+        extension = os.path.splitext(filename)[1].lower()
+
+        return posixpath.join(directory, digest[:2], digest[2:4], f'{digest}{extension}')
+
+    def is_content_addressed(self, name):
+        return bool(self.hashed_name.search(name))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        name = self.get_content_name(name, content)
+
+        if self.exists(name):
+            # Refresh the modification time, so the file cleaner's grace period also covers this new reference
+            os.utime(self.path(name))
+
+            return name
+
+        return super().save(name, content, max_length=max_length)
+
+    def save_as(self, name, content):
+        """
+        Save under exactly `name`, for files derived from a stored one (e.g. thumbnails), which are not content-addressed.
+        """
+        return super().save(name, content)
+
+photo_storage = ContentAddressedStorage()
+
+def get_photo_storage():
+    return photo_storage
@@ -1,3 +1,764 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from counter.models import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from employee.models import Employee
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from validate_docbr import CPF
+from utils.files import file_cleaner
+from utils.sendfile import parse_range
+from utils.helpers import BulkHelper
+from .derivatives import get_derivative_name, get_derivative_names, photo_derivatives
+from .filters import years_before
+from .models import *
+from .serializers import CandidateSerializer, CandidateValuesSerializer
+from .search import defer_token_refresh
+from .similarity import clear_index, find_similar, rebuild_index
+from .storage import photo_storage
+from .uploads import PhotoProcessorBusy, photo_processor
+from unittest import mock
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import time
 
-# Create your tests here.
+class CandidateTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = Employee.objects.create_user(username='ana', password='senha-segura-123', first_name='Ana')
+        cls.gender = Gender.objects.create(name='Feminino')
+        cls.category = DriversLicenseCategory.objects.create(name='B')
+        cls.state = State.objects.create(name='São Paulo', abbreviation='SP')
+        cls.city = City.objects.create(name='Campinas', state=cls.state)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def create_candidate(self, first_name='Maria', last_name='Silva', email=None, **kwargs):
+        kwargs.setdefault('date_of_birth', datetime.date(1990, 5, 17))
+        kwargs.setdefault('gender', self.gender)
+        candidate = Candidate.objects.create(first_name=first_name, last_name=last_name, cpf=CPF().generate(), **kwargs)
+
+        if email:
+            Contact.objects.create(candidate=candidate, phone_number='11987654321', email=email)
+
+        return candidate
+
+    def get_payload(self, size=1):
+        return {
+            'first_name': 'Maria',
+            'last_name': 'Souza',
+            'date_of_birth': '17/05/1990',
+            'gender': str(self.gender.pk),
+            'cpf': CPF().generate(),
+            'contacts': [{'phone_number': '11987654321', 'email': f'maria{index}@gmail.com'} for index in range(size)],
+            'addresses': [{'street': 'Rua das Flores', 'number': '10', 'neighborhood': 'Centro', 'zip_code': '13010000', 'city': str(self.city.pk)}] * size,
+            'social_media': [{'name': 'LinkedIn', 'url': 'https://www.linkedin.com/in/maria'}] * size,
+        }
+
+class InlineExecutor:
+    """
+    Runs submitted jobs right away, so background file work is over when the on_commit callbacks return.
+    """
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        future.set_result(function(*args, **kwargs))
+
+        return future
+
+class CandidatePhotoTestCase(CandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        for pipeline in (file_cleaner, photo_derivatives):
+            patcher = mock.patch.object(pipeline, 'get_executor', return_value=InlineExecutor())
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def set_photo(self, candidate, content, name='photo.png'):
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.photo.save(name, ContentFile(content))
+
+        return candidate.photo.name
+
+    def assertStored(self, name, stored=True):
+        for stored_name in [name, *get_derivative_names(name)]:
+            self.assertEqual(photo_storage.exists(stored_name), stored, stored_name)
+
+    def get_image(self, size=(32, 32), color='red', format='PNG'):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, color).save(buffer, format)
+
+        return buffer.getvalue()
+
+    def upload(self, candidate, content, name='photo.png'):
+        return self.client.post(reverse('upload_candidate_photo', args=[candidate.pk]), {'photo': SimpleUploadedFile(name, content)}, format='multipart')
+
+class CandidateVersionTests(CandidateTestCase):
+    def test_expanded_gender_rename_changes_version(self):
+        candidate = self.create_candidate()
+        urls = [reverse('get_candidates') + '?expand=gender', reverse('detail_candidate', args=[candidate.pk]) + '?expand=gender']
+        before = [self.client.get(url)['ETag'] for url in urls]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.gender.name = 'Mulher'
+            self.gender.save()
+
+        responses = [self.client.get(url) for url in urls]
+        self.assertEqual(responses[0].json()['data']['candidates'][0]['gender']['name'], 'Mulher')
+        self.assertEqual(responses[1].json()['data']['candidate']['gender']['name'], 'Mulher')
+        self.assertNotEqual(before, [response['ETag'] for response in responses])
+
+    def test_child_deletions_change_version(self):
+        candidate = self.create_candidate(email='maria@gmail.com')
+        Address.objects.create(candidate=candidate, street='Rua das Flores', number='10', neighborhood='Centro', zip_code='13010000', city=self.city)
+        SocialMedia.objects.create(candidate=candidate, name='LinkedIn', url='https://www.linkedin.com/in/maria')
+        urls = [reverse('get_candidates'), reverse('detail_candidate', args=[candidate.pk])]
+
+        for model in (Contact, Address, SocialMedia):
+            with self.subTest(model=model.__name__):
+                etags = [self.client.get(url)['ETag'] for url in urls]
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    model.objects.get(candidate=candidate).delete()
+
+                for url, etag in zip(urls, etags):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotEqual(response['ETag'], etag)
+
+class CandidateValuesSerializerTests(CandidateTestCase):
+    def test_output_matches_model_serializer(self):
+        candidate = self.create_candidate(email='maria@gmail.com', rg='123456789', has_drivers_license=True, drivers_license_category=self.category)
+        Contact.objects.create(candidate=candidate, phone_number='1933334444', email='maria.silva@empresa.com.br')
+        Address.objects.create(candidate=candidate, street='Rua das Flores', number='10', neighborhood='Centro', zip_code='13010000', city=self.city)
+        SocialMedia.objects.create(candidate=candidate, name='LinkedIn', url='https://www.linkedin.com/in/maria')
+        self.create_candidate('João', 'Souza', has_disability=True, disability_description='Baixa visão')
+        Candidate.objects.filter(first_name='João').update(photo='candidates/photos/ab/abcdef.jpg')
+        queryset = Candidate.objects.order_by('first_name', 'last_name', 'id')
+
+        values = CandidateValuesSerializer(list(CandidateValuesSerializer.get_queryset(queryset))).data
+        model = CandidateSerializer(CandidateSerializer.setup_eager_loading(queryset), many=True).data
+
+        self.assertEqual(len(values), queryset.count())
+        self.assertEqual(JSONRenderer().render(values), JSONRenderer().render(model))
+
+class CandidateSerializerTests(CandidateTestCase):
+    def test_create_query_count_does_not_grow_with_children(self):
+        # Creates the maintained counter row, which is inserted once
+        self.create_candidate()
+
+        for size in (1, 3):
+            with self.subTest(size=size):
+                serializer = CandidateSerializer(data=self.get_payload(size))
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+
+                with self.assertNumQueries(18):
+                    candidate = serializer.save()
+
+                self.assertEqual(candidate.contacts.count(), size)
+                self.assertEqual(candidate.addresses.count(), size)
+
+class ReconcileChildrenTests(CandidateTestCase):
+    def create_contacts(self, candidate, size):
+        return [Contact.objects.create(candidate=candidate, phone_number=f'1198765432{index}', email=f'maria{index}@gmail.com') for index in range(size)]
+
+    def update(self, candidate, data):
+        return self.client.patch(reverse('update_candidate', args=[candidate.pk]), data, format='json')
+
+    def test_updates_creates_and_deletes(self):
+        candidate = self.create_candidate()
+        kept, removed = self.create_contacts(candidate, 2)
+
+        response = self.update(candidate, {'contacts': [
+            {'id': str(kept.pk), 'phone_number': kept.phone_number, 'email': 'maria@yahoo.com'},
+            {'phone_number': '1933334444', 'email': 'maria@empresa.com.br'},
+        ]})
+
+        self.assertEqual(response.status_code, 200, response.content)
+        contacts = {contact.email: contact for contact in candidate.contacts.all()}
+        self.assertEqual(set(contacts), {'maria@yahoo.com', 'maria@empresa.com.br'})
+        self.assertEqual(contacts['maria@yahoo.com'].pk, kept.pk)
+        self.assertFalse(Contact.objects.filter(pk=removed.pk).exists())
+
+    def test_invalid_ids_write_nothing(self):
+        candidate = self.create_candidate()
+        contact, = self.create_contacts(candidate, 1)
+        foreign, = self.create_contacts(self.create_candidate('João', 'Souza'), 1)
+        item = {'id': str(contact.pk), 'phone_number': contact.phone_number, 'email': 'maria@yahoo.com'}
+        cases = [
+            ('duplicated', [item, item], 'Duplicated id'),
+            ('foreign', [item, {'id': str(foreign.pk), 'phone_number': '1933334444', 'email': 'joao@yahoo.com'}], 'Invalid id'),
+        ]
+
+        for label, contacts, message in cases:
+            with self.subTest(case=label):
+                response = self.update(candidate, {'first_name': 'Mariana', 'contacts': [*contacts, {'phone_number': '1933335555', 'email': 'nova@gmail.com'}]})
+
+                self.assertEqual(response.status_code, 400)
+                errors = response.json()['errors']['contacts']
+                self.assertEqual(len(errors), 3)
+                self.assertEqual([errors[0], errors[2]], [{}, {}])
+                self.assertIn(message, errors[1]['id'][0])
+
+                candidate.refresh_from_db()
+                self.assertEqual(candidate.first_name, 'Maria')
+                self.assertEqual(list(candidate.contacts.values_list('pk', 'email')), [(contact.pk, 'maria0@gmail.com')])
+                self.assertEqual(Contact.objects.get(pk=foreign.pk).email, 'maria0@gmail.com')
+
+    def test_bulk_update_refreshes_derived_columns(self):
+        candidate = self.create_candidate()
+        changed, unchanged = self.create_contacts(candidate, 2)
+        items = [
+            {'id': changed.pk, 'phone_number': '(19) 3333-4444', 'email': 'Maria.Silva@Empresa.com.br'},
+            {'id': unchanged.pk, 'phone_number': unchanged.phone_number, 'email': unchanged.email},
+        ]
+
+        BulkHelper.reconcile_children(Contact, 'candidate', candidate, items, 'contacts')
+
+        updated = Contact.objects.get(pk=changed.pk)
+        self.assertEqual(updated.normalized_email, 'maria.silva@empresa.com.br')
+        self.assertEqual(updated.normalized_phone_number, '1933334444')
+        self.assertGreater(updated.updated_at, changed.updated_at)
+        self.assertEqual(Contact.objects.get(pk=unchanged.pk).updated_at, unchanged.updated_at)
+
+    def test_query_count_does_not_grow_with_children(self):
+        for size in (1, 3):
+            with self.subTest(size=size):
+                candidate = self.create_candidate()
+                contacts = self.create_contacts(candidate, size * 2)
+                # Half of the rows are updated, the other half deleted, and as many new ones are created
+                items = [{'id': contact.pk, 'phone_number': contact.phone_number, 'email': f'novo{index}@gmail.com'} for index, contact in enumerate(contacts[:size])]
+                items += [{'phone_number': '1933334444', 'email': f'nova{index}@gmail.com'} for index in range(size)]
+
+                # As the serializer does it, with the search tokens of the candidate refreshed once
+                with self.assertNumQueries(10), defer_token_refresh():
+                    BulkHelper.reconcile_children(Contact, 'candidate', candidate, items, 'contacts')
+
+                self.assertEqual(sorted(candidate.contacts.values_list('email', flat=True)), sorted(item['email'] for item in items))
+
+class CreateCandidateBatchTests(CandidateTestCase):
+    def post(self, candidates, mode=None):
+        payload = {'candidates': candidates, **({'mode': mode} if mode else {})}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('create_candidate_batch'), payload, format='json')
+
+    def test_best_effort_creates_the_valid_items(self):
+        stored = self.create_candidate()
+        valid = self.get_payload(2)
+        items = [
+            valid,
+            {**self.get_payload(), 'cpf': '12345678900'},
+            {**self.get_payload(), 'cpf': valid['cpf']},
+            {**self.get_payload(), 'cpf': stored.cpf},
+        ]
+
+        response = self.post(items, 'best_effort')
+
+        self.assertEqual(response.status_code, 207)
+        body = response.json()
+        results = body['data']['results']
+        self.assertEqual((body['status'], body['count']), ('partial', 1))
+        self.assertEqual([result['status'] for result in results], ['created', 'error', 'error', 'error'])
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        self.assertIn('cpf', results[1]['errors'])
+        self.assertIn('in this batch', results[2]['errors']['cpf'][0])
+        self.assertIn('já existe', results[3]['errors']['cpf'][0])
+
+        candidate = Candidate.objects.get(pk=results[0]['id'])
+        self.assertEqual(candidate.contacts.count(), 2)
+        self.assertEqual(Candidate.objects.count(), 2)
+        self.assertEqual(Counter.objects.total(Candidate), 2)
+        self.assertEqual(self.client.get(reverse('get_candidates'), {'search': 'maria1@gmail'}).json()['count'], 1)
+
+    def test_atomic_batch_creates_nothing_unless_every_item_is_valid(self):
+        items = [self.get_payload(), self.get_payload(), {**self.get_payload(), 'first_name': ''}]
+
+        response = self.post(items)
+
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['data']['results']
+        self.assertEqual([result['status'] for result in results], ['skipped', 'skipped', 'error'])
+        self.assertIn('first_name', results[2]['errors'])
+        self.assertFalse(Candidate.objects.exists())
+        self.assertFalse(Contact.objects.exists())
+
+        response = self.post(items[:2])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(Candidate.objects.count(), 2)
+
+    def test_batch_size_is_limited(self):
+        response = self.post([{}] * (settings.CANDIDATE_BATCH_MAX_SIZE + 1))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('candidates', response.json()['errors'])
+
+        response = self.post([], 'best_effort')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('candidates', response.json()['errors'])
+
+class CandidateFilterTests(CandidateTestCase):
+    def test_age_bounds(self):
+        today = timezone.localdate()
+        self.create_candidate('Ana', date_of_birth=years_before(today, 30))
+        self.create_candidate('Bia', date_of_birth=years_before(today, 31) + datetime.timedelta(days=1))
+        self.create_candidate('Carla', date_of_birth=years_before(today, 40))
+
+        response = self.client.get(reverse('get_candidates'), {'age_min': 30, 'age_max': 30})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([candidate['first_name'] for candidate in response.json()['data']['candidates']], ['Ana', 'Bia'])
+
+    def test_invalid_age_is_rejected(self):
+        for value in ('5000', '30.5', '-1', 'abc'):
+            with self.subTest(age_max=value):
+                response = self.client.get(reverse('get_candidates'), {'age_max': value})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('age_max', response.json()['errors'])
+
+class CandidateSearchTests(CandidateTestCase):
+    def search(self, query):
+        response = self.client.get(reverse('get_candidates'), {'search': query})
+        self.assertEqual(response.status_code, 200)
+
+        return sorted(f"{candidate['first_name']} {candidate['last_name']}" for candidate in response.json()['data']['candidates'])
+
+    def test_words_match_at_any_word_start(self):
+        self.create_candidate('Maria', 'da Silva', email='maria@gmail.com')
+        self.create_candidate('Ana Maria', 'Souza', email='ana.souza@empresa.com.br')
+        self.create_candidate('João', 'Conceição', email='joao@outlook.com')
+
+        self.assertEqual(self.search('silva'), ['Maria da Silva'])
+        self.assertEqual(self.search('maria'), ['Ana Maria Souza', 'Maria da Silva'])
+        self.assertEqual(self.search('gmail'), ['Maria da Silva'])
+        self.assertEqual(self.search('souza@emp'), ['Ana Maria Souza'])
+        self.assertEqual(self.search('maria@gmail.com'), ['Maria da Silva'])
+        self.assertEqual(self.search('CONCEICAO joão'), ['João Conceição'])
+        self.assertEqual(self.search('maria souza'), ['Ana Maria Souza'])
+        # Only word starts match, not any substring
+        self.assertEqual(self.search('ilva'), [])
+
+    def test_phone_numbers_match_digits(self):
+        self.create_candidate('Maria', 'da Silva', email='maria@gmail.com')
+
+        self.assertEqual(self.search('(11) 98765'), [])
+        self.assertEqual(self.search('(11)98765-4321'), ['Maria da Silva'])
+
+    def test_tokens_follow_updates_and_deletes(self):
+        candidate = self.create_candidate('Maria', 'da Silva', email='maria@gmail.com')
+        contact = candidate.contacts.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.last_name = 'Oliveira'
+            candidate.save()
+            contact.email = 'maria@yahoo.com'
+            contact.save()
+
+        self.assertEqual(self.search('silva'), [])
+        self.assertEqual(self.search('oliveira'), ['Maria Oliveira'])
+        self.assertEqual(self.search('gmail'), [])
+        self.assertEqual(self.search('yahoo'), ['Maria Oliveira'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            contact.delete()
+
+        self.assertEqual(self.search('yahoo'), [])
+
+        candidate.delete()
+        self.assertFalse(CandidateSearchToken.objects.exists())
+
+    def test_tokens_follow_nested_writes(self):
+        serializer = CandidateSerializer(data=self.get_payload(2))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate = serializer.save()
+
+        self.assertEqual(self.search('maria1@gmail'), ['Maria Souza'])
+
+        serializer = CandidateSerializer(candidate, data={'contacts': [{'phone_number': '11987654321', 'email': 'souza@hotmail.com'}]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            serializer.save()
+
+        self.assertEqual(self.search('gmail'), [])
+        self.assertEqual(self.search('hotmail'), ['Maria Souza'])
+
+class SimilarNameTests(CandidateTestCase):
+    def setUp(self):
+        super().setUp()
+        self.names = ['Maria Silva', 'Maria da Silva', 'Mariana Silva', 'Marta Silveira', 'Maria Souza', 'João Santos']
+        self.candidates = {name: self.create_candidate(*name.split(' ', 1)) for name in self.names}
+
+    def get_name(self, candidate):
+        return f"{candidate['first_name']} {candidate['last_name']}"
+
+    def test_find_similar_ranks_by_score(self):
+        matches = find_similar('Maira Silva')
+        scores = [score for candidate_id, score in matches]
+        names = {candidate.pk.hex: name for name, candidate in self.candidates.items()}
+
+        self.assertEqual(names[matches[0][0]], 'Maria Silva')
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(score >= 0.3 for score in scores))
+        self.assertNotIn(self.candidates['João Santos'].pk.hex, [candidate_id for candidate_id, score in matches])
+
+    def test_find_similar_exact_name(self):
+        matches = dict(find_similar('MARIA   SILVA'))
+
+        self.assertEqual(matches[self.candidates['Maria Silva'].pk.hex], 1.0)
+
+    def test_find_similar_threshold(self):
+        loose = find_similar('Maria Silva', threshold=0.1)
+        strict = find_similar('Maria Silva', threshold=0.9)
+
+        self.assertEqual([candidate_id for candidate_id, score in strict], [self.candidates['Maria Silva'].pk.hex])
+        self.assertGreater(len(loose), len(strict))
+
+    def test_find_similar_follows_renames_and_deletes(self):
+        candidate = self.candidates['Marta Silveira']
+        candidate.first_name, candidate.last_name = 'Juliana', 'Pereira'
+        candidate.save()
+        deleted = self.candidates['Maria Silva'].pk
+        self.candidates['Maria Silva'].delete()
+
+        ids = [candidate_id for candidate_id, score in find_similar('Maria Silva', threshold=0.2)]
+
+        self.assertNotIn(candidate.pk.hex, ids)
+        self.assertNotIn(deleted.hex, ids)
+        self.assertIn(candidate.pk.hex, [candidate_id for candidate_id, score in find_similar('Juliana Pereira')])
+
+    def test_rebuild_index_restores_every_name(self):
+        expected = find_similar('Maria Silva', threshold=0.2)
+        clear_index()
+        self.assertEqual(find_similar('Maria Silva', threshold=0.2), [])
+
+        self.assertEqual(rebuild_index(chunk_size=4), len(self.names))
+        self.assertEqual(find_similar('Maria Silva', threshold=0.2), expected)
+
+    def test_endpoint_pages_through_every_match(self):
+        expected = [candidate_id for candidate_id, score in find_similar('Maria Silva', threshold=0.2)]
+        url = reverse('similar_candidate_names')
+        params = {'q': 'Maria Silva', 'threshold': 0.2, 'page_size': 2}
+        pages = []
+
+        while True:
+            body = self.client.get(url, params).json()
+            self.assertEqual(body['count'], len(expected))
+            pages.append(body)
+
+            if body['next'] is None:
+                break
+
+            params['cursor'] = body['next']
+
+        ids = [candidate['id'].replace('-', '') for page in pages for candidate in page['data']['candidates']]
+        scores = [candidate['score'] for page in pages for candidate in page['data']['candidates']]
+
+        self.assertGreater(len(pages), 2)
+        self.assertEqual(ids, expected)
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertIsNone(pages[0]['previous'])
+
+        # Going back from the last page gives the page before it
+        previous = self.client.get(url, {**params, 'cursor': pages[-1]['previous']}).json()
+        self.assertEqual(previous['data']['candidates'], pages[-2]['data']['candidates'])
+
+    @override_settings(SIMILAR_NAME_MAX_CANDIDATES=2)
+    def test_endpoint_bounds_the_candidates_scored(self):
+        body = self.client.get(reverse('similar_candidate_names'), {'q': 'Maria Silva', 'threshold': 0.2}).json()
+
+        self.assertLessEqual(body['count'], 2)
+        self.assertEqual(self.get_name(body['data']['candidates'][0]), 'Maria Silva')
+
+    def test_endpoint_rejects_invalid_input(self):
+        url = reverse('similar_candidate_names')
+
+        for params, field in (({}, 'q'), ({'q': '!!'}, 'q'), ({'q': 'Maria', 'threshold': '0'}, 'threshold'),
+                              ({'q': 'Maria', 'threshold': 'abc'}, 'threshold'), ({'q': 'Maria', 'cursor': 'invalid'}, 'cursor')):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json()['errors'])
+
+class UploadCandidatePhotoTests(CandidatePhotoTestCase):
+    def test_photo_is_processed_and_saved(self):
+        candidate = self.create_candidate()
+
+        response = self.upload(candidate, self.get_image((3000, 1500), format='JPEG'), 'photo.jpg')
+
+        self.assertEqual(response.status_code, 200)
+        candidate.refresh_from_db()
+        self.assertTrue(candidate.photo.name.endswith('.jpg'))
+
+        with Image.open(candidate.photo.path) as image:
+            self.assertEqual(image.size, (2048, 1024))
+
+    @override_settings(PHOTO_UPLOAD_MAX_SIZE=1024)
+    def test_too_large_photo_is_rejected(self):
+        candidate = self.create_candidate()
+
+        # Past the declared length check, and under it, where the upload handler cuts the stream
+        for size in (200 * 1024, 8 * 1024):
+            with self.subTest(size=size):
+                response = self.upload(candidate, os.urandom(size))
+
+                self.assertEqual(response.status_code, 413)
+
+        candidate.refresh_from_db()
+        self.assertFalse(candidate.photo)
+
+    def test_invalid_image_is_rejected(self):
+        candidate = self.create_candidate()
+
+        response = self.upload(candidate, b'not an image at all')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('photo', response.json()['errors'])
+
+    @override_settings(PHOTO_MAX_PIXELS=1000)
+    def test_pixel_bomb_is_rejected(self):
+        candidate = self.create_candidate()
+
+        response = self.upload(candidate, self.get_image((100, 100)))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('1000 pixels', response.json()['errors']['photo'][0])
+        candidate.refresh_from_db()
+        self.assertFalse(candidate.photo)
+
+    def test_busy_or_slow_processor_answers_503(self):
+        candidate = self.create_candidate()
+
+        for error in (PhotoProcessorBusy('busy'), TimeoutError()):
+            with self.subTest(error=type(error).__name__), mock.patch.object(photo_processor, 'process', side_effect=error):
+                response = self.upload(candidate, self.get_image())
+
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response['Retry-After'], '5')
+
+@mock.patch.object(file_cleaner, 'grace', 0)
+class PhotoCleanupTests(CandidatePhotoTestCase):
+    def test_replaced_photo_is_deleted_after_commit(self):
+        candidate = self.create_candidate()
+        old = self.set_photo(candidate, self.get_image(color='red'))
+        self.assertStored(old)
+
+        new = self.set_photo(candidate, self.get_image(color='blue'))
+
+        self.assertNotEqual(new, old)
+        self.assertStored(old, False)
+        self.assertStored(new)
+
+    def test_replaced_photo_is_kept_on_rollback(self):
+        candidate = self.create_candidate()
+        old = self.set_photo(candidate, self.get_image(color='red'))
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                candidate.photo.save('photo.png', ContentFile(self.get_image(color='blue')))
+                raise RuntimeError('rolled back')
+
+        self.assertEqual(callbacks, [])
+        self.assertStored(old)
+        candidate.refresh_from_db()
+        self.assertEqual(candidate.photo.name, old)
+
+    def test_photo_is_deleted_with_its_candidate(self):
+        candidate = self.create_candidate()
+        photo = self.set_photo(candidate, self.get_image())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            candidate.delete()
+
+        self.assertStored(photo, False)
+
+@mock.patch.object(file_cleaner, 'grace', 0)
+class SharedPhotoTests(CandidatePhotoTestCase):
+    def test_shared_file_outlives_one_of_its_candidates(self):
+        first, second = self.create_candidate('Maria', 'Silva'), self.create_candidate('João', 'Souza')
+        content = self.get_image()
+        shared = self.set_photo(first, content)
+
+        self.assertEqual(self.set_photo(second, content, 'other.png'), shared)
+
+        self.set_photo(first, self.get_image(color='blue'))
+
+        # Still referenced by the second candidate
+        self.assertStored(shared)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertStored(shared, False)
+
+class CollectOrphanedPhotosTests(CandidatePhotoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.photo = self.set_photo(self.create_candidate(), self.get_image(color='red'))
+        # Orphans: one uploaded two days ago, with a derivative, and one just uploaded
+        self.old = photo_storage.save('candidates_photos/old.png', ContentFile(self.get_image(color='green')))
+        self.old_derivative = photo_storage.save_as(get_derivative_name(self.old, 64, 'webp'), ContentFile(b'webp'))
+        self.recent = photo_storage.save('candidates_photos/recent.png', ContentFile(self.get_image(color='blue')))
+        two_days_ago = time.time() - 48 * 3600
+
+        for name in (self.photo, *get_derivative_names(self.photo), self.old, self.old_derivative):
+            os.utime(photo_storage.path(name), (two_days_ago, two_days_ago))
+
+    def collect(self, *args):
+        output = io.StringIO()
+        call_command('collect_orphaned_photos', *args, stdout=output)
+
+        return output.getvalue()
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.collect('--dry-run')
+
+        self.assertIn('2 orphaned files would be collected', output)
+
+        for name in (self.old, self.old_derivative, self.recent):
+            self.assertTrue(photo_storage.exists(name), name)
+
+    def test_orphans_past_the_grace_period_are_deleted(self):
+        output = self.collect()
+
+        self.assertIn('2 orphaned files deleted', output)
+        self.assertFalse(photo_storage.exists(self.old))
+        self.assertFalse(photo_storage.exists(self.old_derivative))
+        # Inside the default 24 hours grace period
+        self.assertTrue(photo_storage.exists(self.recent))
+        # Referenced, and derived from a referenced photo
+        self.assertStored(self.photo)
+
+    def test_grace_period_can_be_shortened(self):
+        self.collect('--grace-hours', '0')
+
+        self.assertFalse(photo_storage.exists(self.recent))
+        self.assertStored(self.photo)
+
+    def test_orphans_can_be_quarantined(self):
+        quarantine = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, quarantine, ignore_errors=True)
+
+        self.collect('--quarantine', quarantine)
+
+        self.assertFalse(photo_storage.exists(self.old))
+        self.assertTrue(os.path.exists(os.path.join(quarantine, self.old)))
+        self.assertStored(self.photo)
+
+class SendFileTests(CandidatePhotoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.candidate = self.create_candidate()
+        self.photo = self.set_photo(self.candidate, self.get_image((40, 30)))
+        self.content = photo_storage.open(self.photo).read()
+        self.url = reverse('get_candidate_photo', args=[self.photo])
+
+    def test_parse_range(self):
+        cases = [
+            (None, None),
+            ('bytes=0-9', (0, 9)),
+            ('bytes=10-', (10, 99)),
+            ('bytes=-10', (90, 99)),
+            ('bytes=90-200', (90, 99)),
+            ('bytes=100-', False),
+            ('bytes=20-10', False),
+            ('bytes=-0', False),
+            ('bytes=0-1,5-6', None),
+            ('items=0-9', None),
+            ('bytes=-', None),
+        ]
+
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_byte_range(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+
+        # A stale If-Range gets the whole file instead
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_web_server_offload(self):
+        with override_settings(SENDFILE_BACKEND='x-accel-redirect', SENDFILE_URL='/protected-media/'):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.photo}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'image/png')
+
+        with override_settings(SENDFILE_BACKEND='x-sendfile'):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response['X-Sendfile'], photo_storage.path(self.photo))
+        self.assertEqual(response.content, b'')
+
+    def test_unreferenced_and_traversing_names_are_not_found(self):
+        outside = os.path.join(os.path.dirname(photo_storage.path('')), 'secret.txt')
+
+        with open(outside, 'w') as file:
+            file.write('secret')
+
+        self.addCleanup(os.remove, outside)
+
+        for name in ('../secret.txt', 'candidates_photos/../../secret.txt', '../secret.txt.64.webp', 'candidates_photos/unknown.png'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse('get_candidate_photo', args=[name])).status_code, 404)
+
+        # Even when a row points outside the media root, and the web server would serve the file
+        Candidate.objects.filter(pk=self.candidate.pk).update(photo='../secret.txt')
+
+        for backend in ('', 'x-accel-redirect', 'x-sendfile'):
+            with self.subTest(backend=backend), override_settings(SENDFILE_BACKEND=backend):
+                response = self.client.get(reverse('get_candidate_photo', args=['../secret.txt']))
+
+                self.assertEqual(response.status_code, 404)
+                self.assertFalse(response.has_header('X-Accel-Redirect'))
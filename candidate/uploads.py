@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from .imaging import process_photo
+import multiprocessing
+import threading
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Stream uploaded files to a temporary file on disk, aborting the upload as soon as it grows past `max_size` bytes.
+    """
+    def __init__(self, request=None, max_size=None):
+        super().__init__(request)
+        self.max_size = max_size
+        self.exceeded = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.max_size is not None and start + len(raw_data) > self.max_size:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+
+        return super().receive_data_chunk(raw_data, start)
+
+class PhotoProcessorBusy(Exception):
+    pass
+
+class PhotoProcessor:
+    """
+    Bounded process pool that decodes, downscales and strips uploaded photos away from the request workers.
+
+    At most twice PHOTO_PROCESS_WORKERS jobs are queued or running; past that, submit() raises PhotoProcessorBusy instead of piling up work.
+
+    process() still holds the calling request worker until the job is done: the decode runs in another process, so the worker only waits
+    (without the GIL) rather than computes, and the wait is capped by PHOTO_PROCESS_TIMEOUT and by the queue bound. In exchange the upload is
+    answered with the saved photo, or with a 400 for an image that cannot be used, instead of a 202 and a result to poll for.
+    """
+    def __init__(self):
+        self.executor = None
+        self.semaphore = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                workers = settings.PHOTO_PROCESS_WORKERS
+                # Forking a multi-threaded server process is unsafe, and the worker module does not need Django
+                self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                self.semaphore = threading.BoundedSemaphore(workers * 2)
+
+            return self.executor
+
+    def submit(self, path):
+        executor = self.get_executor()
+
+        if not self.semaphore.acquire(blocking=False):
+            raise PhotoProcessorBusy('Too many photos are being processed. Please retry.')
+
+        try:
+            future = executor.submit(process_photo, path, settings.PHOTO_MAX_DIMENSION, settings.PHOTO_MAX_PIXELS)
+        except Exception:
+            self.semaphore.release()
+            raise
+
+        # Released when the job really ends, even if the request stopped waiting for it
+        future.add_done_callback(lambda future: self.semaphore.release())
+
+        return future
+
+    def process(self, path):
+        return self.submit(path).result(timeout=settings.PHOTO_PROCESS_TIMEOUT)
+
+photo_processor = PhotoProcessor()
@@ -3,8 +3,13 @@ from .views import *
 
 urlpatterns = [
     path('', GetCandidates.as_view(), name='get_candidates'),
+    path('export/', ExportCandidates.as_view(), name='export_candidates'),
+    path('similar-name/', SimilarCandidateNames.as_view(), name='similar_candidate_names'),
     path('create/', CreateCandidate.as_view(), name='create_candidate'),
+    path('batch/', CreateCandidateBatch.as_view(), name='create_candidate_batch'),
     path('<uuid:pk>/detail/', DetailCandidate.as_view(), name='detail_candidate'),
+    path('photos/<path:name>', GetCandidatePhoto.as_view(), name='get_candidate_photo'),
+    path('<uuid:pk>/photo/', UploadCandidatePhoto.as_view(), name='upload_candidate_photo'),
     path('<uuid:pk>/update/', UpdateCandidate.as_view(), name='update_candidate'),
     path('<uuid:pk>/delete/', DeleteCandidate.as_view(), name='delete_candidate'),
 ]
\ No newline at end of file
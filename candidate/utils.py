@@ -1,13 +1,24 @@
 import hashlib
 import os
 
+PHOTOS_DIRECTORY = 'candidates_photos'
+
 def generate_file_path(instance, filename):
     """
     Return a unique filename using SHA-256 for better security.
+
+    Photos are saved through ContentAddressedStorage, which keeps only the directory and the extension of this path and names the file
+    after the hash of its content.
     """
 
     hash_object = hashlib.sha256(filename.encode())
     hash_filename = hash_object.hexdigest()
     extension = os.path.splitext(filename)[1]
 
-    return f"candidates_photos/{hash_filename}{extension}"
\ No newline at end of file
+    return f"{PHOTOS_DIRECTORY}/{hash_filename}{extension}"
+
+def get_file_name(value):
+    """
+    Return the stored name of a file field value (a FieldFile or the raw string), or None when empty.
+    """
+    return getattr(value, 'name', value) or None
@@ -1,26 +1,235 @@
+from counter.models import Counter
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Subquery
+from django.template.defaultfilters import filesizeformat
+from django.utils.http import quote_etag
 from rest_framework import response, status
+from rest_framework.exceptions import ParseError, UnsupportedMediaType, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from .models import Candidate
-from .serializers import CandidateSerializer
+from utils.cache import cached_response
+from utils.conditional import conditional_response, get_last_modified
+from utils.helpers import QuerysetHelper, RequestHelper
+from utils.pagination import KeysetPagination
+from utils.sendfile import send_file
+from utils.streaming import QuerysetStreamer
+from uuid import UUID
+from .derivatives import FORMATS, parse_derivative_name, photo_derivatives
+from .filters import CandidateFilter
+from .imaging import PhotoRejected
+from .models import Address, Candidate, CandidateSearchToken, Contact, SocialMedia
+from .search import search_fields
+from .serializers import CandidateBatchSerializer, CandidateSerializer, CandidateValuesSerializer
+from .similarity import find_similar, get_trigrams
+from .uploads import LimitedTemporaryFileUploadHandler, PhotoProcessorBusy, photo_processor
 import json
+import mimetypes
+
+def get_expanded(request):
+    expand = RequestHelper.get_list_param(request.query_params, 'expand')
+
+    return CandidateSerializer.resolve_fields(expand=expand)[1]
+
+def get_candidates_version(request):
+    # Rows embedded by ?expand= can change without touching the candidates that reference them
+    expanded = [CandidateSerializer.expandable_fields[name].Meta.model.objects.all() for name in get_expanded(request)]
+    last_modified = get_last_modified(Candidate.objects.all(), Contact.objects.all(), Address.objects.all(), SocialMedia.objects.all(), *expanded)
+
+    return last_modified, Counter.objects.total(Candidate)
+
+def get_candidate_version(request, pk):
+    children = {
+        f'{model._meta.db_table}_updated_at': Subquery(model.objects.filter(candidate=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1])
+        for model in (Contact, Address, SocialMedia)
+    }
+    expanded = [f'{name}__updated_at' for name in get_expanded(request)]
+    row = Candidate.objects.filter(pk=pk).annotate(**children).values_list('updated_at', *children, *expanded).first()
+
+    if row is None:
+        return None
+
+    return max(value for value in row if value is not None), ''
 
 class GetCandidates(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request: ['candidate', 'candidate:list'])
+    @conditional_response(get_candidates_version)
     def get(self, request):
         try:
-            candidates = Candidate.objects.all()
-            serializer = CandidateSerializer(candidates, many=True)
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+            paginator = KeysetPagination(ordering=['first_name', 'last_name', 'id'])
+            search_query = request.query_params.get('search')
+            filtered = QuerysetHelper.apply_filters(Candidate.objects.all(), CandidateFilter, request.query_params)
+            filtered = QuerysetHelper.apply_search(filtered, search_query, search_fields, tokens=CandidateSearchToken)
+
+            if fields is None and expand is None:
+                # The full representation is built from values() rows, skipping ModelSerializer instantiation
+                candidates = CandidateValuesSerializer.get_queryset(filtered)
+                page = paginator.paginate_queryset(candidates, request)
+                serializer = CandidateValuesSerializer(page)
+            else:
+                candidates = CandidateSerializer.setup_eager_loading(filtered, fields=fields, expand=expand)
+                page = paginator.paginate_queryset(candidates, request)
+                serializer = CandidateSerializer(page, many=True, fields=fields, expand=expand)
+
+            # The maintained counter only knows the total
+            if search_query or QuerysetHelper.has_filters(CandidateFilter, request.query_params):
+                count = filtered.count()
+            else:
+                count = Counter.objects.total(Candidate)
+
             data = {
                 'status': 'success',
-                'count': candidates.count(),
+                'count': count,
+                'next': paginator.next_cursor,
+                'previous': paginator.previous_cursor,
                 'data': {
                     'candidates': serializer.data
                 }
             }
 
             return response.Response(data=data, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+class ExportCandidates(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            output = request.query_params.get('output', 'json')
+
+            if output not in QuerysetStreamer.content_types:
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'output': [
+                            'Output must be one of: json, ndjson.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+            filtered = QuerysetHelper.apply_filters(Candidate.objects.order_by('first_name', 'last_name', 'id'), CandidateFilter, request.query_params)
+            filtered = QuerysetHelper.apply_search(filtered, request.query_params.get('search'), search_fields, tokens=CandidateSearchToken)
+            candidates = CandidateSerializer.setup_eager_loading(filtered, fields=fields, expand=expand)
+            streamer = QuerysetStreamer(candidates, CandidateSerializer, fields=fields, expand=expand)
+
+            return streamer.response(output, filename='candidates')
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+class SimilarCandidateNames(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @cached_response(lambda request: ['candidate', 'candidate:list'])
+    def get(self, request):
+        try:
+            query = request.query_params.get('q', '')
+
+            if not get_trigrams(query):
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'q': [
+                            'This field is required.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            threshold = request.query_params.get('threshold')
+
+            if threshold is not None:
+                try:
+                    threshold = float(threshold)
+                except ValueError:
+                    raise ValidationError({'threshold': ['A valid number is required.']})
+
+                if not 0 < threshold <= 1:
+                    raise ValidationError({'threshold': ['Ensure this value is greater than 0 and less than or equal to 1.']})
+
+            matches = [{'score': score, 'id': candidate_id} for candidate_id, score in find_similar(query, threshold)]
+
+            def fetch(position, reverse, limit):
+                if position is None:
+                    rows = matches
+                else:
+                    try:
+                        position = (-float(position[0]), UUID(str(position[1])).hex)
+                    except (TypeError, ValueError):
+                        raise ValidationError({'cursor': ['Invalid cursor.']})
+
+                    # The matches are few and already ranked, so the seek is done on the list
+                    if reverse:
+                        rows = [row for row in reversed(matches) if (-row['score'], row['id']) < position]
+                    else:
+                        rows = [row for row in matches if (-row['score'], row['id']) > position]
+
+                return rows[:limit]
+
+            # Most similar first; the candidate id breaks ties so the cursor position is unique
+            paginator = KeysetPagination(ordering=['-score', 'id'])
+            page = paginator.paginate(fetch, request)
+            candidates = CandidateValuesSerializer.get_queryset(Candidate.objects.filter(pk__in=[row['id'] for row in page]))
+            candidates = {UUID(str(candidate['id'])).hex: candidate for candidate in CandidateValuesSerializer(list(candidates)).data}
+
+            data = {
+                'status': 'success',
+                'count': len(matches),
+                'next': paginator.next_cursor,
+                'previous': paginator.previous_cursor,
+                'data': {
+                    'candidates': [{**candidates[row['id']], 'score': round(row['score'], 4)} for row in page if row['id'] in candidates]
+                }
+            }
+
+            return response.Response(data=data, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             data = {
                 'status': 'error',
@@ -65,13 +274,70 @@ class CreateCandidate(APIView):
 
             return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class CreateCandidateBatch(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = CandidateBatchSerializer(data=request.data)
+
+        try:
+            if not serializer.is_valid():
+                data = {
+                    'status': 'error',
+                    'errors': serializer.errors
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            results = serializer.save()
+            created = sum(result['status'] == 'created' for result in results)
+
+            if created == len(results):
+                batch_status, status_code = 'success', status.HTTP_201_CREATED
+            elif created:
+                batch_status, status_code = 'partial', status.HTTP_207_MULTI_STATUS
+            else:
+                batch_status, status_code = 'error', status.HTTP_400_BAD_REQUEST
+
+            data = {
+                'status': batch_status,
+                'count': created,
+                'data': {
+                    'results': results
+                }
+            }
+
+            return response.Response(data=data, status=status_code)
+        except IntegrityError:
+            data = {
+                'status': 'error',
+                'errors': [
+                    'The batch conflicts with candidates created concurrently. Please retry.'
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_409_CONFLICT)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
 class DetailCandidate(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request, pk: ['candidate', f'candidate:{pk}'])
+    @conditional_response(get_candidate_version)
     def get(self, request, pk):
         try:
-            candidate = Candidate.objects.get(pk=pk)
-            serializer = CandidateSerializer(candidate)
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+            candidate = CandidateSerializer.setup_eager_loading(Candidate.objects.all(), fields=fields, expand=expand).get(pk=pk)
+            serializer = CandidateSerializer(candidate, fields=fields, expand=expand)
             data = {
                 'status': 'success',
                 'data': {
@@ -99,6 +365,62 @@ class DetailCandidate(APIView):
 
             return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class GetCandidatePhoto(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, name):
+        try:
+            storage = photo_derivatives.storage
+            derivative = parse_derivative_name(name)
+            original = derivative[0] if derivative else name
+            # Names resolving outside the media root raise SuspiciousFileOperation, whatever the rows or the sendfile backend say
+            storage.path(name)
+
+            # Only photos some candidate references, and their derivatives, are served
+            if not Candidate.objects.filter(photo=original).exists():
+                data = {
+                    'status': 'error',
+                    'errors': [
+                        'Photo not found.'
+                    ]
+                }
+
+                return response.Response(data=data, status=status.HTTP_404_NOT_FOUND)
+
+            if derivative:
+                original, size, format = derivative
+                content_type = FORMATS[format][1]
+                # Rendered now if the background job has not produced it yet
+                name = photo_derivatives.ensure(original, size, format)
+            else:
+                content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+            # A content-addressed name always designates the same bytes; older names may be reused, so those are revalidated
+            if storage.is_content_addressed(original):
+                cache_control = 'private, max-age=31536000, immutable'
+            else:
+                cache_control = 'private, no-cache'
+
+            return send_file(request, storage, name, content_type, etag=quote_etag(name), cache_control=cache_control)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            data = {
+                'status': 'error',
+                'errors': [
+                    'Photo not found.'
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
 class UpdateCandidate(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -121,6 +443,13 @@ class UpdateCandidate(APIView):
                 'errors': formatted_errors
             }
 
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
             return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Candidate.DoesNotExist:
             data = {
@@ -158,6 +487,13 @@ class UpdateCandidate(APIView):
                 'errors': formatted_errors
             }
 
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
             return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Candidate.DoesNotExist:
             data = {
@@ -178,6 +514,109 @@ class UpdateCandidate(APIView):
 
             return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class UploadCandidatePhoto(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, pk):
+        max_size = settings.PHOTO_UPLOAD_MAX_SIZE
+        # Streamed to a temporary file instead of memory, and cut off as soon as it is too large
+        handler = LimitedTemporaryFileUploadHandler(request, max_size)
+        request.upload_handlers = [handler]
+        too_large = {
+            'status': 'error',
+            'errors': [
+                f'The photo cannot be larger than {filesizeformat(max_size)}.'
+            ]
+        }
+
+        try:
+            candidate = Candidate.objects.get(pk=pk)
+
+            # Multipart framing adds a little to the file itself
+            if int(request.META.get('CONTENT_LENGTH') or 0) > max_size + 64 * 1024:
+                return response.Response(data=too_large, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+            upload = request.FILES.get('photo')
+
+            if handler.exceeded:
+                return response.Response(data=too_large, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+            if upload is None:
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'photo': [
+                            'No file was submitted.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            content, extension = photo_processor.process(upload.temporary_file_path())
+
+            # The storage names the file by its content hash; saving also queues the derivatives and the removal of the old photo
+            with transaction.atomic():
+                candidate.photo.save(f'photo{extension}', ContentFile(content))
+
+            serializer = CandidateSerializer(candidate, fields=['id', 'photo', 'photo_variants'])
+            data = {
+                'status': 'success',
+                'data': {
+                    'candidate': serializer.data
+                }
+            }
+
+            return response.Response(data=data, status=status.HTTP_200_OK)
+        except Candidate.DoesNotExist:
+            data = {
+                'status': 'error',
+                'errors': [
+                    'Candidate not found.'
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_404_NOT_FOUND)
+        except PhotoRejected as e:
+            data = {
+                'status': 'error',
+                'errors': {
+                    'photo': [
+                        str(e)
+                    ]
+                }
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except (ParseError, UnsupportedMediaType) as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e.detail)
+                ]
+            }
+
+            return response.Response(data=data, status=e.status_code)
+        except (PhotoProcessorBusy, TimeoutError):
+            data = {
+                'status': 'error',
+                'errors': [
+                    'The photo could not be processed right now. Please retry.'
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
 class DeleteCandidate(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Counter
+
+# Register your models here.
+@admin.register(Counter)
+class CounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+    search_fields = ['name']
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from candidate.models import Candidate
+from employee.models import Employee
+from resume.models import Resume
+from counter.models import Counter
+
+class Command(BaseCommand):
+    help = 'Rebuild the list counters from the current table contents.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Other rows (e.g. the reference data version) are not counts and are left alone
+            Counter.objects.filter(name__in=[Counter.objects.key(model) for model in (Candidate, Employee, Resume)]).delete()
+            Counter.objects.filter(name__startswith=f'{Counter.objects.key(Resume)}:').delete()
+
+            counters = [
+                Counter(name=Counter.objects.key(model), value=model.objects.count())
+                for model in (Candidate, Employee, Resume)
+            ]
+
+            for row in Resume.objects.order_by().values('status_id').annotate(total=Count('id')):
+                counters.append(Counter(name=Counter.objects.key(Resume, status_id=row['status_id']), value=row['total']))
+
+            Counter.objects.bulk_create(counters)
+
+        for counter in counters:
+            self.stdout.write(f'{counter.name}: {counter.value}')
+
+        self.stdout.write(self.style.SUCCESS(f'{len(counters)} counters rebuilt.'))
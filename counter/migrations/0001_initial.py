@@ -0,0 +1,30 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:03
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Nome')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Valor')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Contador',
+                'verbose_name_plural': 'Contadores',
+                'db_table': 'counters',
+                'ordering': ['name'],
+            },
+        ),
+    ]
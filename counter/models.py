@@ -0,0 +1,71 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+import uuid
+
+# Create your models here.
+class CounterManager(models.Manager):
+    def key(self, model, **scope):
+        """
+        Return the counter name for a model, optionally narrowed by field values (e.g. status_id).
+        """
+        parts = [model._meta.label_lower]
+
+        for field, value in sorted(scope.items()):
+            value = model._meta.get_field(field).to_python(value)
+            parts.append(f'{field}={value}')
+
+        return ':'.join(parts)
+
+    def increment(self, model, delta=1, **scope):
+        name = self.key(model, **scope)
+        updated = self.filter(name=name).update(value=F('value') + delta, updated_at=timezone.now())
+
+        if not updated:
+            # The counter has never been seeded, so start it from the real count, which already reflects this change
+            self.get_or_create(name=name, defaults={'value': model._default_manager.filter(**scope).count()})
+
+    def decrement(self, model, delta=1, **scope):
+        self.increment(model, -delta, **scope)
+
+    def total(self, model, **scope):
+        name = self.key(model, **scope)
+        value = self.filter(name=name).values_list('value', flat=True).first()
+
+        if value is None:
+            counter, created = self.get_or_create(name=name, defaults={'value': model._default_manager.filter(**scope).count()})
+            value = counter.value
+
+        return value
+
+class Counter(models.Model):
+    class Meta:
+        db_table = 'counters'
+        verbose_name = 'Contador'
+        verbose_name_plural = 'Contadores'
+        ordering = ['name']
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False,
+        verbose_name='ID'
+    )
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Nome'
+    )
+    value = models.BigIntegerField(
+        default=0,
+        verbose_name='Valor'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Atualizado em'
+    )
+
+    objects = CounterManager()
+
+    def __str__(self):
+        return self.name
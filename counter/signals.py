@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from candidate.models import Candidate
+from employee.models import Employee
+from resume.models import Resume
+from resume.signals import resume_status_changed
+from .models import Counter
+
+@receiver(post_save, sender=Candidate)
+@receiver(post_save, sender=Employee)
+def increment_total(sender, instance, created, **kwargs):
+    if created:
+        Counter.objects.increment(sender)
+
+@receiver(post_delete, sender=Candidate)
+@receiver(post_delete, sender=Employee)
+def decrement_total(sender, instance, **kwargs):
+    Counter.objects.decrement(sender)
+
+@receiver(post_save, sender=Resume)
+def update_resume_counters(sender, instance, created, **kwargs):
+    if created:
+        Counter.objects.increment(Resume)
+        Counter.objects.increment(Resume, status_id=instance.status_id)
+    elif instance.loaded_status_id is not None and instance.loaded_status_id != instance.status_id:
+        Counter.objects.decrement(Resume, status_id=instance.loaded_status_id)
+        Counter.objects.increment(Resume, status_id=instance.status_id)
+
+    instance.loaded_status_id = instance.status_id
+
+@receiver(post_delete, sender=Resume)
+def decrement_resume_counters(sender, instance, **kwargs):
+    Counter.objects.decrement(Resume)
+    Counter.objects.decrement(Resume, status_id=instance.status_id)
+
+@receiver(resume_status_changed, sender=Resume)
+def move_resume_counters(sender, status, previous, count, **kwargs):
+    for status_id, moved in previous.items():
+        Counter.objects.decrement(Resume, moved, status_id=status_id)
+
+    Counter.objects.increment(Resume, count, status_id=status.pk)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EmployeeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employee'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0002_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['first_name', 'last_name', 'id'], name='employees_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_employee_employees_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['updated_at'], name='employees_updated_at_idx'),
+        ),
+    ]
@@ -9,6 +9,10 @@ class Employee(AbstractUser):
         verbose_name = 'Funcionário'
         verbose_name_plural = 'Funcionários'
         ordering = ['first_name', 'last_name']
+        indexes = [
+            models.Index(fields=['first_name', 'last_name', 'id'], name='employees_name_id_idx'),
+            models.Index(fields=['updated_at'], name='employees_updated_at_idx'),
+        ]
         
     id = models.UUIDField(
         primary_key=True,
@@ -1,8 +1,16 @@
+from django.contrib.auth.models import Group, Permission
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import Prefetch
 from rest_framework import serializers
+from utils.mixins import EagerLoadingMixin
 from .models import Employee
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = {
+        'groups': Prefetch('groups', queryset=Group.objects.only('id')),
+        'user_permissions': Prefetch('user_permissions', queryset=Permission.objects.only('id')),
+    }
+
     class Meta:
         model = Employee
         fields = ['id', 'first_name', 'last_name', 'username', 'email', 'password', 'is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions', 'last_login', 'date_joined', 'updated_at']
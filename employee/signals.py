@@ -0,0 +1,43 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from utils.cache import response_cache
+from .models import Employee
+
+def employees_touched(ids):
+    # Membership lives in the through tables, so updated_at is moved forward to keep the conditional GET versions honest
+    ids = list(ids)
+    now = timezone.now()
+
+    if ids:
+        Employee.objects.filter(pk__in=ids).update(updated_at=now)
+
+    return now
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+def employee_changed(sender, instance, **kwargs):
+    response_cache.bump_on_commit('employee:list', f'employee:{instance.pk}')
+
+@receiver(m2m_changed, sender=Employee.groups.through)
+@receiver(m2m_changed, sender=Employee.user_permissions.through)
+def employee_relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # pk_set is not provided on clear, so collect the employees before the rows are gone
+        instance._cleared_employee_ids = list(instance.employee_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        # Reverse changes (from a group or permission) can touch any employee
+        if reverse:
+            employees_touched(getattr(instance, '_cleared_employee_ids', []) if action == 'post_clear' else pk_set)
+            response_cache.bump_on_commit('employee')
+        else:
+            instance.updated_at = employees_touched([instance.pk])
+            response_cache.bump_on_commit('employee:list', f'employee:{instance.pk}')
+
+@receiver(pre_delete, sender=Group)
+@receiver(pre_delete, sender=Permission)
+def employee_relation_deleting(sender, instance, **kwargs):
+    # The through rows are removed without m2m_changed
+    employees_touched(instance.employee_set.values_list('pk', flat=True))
+    response_cache.bump_on_commit('employee')
@@ -1,3 +1,44 @@
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from .models import Employee
 
-# Create your tests here.
+class EmployeeVersionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create_user(username='ana', password='senha-segura-123', first_name='Ana')
+        self.group = Group.objects.create(name='Recrutadores')
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def get_etags(self):
+        list_response = self.client.get(reverse('get_employees'))
+        detail_response = self.client.get(reverse('detail_employee', args=[self.employee.pk]))
+
+        return list_response['ETag'], detail_response['ETag']
+
+    def assertMembershipChangesVersion(self, change):
+        before = self.get_etags()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+
+        after = self.get_etags()
+        self.assertNotEqual(before[0], after[0])
+        self.assertNotEqual(before[1], after[1])
+
+    def test_group_added_to_employee(self):
+        self.assertMembershipChangesVersion(lambda: self.employee.groups.add(self.group))
+
+    def test_employee_added_to_group(self):
+        self.assertMembershipChangesVersion(lambda: self.group.employee_set.add(self.employee))
+
+    def test_group_cleared(self):
+        self.employee.groups.add(self.group)
+        self.assertMembershipChangesVersion(lambda: self.group.employee_set.clear())
+
+    def test_group_deleted(self):
+        self.employee.groups.add(self.group)
+        self.assertMembershipChangesVersion(lambda: self.group.delete())
@@ -1,25 +1,60 @@
+from counter.models import Counter
+from django.db.models import Max
 from rest_framework import response, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from utils.cache import cached_response
+from utils.conditional import conditional_response
+from utils.pagination import KeysetPagination
+from utils.streaming import QuerysetStreamer
 from .models import Employee
 from .serializers import EmployeeSerializer
 
+def get_employees_version(request):
+    # last_login is saved alone (update_fields) and never touches updated_at
+    row = Employee.objects.aggregate(updated_at=Max('updated_at'), last_login=Max('last_login'))
+    values = [value for value in row.values() if value is not None]
+
+    return (max(values) if values else None), Counter.objects.total(Employee)
+
+def get_employee_version(request, pk):
+    row = Employee.objects.filter(pk=pk).values_list('updated_at', 'last_login').first()
+
+    if row is None:
+        return None
+
+    return max(value for value in row if value is not None), ''
+
 class GetEmployees(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request: ['employee', 'employee:list'])
+    @conditional_response(get_employees_version)
     def get(self, request):
         try:
-            employees = Employee.objects.all()
-            serializer = EmployeeSerializer(employees, many=True)
+            employees = EmployeeSerializer.setup_eager_loading(Employee.objects.all())
+            paginator = KeysetPagination(ordering=['first_name', 'last_name', 'id'])
+            page = paginator.paginate_queryset(employees, request)
+            serializer = EmployeeSerializer(page, many=True)
             data = {
                 'status': 'success',
-                'count': employees.count(),
+                'count': Counter.objects.total(Employee),
+                'next': paginator.next_cursor,
+                'previous': paginator.previous_cursor,
                 'data': {
                     'employees': serializer.data
                 }
             }
 
             return response.Response(data=data, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             data = {
                 'status': 'error',
@@ -30,6 +65,39 @@ class GetEmployees(APIView):
 
             return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+class ExportEmployees(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            output = request.query_params.get('output', 'json')
+
+            if output not in QuerysetStreamer.content_types:
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'output': [
+                            'Output must be one of: json, ndjson.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            employees = EmployeeSerializer.setup_eager_loading(Employee.objects.order_by('first_name', 'last_name', 'id'))
+            streamer = QuerysetStreamer(employees, EmployeeSerializer)
+
+            return streamer.response(output, filename='employees')
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
 class CreateEmployee(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -63,9 +131,11 @@ class CreateEmployee(APIView):
 class DetailEmployee(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request, pk: ['employee', f'employee:{pk}'])
+    @conditional_response(get_employee_version)
     def get(self, request, pk):
         try:
-            employee = Employee.objects.get(id=pk)
+            employee = EmployeeSerializer.setup_eager_loading(Employee.objects.all()).get(id=pk)
             serializer = EmployeeSerializer(employee)
             data = {
                 'status': 'success',
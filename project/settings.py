@@ -50,6 +50,8 @@ INSTALLED_APPS = [
     'employee.apps.EmployeeConfig',
     'candidate.apps.CandidateConfig',
     'resume.apps.ResumeConfig',
+    'counter.apps.CounterConfig',
+    'reference.apps.ReferenceConfig',
 ]
 
 MIDDLEWARE = [
@@ -144,6 +146,19 @@ MEDIA_URL = 'media/'
 
 MEDIA_ROOT = BASE_DIR / 'media/'
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The response cache is invalidated through versions stored in this cache, so deployments with several worker processes need a shared
+# backend (e.g. Redis or Memcached) here.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 300))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -176,6 +191,50 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Pagination settings
+
+PAGE_SIZE = 50
+
+MAX_PAGE_SIZE = 500
+
+EXPORT_CHUNK_SIZE = 500
+
+# Batch settings
+
+CANDIDATE_BATCH_MAX_SIZE = 500
+
+RESUME_STATUS_BATCH_MAX_SIZE = 10000
+
+# Photo upload settings
+
+PHOTO_UPLOAD_MAX_SIZE = 15 * 1024 * 1024
+
+PHOTO_MAX_PIXELS = 50_000_000
+
+PHOTO_MAX_DIMENSION = 2048
+
+PHOTO_PROCESS_WORKERS = int(os.getenv('PHOTO_PROCESS_WORKERS', 2))
+
+PHOTO_PROCESS_TIMEOUT = 30
+
+# Similar name search settings
+
+# Minimum trigram similarity (0 to 1) of the names returned
+SIMILAR_NAME_THRESHOLD = 0.3
+
+# Upper bounds on the trigram postings read and on the names scored per search
+SIMILAR_NAME_MAX_POSTINGS = 40_000
+
+SIMILAR_NAME_MAX_CANDIDATES = 1_000
+
+# File delivery settings
+
+# 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache, lighttpd) hands protected files to the web server; empty streams them from Django
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', '')
+
+# nginx location marked `internal` with `alias` pointing at MEDIA_ROOT
+SENDFILE_URL = os.getenv('SENDFILE_URL', '/protected-media/')
+
 # Simple JWT settings
 
 SIMPLE_JWT = {
@@ -20,11 +20,14 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
+from utils.views import ResponseCacheStats
 
 api_routes = [
     path('employees/', include('employee.urls')),
     path('candidates/', include('candidate.urls')),
     path('resumes/', include('resume.urls')),
+    path('references/', include('reference.urls')),
+    path('cache/stats/', ResponseCacheStats.as_view(), name='response_cache_stats'),
 ]
 
 urlpatterns = [
@@ -35,6 +38,6 @@ urlpatterns = [
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
 ]
 
+# Media (candidate photos) is only served by authenticated views, never as public static files
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
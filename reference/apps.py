@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.core.signals import request_started
+
+
+class ReferenceConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reference'
+
+    def ready(self):
+        from . import signals
+        from .cache import reference_cache
+
+        # Querying inside ready() is discouraged by Django and breaks migrate on an empty database, so the tables are loaded right before the
+        # first request the process serves instead
+        request_started.connect(reference_cache.warm, dispatch_uid='reference_cache_warm')
@@ -0,0 +1,80 @@
+from counter.models import Counter
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+from .serializers import REFERENCE_SERIALIZERS
+import gzip
+import hashlib
+import threading
+import time
+
+class ReferenceCache:
+    """
+    Per-process copy of every lookup table, plus the pre-rendered and gzipped bundle of all of them.
+
+    The copy is tagged with a version kept in the counters table, which every process reads (the default cache backend is per process);
+    writes to a lookup bump it in the same transaction, so every process reloads on its next read instead of waiting for a TTL.
+    """
+    version_name = 'reference:version'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.references = {}
+        self.etags = {}
+        self.bundle = None
+
+    def get_version(self):
+        return Counter.objects.filter(name=self.version_name).values_list('value', flat=True).first()
+
+    def invalidate(self):
+        # Committed together with the lookup change, so a reader never pairs the new version with the old rows
+        updated = Counter.objects.filter(name=self.version_name).update(value=F('value') + 1, updated_at=timezone.now())
+
+        if not updated:
+            # A fresh, never reused starting point, in case the row was deleted while processes kept their copy
+            Counter.objects.get_or_create(name=self.version_name, defaults={'value': time.time_ns()})
+
+    def load(self, version):
+        references = {name: serializer(serializer.get_queryset()).data for name, serializer in REFERENCE_SERIALIZERS.items()}
+        renderer = JSONRenderer()
+        etags = {
+            name: quote_etag(hashlib.sha256(renderer.render(data)).hexdigest()[:40])
+            for name, data in references.items()
+        }
+        content = renderer.render({'status': 'success', 'data': references})
+        bundle = {
+            'content': content,
+            'gzip': gzip.compress(content, compresslevel=9),
+            'etag': quote_etag(hashlib.sha256(content).hexdigest()[:40]),
+        }
+
+        # Swapped in one go, so a concurrent reader never sees tables from two different versions
+        self.references, self.etags, self.bundle, self.version = references, etags, bundle, version
+
+    def refresh(self):
+        version = self.get_version()
+
+        if version != self.version or self.bundle is None:
+            with self.lock:
+                if version != self.version or self.bundle is None:
+                    self.load(version)
+
+        return self
+
+    def warm(self, **kwargs):
+        from django.core.signals import request_started
+
+        request_started.disconnect(dispatch_uid='reference_cache_warm')
+        self.refresh()
+
+    def get(self, name):
+        self.refresh()
+
+        return self.references[name], self.etags[name]
+
+    def get_bundle(self):
+        return self.refresh().bundle
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,83 @@
+from candidate.models import DriversLicenseCategory, Gender, State, City
+from resume.models import AreaOfInterest, Company, Course, Institution, JobTitle, Language, LanguageLevel, Skill, StatusResume, SubareaOfInterest
+from utils.serializers import ValuesSerializer
+
+class ReferenceValuesSerializer(ValuesSerializer):
+    fields = ['id', 'name']
+
+    @classmethod
+    def get_queryset(cls, queryset=None):
+        if queryset is None:
+            queryset = cls.model.objects.order_by('name', 'id')
+
+        return super().get_queryset(queryset)
+
+class SkillReferenceSerializer(ReferenceValuesSerializer):
+    model = Skill
+
+class AreaOfInterestReferenceSerializer(ReferenceValuesSerializer):
+    model = AreaOfInterest
+
+class SubareaOfInterestReferenceSerializer(ReferenceValuesSerializer):
+    model = SubareaOfInterest
+    fields = ['id', 'name', 'area_of_interest']
+
+class StatusResumeReferenceSerializer(ReferenceValuesSerializer):
+    model = StatusResume
+
+class GenderReferenceSerializer(ReferenceValuesSerializer):
+    model = Gender
+
+class DriversLicenseCategoryReferenceSerializer(ReferenceValuesSerializer):
+    model = DriversLicenseCategory
+
+class StateReferenceSerializer(ReferenceValuesSerializer):
+    model = State
+    fields = ['id', 'name', 'abbreviation']
+
+class CityReferenceSerializer(ReferenceValuesSerializer):
+    model = City
+    fields = ['id', 'name', 'state']
+
+class InstitutionReferenceSerializer(ReferenceValuesSerializer):
+    model = Institution
+
+class CourseReferenceSerializer(ReferenceValuesSerializer):
+    model = Course
+
+class CompanyReferenceSerializer(ReferenceValuesSerializer):
+    model = Company
+
+class JobTitleReferenceSerializer(ReferenceValuesSerializer):
+    model = JobTitle
+
+class LanguageReferenceSerializer(ReferenceValuesSerializer):
+    model = Language
+
+class LanguageLevelReferenceSerializer(ReferenceValuesSerializer):
+    model = LanguageLevel
+    fields = ['id', 'name', 'rank']
+
+    @classmethod
+    def get_queryset(cls, queryset=None):
+        if queryset is None:
+            queryset = cls.model.objects.order_by('rank', 'name', 'id')
+
+        return super().get_queryset(queryset)
+
+REFERENCE_SERIALIZERS = {
+    'skills': SkillReferenceSerializer,
+    'areas_of_interest': AreaOfInterestReferenceSerializer,
+    'subareas_of_interest': SubareaOfInterestReferenceSerializer,
+    'status_resumes': StatusResumeReferenceSerializer,
+    'genders': GenderReferenceSerializer,
+    'drivers_license_categories': DriversLicenseCategoryReferenceSerializer,
+    'states': StateReferenceSerializer,
+    'cities': CityReferenceSerializer,
+    'institutions': InstitutionReferenceSerializer,
+    'courses': CourseReferenceSerializer,
+    'companies': CompanyReferenceSerializer,
+    'job_titles': JobTitleReferenceSerializer,
+    'languages': LanguageReferenceSerializer,
+    'language_levels': LanguageLevelReferenceSerializer,
+}
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_delete, post_save
+from .cache import reference_cache
+from .serializers import REFERENCE_SERIALIZERS
+
+def reference_changed(sender, instance, **kwargs):
+    reference_cache.invalidate()
+
+for serializer in REFERENCE_SERIALIZERS.values():
+    post_save.connect(reference_changed, sender=serializer.model)
+    post_delete.connect(reference_changed, sender=serializer.model)
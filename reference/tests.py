@@ -0,0 +1,81 @@
+from candidate.models import City, State
+from counter.models import Counter
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from employee.models import Employee
+from resume.models import Skill
+from rest_framework.test import APIClient
+from utils.helpers import QuerysetHelper
+from .cache import ReferenceCache, reference_cache
+from .serializers import CityReferenceSerializer
+import io
+
+class ReferenceCacheTests(TestCase):
+    def test_other_process_sees_the_change(self):
+        # Another worker: its own copy, and its own per-process cache backend
+        other = ReferenceCache()
+        other.get('skills')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Python')
+
+        references, etag = other.get('skills')
+        self.assertEqual([skill['name'] for skill in references], ['Python'])
+
+    def test_unchanged_version_is_not_reloaded(self):
+        other = ReferenceCache()
+        bundle = other.get_bundle()
+        # The version is not kept in the per-process cache backend
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            self.assertIs(other.get_bundle(), bundle)
+
+    def test_rebuild_counters_keeps_the_version(self):
+        Skill.objects.create(name='Python')
+        version = reference_cache.get_version()
+
+        call_command('rebuild_counters', stdout=io.StringIO())
+
+        self.assertEqual(reference_cache.get_version(), version)
+        self.assertTrue(Counter.objects.filter(name=ReferenceCache.version_name).exists())
+
+class ReferenceSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = Employee.objects.create_user(username='ana', password='senha-segura-123', first_name='Ana')
+        state = State.objects.create(name='São Paulo', abbreviation='SP')
+
+        for name in ('São Paulo', 'São José dos Campos', 'Santos', 'Campinas', 'Sorocaba'):
+            City.objects.create(name=name, state=state)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def search(self, query):
+        response = self.client.get(reverse('get_reference', args=['cities']), {'search': query})
+        self.assertEqual(response.status_code, 200)
+
+        return [city['name'] for city in response.json()['data']['cities']]
+
+    def test_names_starting_with_the_query(self):
+        self.assertEqual(self.search('sao'), ['São José dos Campos', 'São Paulo'])
+        self.assertEqual(self.search('SÃO  pa'), ['São Paulo'])
+        self.assertEqual(self.search('s'), ['Santos', 'Sorocaba', 'São José dos Campos', 'São Paulo'])
+        self.assertEqual(self.search('paulo'), [])
+        # Without a query the whole cached table is returned
+        self.assertEqual(len(self.search('')), 5)
+
+    def test_search_seeks_the_normalized_name_index(self):
+        rows = QuerysetHelper.apply_search(CityReferenceSerializer.get_queryset(), 'sao pa', ['name'], phrase=True)
+        sql, params = rows.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[3] for row in cursor.fetchall())
+
+        self.assertIn('cities_norm_name_idx', plan)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import *
+
+urlpatterns = [
+    path('', GetReferenceBundle.as_view(), name='get_reference_bundle'),
+    path('<str:name>/', GetReference.as_view(), name='get_reference'),
+]
@@ -0,0 +1,105 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework import response, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from utils.helpers import QuerysetHelper
+from .cache import reference_cache
+from .serializers import REFERENCE_SERIALIZERS
+import re
+
+accepts_gzip = re.compile(r'\bgzip\b')
+
+# Create your views here.
+class GetReferenceBundle(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            bundle = reference_cache.get_bundle()
+            compress = bool(accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+            # Each encoding is a different representation, so it gets its own strong validator
+            etag = bundle['etag'][:-1] + '-gzip"' if compress else bundle['etag']
+            result = get_conditional_response(request, etag=etag)
+
+            if result is None:
+                result = HttpResponse(bundle['gzip'] if compress else bundle['content'], content_type='application/json')
+
+                if compress:
+                    result['Content-Encoding'] = 'gzip'
+
+            result['ETag'] = etag
+            result['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(result, ['Accept-Encoding'])
+
+            return result
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class GetReference(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, name):
+        try:
+            if name not in REFERENCE_SERIALIZERS:
+                data = {
+                    'status': 'error',
+                    'errors': [
+                        'Reference not found.'
+                    ]
+                }
+
+                return response.Response(data=data, status=status.HTTP_404_NOT_FOUND)
+
+            search_query = (request.query_params.get('search') or '').strip()
+
+            if search_query:
+                # Autocomplete: names starting with the query, read through the normalized name index instead of the cached table
+                serializer = REFERENCE_SERIALIZERS[name]
+                rows = QuerysetHelper.apply_search(serializer.get_queryset(), search_query, ['name'], phrase=True)
+                references = serializer(rows).data
+                data = {
+                    'status': 'success',
+                    'count': len(references),
+                    'data': {
+                        name: references
+                    }
+                }
+                result = response.Response(data=data, status=status.HTTP_200_OK)
+                result['Cache-Control'] = 'private, no-cache'
+
+                return result
+
+            references, etag = reference_cache.get(name)
+            result = get_conditional_response(request, etag=etag)
+
+            if result is None:
+                data = {
+                    'status': 'success',
+                    'count': len(references),
+                    'data': {
+                        name: references
+                    }
+                }
+                result = response.Response(data=data, status=status.HTTP_200_OK)
+
+            result['ETag'] = etag
+            result['Cache-Control'] = 'private, no-cache'
+
+            return result
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -70,7 +70,7 @@ class LanguageAdmin(admin.ModelAdmin):
 
 @admin.register(LanguageLevel)
 class LanguageLevelAdmin(admin.ModelAdmin):
-    list_display = ['id', 'name']
+    list_display = ['id', 'name', 'rank']
 
 @admin.register(ResumeLanguage)
 class ResumeLanguageAdmin(admin.ModelAdmin):
@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from django.db import transaction
+from .models import Resume, ResumeDocument
+from .search import index_resumes
+import threading
+
+_state = threading.local()
+
+def build_documents(resumes):
+    """
+    Return {resume id: document} for a Resume queryset, in the same shape as ResumeSerializer.
+    """
+    from .serializers import ResumeValuesSerializer
+
+    rows = ResumeValuesSerializer.get_queryset(resumes.order_by())
+
+    return {item['id']: item for item in ResumeValuesSerializer(rows).data}
+
+def rebuild_documents(ids):
+    ids = list(ids)
+
+    if not ids:
+        return {}
+
+    documents = build_documents(Resume.objects.filter(pk__in=ids))
+
+    with transaction.atomic():
+        ResumeDocument.objects.bulk_create(
+            [ResumeDocument(resume_id=resume_id, document=document) for resume_id, document in documents.items()],
+            update_conflicts=True,
+            unique_fields=['resume'],
+            update_fields=['document', 'updated_at']
+        )
+
+    return documents
+
+def refresh_resumes(ids):
+    """
+    Rebuild everything derived from the given resumes: their documents and their search entries.
+    """
+    ids = list(ids)
+
+    rebuild_documents(ids)
+    index_resumes(ids)
+
+def mark_documents_stale(ids):
+    """
+    Refresh the documents and search entries of the given resumes, or collect them when inside defer_document_rebuild().
+    """
+    pending = getattr(_state, 'pending', None)
+
+    if pending is None:
+        refresh_resumes(ids)
+    else:
+        pending.update(ids)
+
+@contextmanager
+def defer_document_rebuild():
+    """
+    Rebuild every document touched inside the block once, when the block exits.
+
+    Nested writes (a resume plus its children and M2Ms) would otherwise rebuild the same document once per signal.
+    """
+    if getattr(_state, 'pending', None) is not None:
+        yield
+        return
+
+    _state.pending = set()
+
+    try:
+        yield
+        pending = _state.pending
+    finally:
+        _state.pending = None
+
+    refresh_resumes(pending)
+
+def discard_documents(resumes):
+    """
+    Drop the documents of a Resume queryset with a single DELETE; they are rebuilt on their next read.
+
+    Meant for set-based writes that touch too many resumes to rebuild eagerly. Must run before the write when it changes what the
+    queryset matches.
+    """
+    ResumeDocument.objects.filter(resume__in=resumes.order_by().values('pk')).delete()
+
+def get_documents(ids):
+    """
+    Return {resume id: document} for the given ids, rebuilding the missing documents in one pass; unknown ids are left out.
+    """
+    documents = {str(pk): document for pk, document in ResumeDocument.objects.filter(pk__in=ids).values_list('resume_id', 'document')}
+    missing = [pk for pk in ids if str(pk) not in documents]
+
+    if missing:
+        documents.update(rebuild_documents(missing))
+
+    return documents
+
+def get_document(pk):
+    document = ResumeDocument.objects.filter(pk=pk).values_list('document', flat=True).first()
+
+    if document is None:
+        if not Resume.objects.filter(pk=pk).exists():
+            raise Resume.DoesNotExist('Resume matching query does not exist.')
+
+        document = next(iter(rebuild_documents([pk]).values()))
+
+    return document
@@ -1,5 +1,78 @@
-from django_filters.rest_framework import FilterSet
-from .models import Resume
+from django.db.models import Count, Subquery
+from django_filters.rest_framework import BaseInFilter, ChoiceFilter, FilterSet, UUIDFilter
+from .models import Experience, LanguageLevel, Resume, ResumeLanguage
 
-class ResumeFilter(FilterSet):
+class UUIDInFilter(BaseInFilter, UUIDFilter):
     pass
+
+class ResumeFilter(FilterSet):
+    """
+    Every relation filter is a `pk IN (subquery)` on an index that starts with the filtered column, so the resumes are reached by primary
+    key instead of joining (and de-duplicating) the related rows.
+    """
+    skills = UUIDInFilter(method='filter_skills')
+    skills_match = ChoiceFilter(choices=[('any', 'any'), ('all', 'all')], method='filter_option')
+    subareas = UUIDInFilter(method='filter_subareas')
+    areas = UUIDInFilter(method='filter_areas')
+    language = UUIDFilter(method='filter_language')
+    language_level = UUIDFilter(method='filter_language')
+    company = UUIDFilter(method='filter_company')
+
+    class Meta:
+        model = Resume
+        fields = {
+            'status': ['exact'],
+            'employee': ['exact'],
+            'candidate': ['exact'],
+            'created_at': ['gte', 'lte'],
+        }
+
+    def filter_option(self, queryset, name, value):
+        # Read by the filter it modifies
+        return queryset
+
+    def filter_skills(self, queryset, name, value):
+        skills = set(value)
+        rows = Resume.skills.through.objects.filter(skill_id__in=skills)
+
+        if self.form.cleaned_data.get('skills_match') == 'all':
+            # (resume, skill) is unique, so a resume has them all when it matches as many rows as there are skills
+            rows = rows.values('resume_id').annotate(matched=Count('skill_id')).filter(matched=len(skills))
+
+        return queryset.filter(pk__in=rows.values('resume_id'))
+
+    def filter_subareas(self, queryset, name, value):
+        rows = Resume.subareas_of_interest.through.objects.filter(subareaofinterest_id__in=value)
+
+        return queryset.filter(pk__in=rows.values('resume_id'))
+
+    def filter_areas(self, queryset, name, value):
+        rows = Resume.subareas_of_interest.through.objects.filter(subareaofinterest__area_of_interest_id__in=value)
+
+        return queryset.filter(pk__in=rows.values('resume_id'))
+
+    def filter_language(self, queryset, name, value):
+        """
+        Match resumes with the language at `language_level` or above, by LanguageLevel.rank; either parameter can be given alone.
+        """
+        language = self.form.cleaned_data.get('language')
+        level = self.form.cleaned_data.get('language_level')
+
+        # Both parameters describe the same ResumeLanguage row, so they are applied once, together
+        if name == 'language_level' and language:
+            return queryset
+
+        rows = ResumeLanguage.objects.all()
+
+        if language:
+            rows = rows.filter(language_id=language)
+
+        if level:
+            # An IN over the few qualifying levels seeks the level column instead of joining every row to its level
+            minimum = Subquery(LanguageLevel.objects.filter(pk=level).values('rank'))
+            rows = rows.filter(level_id__in=LanguageLevel.objects.filter(rank__gte=minimum).values('pk'))
+
+        return queryset.filter(pk__in=rows.values('resume_id'))
+
+    def filter_company(self, queryset, name, value):
+        return queryset.filter(pk__in=Experience.objects.filter(company_id=value).values('resume_id'))
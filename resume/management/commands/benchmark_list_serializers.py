@@ -0,0 +1,50 @@
+from candidate.models import Candidate
+from candidate.serializers import CandidateSerializer, CandidateValuesSerializer
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from resume.models import Resume
+from resume.serializers import ResumeSerializer, ResumeValuesSerializer
+import statistics
+import time
+
+class Command(BaseCommand):
+    help = 'Time one list page built by the values() serializers against the ModelSerializers, on the current database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=settings.PAGE_SIZE, help='Number of rows serialized per page.')
+        parser.add_argument('--repeat', type=int, default=20, help='Number of timed runs per serializer.')
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        lists = [
+            ('resumes', Resume.objects.order_by('-created_at', 'id'), ResumeSerializer, ResumeValuesSerializer),
+            ('candidates', Candidate.objects.order_by('first_name', 'last_name', 'id'), CandidateSerializer, CandidateValuesSerializer),
+        ]
+
+        for name, queryset, model_serializer, values_serializer in lists:
+            if queryset.count() < page_size:
+                raise CommandError(f'At least {page_size} {name} are needed to fill a page.')
+
+            def serialize_models():
+                page = list(model_serializer.setup_eager_loading(queryset)[:page_size])
+                return JSONRenderer().render(model_serializer(page, many=True).data)
+
+            def serialize_values():
+                page = list(values_serializer.get_queryset(queryset)[:page_size])
+                return JSONRenderer().render(values_serializer(page).data)
+
+            if serialize_models() != serialize_values():
+                raise CommandError(f'The {name} serializers disagree on the page content.')
+
+            for label, serialize in (('ModelSerializer', serialize_models), ('values()', serialize_values)):
+                timings = []
+
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    serialize()
+                    timings.append((time.perf_counter() - start) * 1000)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(f'{name} {label}: p50 {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms per page of {page_size}')
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from resume.documents import build_documents, rebuild_documents
+from resume.models import Resume, ResumeDocument
+
+class Command(BaseCommand):
+    help = 'Compare the materialized resume documents with the live data and optionally repair them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Rebuild missing and stale documents.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of resumes checked per batch.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checked = missing = stale = 0
+        last_id = None
+
+        while True:
+            resumes = Resume.objects.order_by('id')
+
+            if last_id is not None:
+                resumes = resumes.filter(id__gt=last_id)
+
+            ids = list(resumes.values_list('id', flat=True)[:chunk_size])
+
+            if not ids:
+                break
+
+            last_id = ids[-1]
+            expected = build_documents(Resume.objects.filter(pk__in=ids))
+            stored = {str(pk): document for pk, document in ResumeDocument.objects.filter(pk__in=ids).values_list('resume_id', 'document')}
+            broken = []
+
+            for resume_id, document in expected.items():
+                if resume_id not in stored:
+                    missing += 1
+                    broken.append(resume_id)
+                elif stored[resume_id] != document:
+                    stale += 1
+                    broken.append(resume_id)
+
+            if broken and options['repair']:
+                rebuild_documents(broken)
+
+            checked += len(ids)
+
+        self.stdout.write(f'{checked} resumes checked, {missing} missing and {stale} stale documents.')
+
+        if options['repair'] and (missing or stale):
+            self.stdout.write(self.style.SUCCESS(f'{missing + stale} documents rebuilt.'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from resume.search import optimize_index, rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of the resumes from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Number of resumes indexed per batch.')
+
+    def handle(self, *args, **options):
+        # Searches keep seeing the old index until the new one is committed
+        with transaction.atomic():
+            indexed = rebuild_index(options['chunk_size'])
+
+        optimize_index()
+
+        self.stdout.write(self.style.SUCCESS(f'{indexed} resumes indexed.'))
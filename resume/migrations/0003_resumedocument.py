@@ -0,0 +1,27 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0002_resume_resumes_created_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeDocument',
+            fields=[
+                ('resume', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='resume.resume', verbose_name='Currículo')),
+                ('document', models.JSONField(verbose_name='Documento')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Documento do Currículo',
+                'verbose_name_plural': 'Documentos dos Currículos',
+                'db_table': 'resume_documents',
+            },
+        ),
+    ]
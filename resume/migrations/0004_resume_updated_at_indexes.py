@@ -0,0 +1,29 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0003_resumedocument'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['updated_at'], name='resumes_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['updated_at'], name='educations_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['updated_at'], name='experiences_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumelanguage',
+            index=models.Index(fields=['updated_at'], name='resumes_langs_updated_at_idx'),
+        ),
+    ]
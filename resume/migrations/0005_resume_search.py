@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0004_resume_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE VIRTUAL TABLE resume_search USING fts5(
+                    resume_id UNINDEXED,
+                    summary,
+                    skills,
+                    job_titles,
+                    companies,
+                    courses,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3 4'
+                )
+            """,
+            reverse_sql='DROP TABLE resume_search',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0005_resume_search'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='languagelevel',
+            options={'ordering': ['rank', 'name'], 'verbose_name': 'Nível de Idioma', 'verbose_name_plural': 'Níveis de Idioma'},
+        ),
+        migrations.AddField(
+            model_name='languagelevel',
+            name='rank',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Posição do nível, do mais básico ao mais avançado; usada para filtrar por nível mínimo.', verbose_name='Ordem'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['company', 'resume'], name='experiences_company_resume_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['status', '-created_at', 'id'], name='resumes_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['employee', '-created_at', 'id'], name='resumes_employee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['candidate', '-created_at', 'id'], name='resumes_candidate_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumelanguage',
+            index=models.Index(fields=['language', 'level', 'resume'], name='resumes_langs_lang_level_idx'),
+        ),
+        # The auto-created M2M tables only index (resume_id, x) and x; filtering by skill or subarea reads resume_id from these instead
+        migrations.RunSQL(
+            sql='CREATE INDEX resumes_skills_skill_res_idx ON resumes_skills (skill_id, resume_id)',
+            reverse_sql='DROP INDEX resumes_skills_skill_res_idx',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX resumes_subareas_sub_res_idx ON resumes_subareas_of_interest (subareaofinterest_id, resume_id)',
+            reverse_sql='DROP INDEX resumes_subareas_sub_res_idx',
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:05
+
+from django.db import migrations, models
+import utils.fields
+
+NORMALIZED_FIELDS = {
+    'AreaOfInterest': ['normalized_name'],
+    'SubareaOfInterest': ['normalized_name'],
+    'Skill': ['normalized_name'],
+    'StatusResume': ['normalized_name'],
+    'Institution': ['normalized_name'],
+    'Course': ['normalized_name'],
+    'Company': ['normalized_name'],
+    'JobTitle': ['normalized_name'],
+    'Language': ['normalized_name'],
+    'LanguageLevel': ['normalized_name'],
+}
+
+
+def normalize_fields(apps, schema_editor):
+    """
+    Fill the normalized shadow columns of existing rows, which new saves keep up to date.
+    """
+    for model_name, names in NORMALIZED_FIELDS.items():
+        model = apps.get_model('resume', model_name)
+        fields = [model._meta.get_field(name) for name in names]
+        rows = model.objects.only('pk', *(field.source for field in fields)).order_by()
+        batch = []
+
+        for instance in rows.iterator(chunk_size=1000):
+            for field in fields:
+                setattr(instance, field.attname, field.normalizer(getattr(instance, field.source)))
+
+            batch.append(instance)
+
+            if len(batch) == 1000:
+                model.objects.bulk_update(batch, names)
+                batch = []
+
+        if batch:
+            model.objects.bulk_update(batch, names)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0006_resume_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='areaofinterest',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='subareaofinterest',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='skill',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='statusresume',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='institution',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='jobtitle',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='language',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.AddField(
+            model_name='languagelevel',
+            name='normalized_name',
+            field=utils.fields.NormalizedCharField(max_length=255, source='name', verbose_name='Nome normalizado'),
+        ),
+        migrations.RunPython(normalize_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='areaofinterest',
+            index=models.Index(fields=['normalized_name'], name='areas_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subareaofinterest',
+            index=models.Index(fields=['normalized_name'], name='subareas_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['normalized_name'], name='skills_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statusresume',
+            index=models.Index(fields=['normalized_name'], name='status_resumes_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='institution',
+            index=models.Index(fields=['normalized_name'], name='institutions_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['normalized_name'], name='courses_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['normalized_name'], name='companies_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobtitle',
+            index=models.Index(fields=['normalized_name'], name='job_titles_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='language',
+            index=models.Index(fields=['normalized_name'], name='languages_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='languagelevel',
+            index=models.Index(fields=['normalized_name'], name='language_levels_norm_name_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+# Known level names (normalized) on a single ladder: the usual Portuguese names and the CEFR levels
+LEVEL_RANKS = {
+    'iniciante': 1,
+    'basico': 1,
+    'a1': 1,
+    'a2': 2,
+    'intermediario': 3,
+    'b1': 3,
+    'b2': 4,
+    'avancado': 5,
+    'c1': 5,
+    'fluente': 6,
+    'c2': 6,
+    'nativo': 7,
+}
+
+
+def rank_language_levels(apps, schema_editor):
+    """
+    Rank the existing levels that still have the default 0; other names must be ranked by hand in the admin.
+    """
+    LanguageLevel = apps.get_model('resume', 'LanguageLevel')
+
+    for normalized_name, rank in LEVEL_RANKS.items():
+        LanguageLevel.objects.filter(normalized_name=normalized_name, rank=0).update(rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0007_normalized_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='languagelevel',
+            name='rank',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Posição do nível, do mais básico ao mais avançado; usada para filtrar por nível mínimo. Níveis com ordem 0 são tratados como os mais básicos.', verbose_name='Ordem'),
+        ),
+        migrations.RunPython(rank_language_levels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0008_language_level_ranks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumedocument',
+            index=models.Index(fields=['updated_at'], name='resume_docs_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:20
+
+from django.db import migrations
+from resume.search import rebuild_index
+
+
+def build_resume_search(apps, schema_editor):
+    """
+    Index the existing resumes, which 0005 left out of the new search table; new writes keep it up to date.
+    """
+    rebuild_index(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0009_resumedocument_updated_at_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_resume_search, migrations.RunPython.noop),
+    ]
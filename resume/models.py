@@ -1,6 +1,7 @@
 from django.db import models
 from candidate.models import Candidate
 from employee.models import Employee
+from utils.fields import NormalizedCharField
 import uuid
 
 # Create your models here.
@@ -10,6 +11,9 @@ class AreaOfInterest(models.Model):
         verbose_name = 'Área de Interesse'
         verbose_name_plural = 'Áreas de Interesse'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='areas_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -22,6 +26,10 @@ class AreaOfInterest(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -40,6 +48,9 @@ class SubareaOfInterest(models.Model):
         verbose_name = 'Subárea de Interesse'
         verbose_name_plural = 'Subáreas de Interesse'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='subareas_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -52,6 +63,10 @@ class SubareaOfInterest(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     area_of_interest = models.ForeignKey(
         AreaOfInterest,
         on_delete=models.CASCADE,
@@ -77,6 +92,9 @@ class Skill(models.Model):
         verbose_name = 'Habilidade'
         verbose_name_plural = 'Habilidades'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='skills_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -89,6 +107,10 @@ class Skill(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -107,6 +129,9 @@ class StatusResume(models.Model):
         verbose_name = 'Status do Currículo'
         verbose_name_plural = 'Status dos Currículos'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='status_resumes_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -119,6 +144,10 @@ class StatusResume(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em'
@@ -137,6 +166,13 @@ class Resume(models.Model):
         verbose_name = 'Currículo'
         verbose_name_plural = 'Currículos'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='resumes_created_at_id_idx'),
+            models.Index(fields=['updated_at'], name='resumes_updated_at_idx'),
+            models.Index(fields=['status', '-created_at', 'id'], name='resumes_status_created_idx'),
+            models.Index(fields=['employee', '-created_at', 'id'], name='resumes_employee_created_idx'),
+            models.Index(fields=['candidate', '-created_at', 'id'], name='resumes_candidate_created_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -186,6 +222,15 @@ class Resume(models.Model):
         verbose_name='Atualizado em'
     )
 
+    loaded_status_id = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Resume, cls).from_db(db, field_names, values)
+        instance.loaded_status_id = instance.__dict__.get('status_id')
+
+        return instance
+
     def __str__(self):
         return self.candidate.get_full_name()
     
@@ -195,6 +240,9 @@ class Institution(models.Model):
         verbose_name = 'Instituição'
         verbose_name_plural = 'Instituições'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='institutions_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -207,6 +255,10 @@ class Institution(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
 
     def __str__(self):
         return self.name
@@ -217,6 +269,9 @@ class Course(models.Model):
         verbose_name = 'Curso'
         verbose_name_plural = 'Cursos'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='courses_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -229,6 +284,10 @@ class Course(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
     
     def __str__(self):
         return self.name
@@ -239,6 +298,9 @@ class Education(models.Model):
         verbose_name = 'Formação Acadêmica'
         verbose_name_plural = 'Formações Acadêmicas'
         ordering = ['-end_date']
+        indexes = [
+            models.Index(fields=['updated_at'], name='educations_updated_at_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -294,6 +356,9 @@ class Company(models.Model):
         verbose_name = 'Empresa'
         verbose_name_plural = 'Empresas'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='companies_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -306,6 +371,10 @@ class Company(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
 
     def __str__(self):
         return self.name
@@ -316,6 +385,9 @@ class JobTitle(models.Model):
         verbose_name = 'Cargo'
         verbose_name_plural = 'Cargos'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='job_titles_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -328,6 +400,10 @@ class JobTitle(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
 
     def __str__(self):
         return self.name
@@ -338,6 +414,10 @@ class Experience(models.Model):
         verbose_name = 'Experiência Profissional'
         verbose_name_plural = 'Experiências Profissionais'
         ordering = ['-end_date']
+        indexes = [
+            models.Index(fields=['updated_at'], name='experiences_updated_at_idx'),
+            models.Index(fields=['company', 'resume'], name='experiences_company_resume_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -393,6 +473,9 @@ class Language(models.Model):
         verbose_name = 'Idioma'
         verbose_name_plural = 'Idiomas'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='languages_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -405,6 +488,10 @@ class Language(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
 
     def __str__(self):
         return self.name
@@ -414,7 +501,10 @@ class LanguageLevel(models.Model):
         db_table = 'language_levels'
         verbose_name = 'Nível de Idioma'
         verbose_name_plural = 'Níveis de Idioma'
-        ordering = ['name']
+        ordering = ['rank', 'name']
+        indexes = [
+            models.Index(fields=['normalized_name'], name='language_levels_norm_name_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -427,6 +517,15 @@ class LanguageLevel(models.Model):
         unique=True,
         verbose_name='Nome'
     )
+    normalized_name = NormalizedCharField(
+        source='name',
+        verbose_name='Nome normalizado'
+    )
+    rank = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Posição do nível, do mais básico ao mais avançado; usada para filtrar por nível mínimo. Níveis com ordem 0 são tratados como os mais básicos.',
+        verbose_name='Ordem'
+    )
 
     def __str__(self):
         return self.name
@@ -437,6 +536,10 @@ class ResumeLanguage(models.Model):
         verbose_name = 'Idioma do Currículo'
         verbose_name_plural = 'Idiomas dos Currículos'
         ordering = ['language']
+        indexes = [
+            models.Index(fields=['updated_at'], name='resumes_langs_updated_at_idx'),
+            models.Index(fields=['language', 'level', 'resume'], name='resumes_langs_lang_level_idx'),
+        ]
 
     id = models.UUIDField(
         primary_key=True,
@@ -472,4 +575,31 @@ class ResumeLanguage(models.Model):
     )
 
     def __str__(self):
-        return self.resume.candidate.get_full_name()
\ No newline at end of file
+        return self.resume.candidate.get_full_name()
+    
+class ResumeDocument(models.Model):
+    class Meta:
+        db_table = 'resume_documents'
+        verbose_name = 'Documento do Currículo'
+        verbose_name_plural = 'Documentos dos Currículos'
+        indexes = [
+            models.Index(fields=['updated_at'], name='resume_docs_updated_at_idx'),
+        ]
+
+    resume = models.OneToOneField(
+        Resume,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='document',
+        verbose_name='Currículo'
+    )
+    document = models.JSONField(
+        verbose_name='Documento'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Atualizado em'
+    )
+
+    def __str__(self):
+        return str(self.resume_id)
\ No newline at end of file
@@ -0,0 +1,174 @@
+from django.apps import apps as global_apps
+from django.db import connection
+from .models import Company, Course, Education, Experience, JobTitle, Resume, Skill
+import re
+import uuid
+
+TABLE = 'resume_search'
+
+# Indexed columns, in table order, with their bm25 weight
+COLUMNS = {
+    'summary': 1.0,
+    'skills': 4.0,
+    'job_titles': 3.0,
+    'companies': 2.0,
+    'courses': 2.0,
+}
+
+term_pattern = re.compile(r'(\w+)(\*?)')
+
+def get_rowid(resume_id):
+    """
+    Map a resume UUID to the FTS rowid: its leading 63 bits.
+
+    Updates and deletes then address entries by rowid, the only indexed key of an FTS5 table; the UUID itself is stored next to the text
+    so results never depend on this mapping.
+    """
+    return uuid.UUID(str(resume_id)).int >> 65
+
+def build_query(text):
+    """
+    Turn user input into an FTS5 query: every word must match, and a word ending in * matches as a prefix.
+
+    Words are quoted, so FTS5 operators and column filters typed by users are matched as plain text instead of raising syntax errors.
+    """
+    terms = [f'"{word}"' + ('*' if star else '') for word, star in term_pattern.findall(text or '')]
+
+    return ' '.join(terms)
+
+def build_entries(ids, apps=global_apps):
+    """
+    Return {resume id: {column: text}} for the given resumes, with one query per source.
+
+    `apps` is the registry the models are read from, so migrations can pass their historical one.
+    """
+    Resume, Experience, Education = [apps.get_model('resume', name) for name in ('Resume', 'Experience', 'Education')]
+    entries = {resume_id: {column: [] for column in COLUMNS} for resume_id in ids}
+
+    for resume_id, summary in Resume.objects.filter(pk__in=ids).values_list('pk', 'summary'):
+        entries[resume_id]['summary'].append(summary or '')
+
+    for resume_id, name in Resume.skills.through.objects.filter(resume_id__in=ids).values_list('resume_id', 'skill__name'):
+        entries[resume_id]['skills'].append(name)
+
+    for resume_id, job_title, company in Experience.objects.filter(resume_id__in=ids).values_list('resume_id', 'job_title__name', 'company__name'):
+        entries[resume_id]['job_titles'].append(job_title)
+        entries[resume_id]['companies'].append(company)
+
+    for resume_id, course in Education.objects.filter(resume_id__in=ids).values_list('resume_id', 'course__name'):
+        entries[resume_id]['courses'].append(course)
+
+    # Resumes gone in the meantime have no summary row and are only removed from the index
+    return {resume_id: {column: '\n'.join(values) for column, values in entry.items()} for resume_id, entry in entries.items() if entry['summary']}
+
+def unindex_resumes(ids):
+    rowids = [(get_rowid(resume_id),) for resume_id in ids]
+
+    if rowids:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', rowids)
+
+def index_resumes(ids, apps=global_apps):
+    """
+    Replace the search entries of the given resumes with their current text.
+    """
+    ids = [uuid.UUID(str(resume_id)) for resume_id in ids]
+
+    if not ids:
+        return
+
+    entries = build_entries(ids, apps)
+    rows = [(get_rowid(resume_id), resume_id.hex, *entry.values()) for resume_id, entry in entries.items()]
+
+    unindex_resumes(ids)
+
+    if rows:
+        columns = ', '.join(['rowid', 'resume_id', *COLUMNS])
+        placeholders = ', '.join(['%s'] * (len(COLUMNS) + 2))
+
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {TABLE} ({columns}) VALUES ({placeholders})', rows)
+
+def clear_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+def rebuild_index(chunk_size=500, apps=global_apps):
+    """
+    Replace the whole index with entries built from every resume, `chunk_size` resumes at a time; returns the number indexed.
+
+    Meant to run inside a transaction, so searches keep seeing the old index until the new one is committed.
+    """
+    Resume = apps.get_model('resume', 'Resume')
+    indexed = 0
+    last_id = None
+
+    clear_index()
+
+    while True:
+        resumes = Resume.objects.order_by('id')
+
+        if last_id is not None:
+            resumes = resumes.filter(id__gt=last_id)
+
+        ids = list(resumes.values_list('id', flat=True)[:chunk_size])
+
+        if not ids:
+            return indexed
+
+        last_id = ids[-1]
+        index_resumes(ids, apps)
+        indexed += len(ids)
+
+def optimize_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+
+def count_matches(query):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s', [query])
+
+        return cursor.fetchone()[0]
+
+def search(query, limit, after=None, reverse=False):
+    """
+    Return [(resume id, score)] for an FTS5 query, best bm25 score first, seeking past the (score, resume id) position in `after`.
+
+    With `reverse`, rows before the position are returned, nearest first, to walk back one page.
+    """
+    weights = ', '.join(str(weight) for weight in COLUMNS.values())
+    direction, comparison = ('DESC', '<') if reverse else ('ASC', '>')
+    params = [query]
+    seek = ''
+
+    if after is not None:
+        seek = f'WHERE score {comparison} %s OR (score = %s AND resume_id {comparison} %s)'
+        params += [after[0], after[0], uuid.UUID(str(after[1])).hex]
+
+    # The score is computed once per match in the inner query; the seek filters on it in the outer one
+    sql = f'''
+        SELECT resume_id, score FROM (
+            SELECT resume_id, bm25({TABLE}, 0, {weights}) AS score FROM {TABLE} WHERE {TABLE} MATCH %s
+        ) {seek}
+        ORDER BY score {direction}, resume_id {direction}
+        LIMIT %s
+    '''
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit])
+
+        return [(str(uuid.UUID(resume_id)), score) for resume_id, score in cursor.fetchall()]
+
+def get_lookup_resume_ids(instance):
+    """
+    Return the ids of the resumes whose search text includes the name of a Skill, JobTitle, Company or Course.
+    """
+    sources = {
+        Skill: (Resume.skills.through, 'skill'),
+        JobTitle: (Experience, 'job_title'),
+        Company: (Experience, 'company'),
+        Course: (Education, 'course'),
+    }
+    model, field = sources[type(instance)]
+
+    return set(model.objects.filter(**{field: instance}).values_list('resume_id', flat=True))
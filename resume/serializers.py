@@ -1,6 +1,16 @@
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Count, Prefetch
+from django.utils import timezone
 from rest_framework import serializers
+from candidate.serializers import CandidateSummarySerializer
+from utils.helpers import BulkHelper
+from utils.mixins import DynamicFieldsMixin
+from utils.serializers import ValuesSerializer
+from .documents import defer_document_rebuild, discard_documents
+from .filters import ResumeFilter
 from .models import *
+from .signals import resume_status_changed
 
 class SubareaOfInterestSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,6 +34,11 @@ class SkillSerializer(serializers.ModelSerializer):
             }
         }
 
+class StatusResumeSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StatusResume
+        fields = ['id', 'name']
+
 class EducationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Education
@@ -57,13 +72,40 @@ class ResumeLanguageSerializer(serializers.ModelSerializer):
             }
         }
 
-class ResumeSerializer(serializers.ModelSerializer):
+class EducationValuesSerializer(ValuesSerializer):
+    model = Education
+    fields = EducationSerializer.Meta.fields
+    parent_field = 'resume'
+
+class ExperienceValuesSerializer(ValuesSerializer):
+    model = Experience
+    fields = ExperienceSerializer.Meta.fields
+    parent_field = 'resume'
+
+class ResumeLanguageValuesSerializer(ValuesSerializer):
+    model = ResumeLanguage
+    fields = ResumeLanguageSerializer.Meta.fields
+    parent_field = 'resume'
+
+class ResumeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     subareas_of_interest = serializers.PrimaryKeyRelatedField(many=True, queryset=SubareaOfInterest.objects.all())
     skills = serializers.PrimaryKeyRelatedField(many=True, queryset=Skill.objects.all())
     educations = EducationSerializer(many=True, required=False)
     experiences = ExperienceSerializer(many=True, required=False)
     languages = ResumeLanguageSerializer(many=True, required=False)
 
+    prefetch_related_fields = {
+        'subareas_of_interest': Prefetch('subareas_of_interest', queryset=SubareaOfInterest.objects.only('id')),
+        'skills': Prefetch('skills', queryset=Skill.objects.only('id')),
+        'educations': Prefetch('educations', queryset=Education.objects.all()),
+        'experiences': Prefetch('experiences', queryset=Experience.objects.all()),
+        'languages': Prefetch('languages', queryset=ResumeLanguage.objects.all()),
+    }
+    expandable_fields = {
+        'candidate': CandidateSummarySerializer,
+        'status': StatusResumeSerializer,
+    }
+
     class Meta:
         model = Resume
         fields = ['id', 'employee', 'candidate', 'summary', 'subareas_of_interest', 'skills', 'educations', 'experiences', 'languages', 'status', 'created_at', 'updated_at']
@@ -90,109 +132,106 @@ class ResumeSerializer(serializers.ModelSerializer):
         experiences_data = validated_data.pop('experiences', None)
         languages_data = validated_data.pop('languages', None)
 
-        with transaction.atomic():
+        with transaction.atomic(), defer_document_rebuild():
             resume = Resume.objects.create(**validated_data)
 
+            # One INSERT per collection; the post_save of the resume already rebuilds its document and invalidates the cache for them
             if subareas_of_interest_data is not None:
-                resume.subareas_of_interest.set(subareas_of_interest_data)
+                BulkHelper.add_many_to_many(resume, 'subareas_of_interest', subareas_of_interest_data)
 
             if skills_data is not None:
-                resume.skills.set(skills_data)
-
-            for education_data in educations_data:
-                Education.objects.create(resume=resume, **education_data)
-
-            for experience_data in experiences_data:
-                Experience.objects.create(resume=resume, **experience_data)
+                BulkHelper.add_many_to_many(resume, 'skills', skills_data)
 
-            for language_data in languages_data:
-                ResumeLanguage.objects.create(resume=resume, **language_data)
+            BulkHelper.create_children(Education, 'resume', resume, educations_data)
+            BulkHelper.create_children(Experience, 'resume', resume, experiences_data)
+            BulkHelper.create_children(ResumeLanguage, 'resume', resume, languages_data)
 
         return resume
 
     def update(self, instance, validated_data):
         related_fields = ['subareas_of_interest', 'skills', 'educations', 'experiences', 'languages']
 
-        with transaction.atomic():
+        with transaction.atomic(), defer_document_rebuild():
             related_data = {field: validated_data.pop(field, None) for field in related_fields}
 
             for attr, value in validated_data.items():
                 setattr(instance, attr, value)
             instance.save()
 
-            if related_data['educations'] is not None:
-                existing_ids = []
+            if related_data['subareas_of_interest'] is not None:
+                instance.subareas_of_interest.set(related_data['subareas_of_interest'])
 
-                for education_data in related_data['educations']:
-                    education_id = education_data.pop('id', None)
+            if related_data['skills'] is not None:
+                instance.skills.set(related_data['skills'])
 
-                    if education_id:
-                        education = Education.objects.get(id=education_id, resume=instance)
+            if related_data['educations'] is not None:
+                BulkHelper.reconcile_children(Education, 'resume', instance, related_data['educations'], 'educations')
 
-                        for field in ['institution', 'course', 'start_date']:
-                            if field not in education_data:
-                                education_data[field] = getattr(education, field)
-                        
-                        for key, value in education_data.items():
-                            setattr(education, key, value)
+            if related_data['experiences'] is not None:
+                BulkHelper.reconcile_children(Experience, 'resume', instance, related_data['experiences'], 'experiences')
 
-                        education.save()
-                        existing_ids.append(education_id)
-                    else:
-                        education = Education.objects.create(resume=instance, **education_data)
+            if related_data['languages'] is not None:
+                BulkHelper.reconcile_children(ResumeLanguage, 'resume', instance, related_data['languages'], 'languages')
 
-                        existing_ids.append(education.id)
+        return instance
 
-                instance.educations.exclude(id__in=existing_ids).delete()
+class ResumeValuesSerializer(ValuesSerializer):
+    model = Resume
+    fields = ResumeSerializer.Meta.fields
+    children = {
+        'educations': EducationValuesSerializer,
+        'experiences': ExperienceValuesSerializer,
+        'languages': ResumeLanguageValuesSerializer,
+    }
 
-            if related_data['experiences'] is not None:
-                existing_ids = []
+class ResumeStatusTransitionSerializer(serializers.Serializer):
+    status = serializers.PrimaryKeyRelatedField(queryset=StatusResume.objects.all())
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False, max_length=settings.RESUME_STATUS_BATCH_MAX_SIZE)
+    filter = serializers.DictField(required=False, allow_empty=False)
 
-                for experience_data in related_data['experiences']:
-                    experience_id = experience_data.pop('id', None)
+    def validate_filter(self, value):
+        unknown = sorted(set(value) - set(ResumeFilter.base_filters))
 
-                    if experience_id:
-                        experience = Experience.objects.get(id=experience_id, resume=instance)
+        if unknown:
+            raise serializers.ValidationError(f'Unknown filters: {", ".join(unknown)}.')
 
-                        for field in ['company', 'job_title', 'start_date']:
-                            if field not in experience_data:
-                                experience_data[field] = getattr(experience, field)
+        self.filterset = ResumeFilter(value, queryset=Resume.objects.all())
 
-                        for key, value in experience_data.items():
-                            setattr(experience, key, value)
+        if not self.filterset.is_valid():
+            raise serializers.ValidationError(self.filterset.errors)
 
-                        experience.save()
-                        existing_ids.append(experience_id)
-                    else:
-                        experience = Experience.objects.create(resume=instance, **experience_data)
+        return value
 
-                        existing_ids.append(experience.id)
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter.')
 
-                instance.experiences.exclude(id__in=existing_ids).delete()
+        return attrs
 
-            if related_data['languages'] is not None:
-                existing_ids = []
-                
-                for language_data in related_data['languages']:
-                    language_id = language_data.pop('id', None)
+    def get_queryset(self):
+        if 'ids' in self.validated_data:
+            return Resume.objects.filter(pk__in=self.validated_data['ids'])
 
-                    if language_id:
-                        language = ResumeLanguage.objects.get(id=language_id, resume=instance)
+        return self.filterset.qs
 
-                        for field in ['language', 'level']:
-                            if field not in language_data:
-                                language_data[field] = getattr(language, field)
+    def save(self):
+        """
+        Move every matched resume to the new status with a single UPDATE; returns the number of resumes moved.
 
-                        for key, value in language_data.items():
-                            setattr(language, key, value)
+        Per-row signals are replaced by one resume_status_changed, sent with the number of resumes that left each status.
+        """
+        status = self.validated_data['status']
+        resumes = self.get_queryset().exclude(status=status).order_by()
+
+        with transaction.atomic():
+            previous = dict(resumes.values_list('status').annotate(count=Count('pk')))
 
-                        language.save()
-                        existing_ids.append(language_id)
-                    else:
-                        language = ResumeLanguage.objects.create(resume=instance, **language_data)
-                        
-                        existing_ids.append(language.id)
+            if not previous:
+                return 0
 
-                instance.languages.exclude(id__in=existing_ids).delete()
+            # The documents have to go before the UPDATE, which changes what the queryset matches
+            discard_documents(resumes)
+            count = resumes.update(status=status, updated_at=timezone.now())
+            resume_status_changed.send(sender=Resume, status=status, previous=previous, count=count)
 
-        return instance
\ No newline at end of file
+        return count
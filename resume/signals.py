@@ -0,0 +1,96 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+from candidate.models import Candidate
+from utils.cache import response_cache
+from .documents import mark_documents_stale
+from .models import *
+from .search import get_lookup_resume_ids, index_resumes, unindex_resumes
+
+# Sent once per set-based status transition instead of one post_save per resume, with `status` (the new StatusResume),
+# `previous` ({status id: number of resumes moved out of it}) and `count`
+resume_status_changed = Signal()
+
+LOOKUP_MODELS = [AreaOfInterest, SubareaOfInterest, Skill, StatusResume, Institution, Course, Company, JobTitle, Language, LanguageLevel]
+
+def resumes_changed(ids):
+    ids = list(ids)
+
+    mark_documents_stale(ids)
+    response_cache.bump_on_commit('resume:list', *[f'resume:{pk}' for pk in ids])
+
+def is_resume_deletion(origin):
+    """
+    Tell whether a delete started from resumes or candidates, whose cascade removes the resume documents as well.
+    """
+    return isinstance(origin, (Resume, Candidate)) or getattr(origin, 'model', None) in (Resume, Candidate)
+
+@receiver(post_save, sender=Resume)
+def resume_saved(sender, instance, **kwargs):
+    resumes_changed([instance.pk])
+
+@receiver(post_delete, sender=Resume)
+def resume_deleted(sender, instance, **kwargs):
+    unindex_resumes([instance.pk])
+    response_cache.bump_on_commit('resume:list', f'resume:{instance.pk}')
+
+@receiver(resume_status_changed, sender=Resume)
+def resume_status_bulk_changed(sender, **kwargs):
+    # The moved resumes are not enumerated, so every cached resume read is invalidated at once
+    response_cache.bump_on_commit('resume')
+
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=Experience)
+@receiver(post_save, sender=ResumeLanguage)
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=Experience)
+@receiver(post_delete, sender=ResumeLanguage)
+def resume_child_changed(sender, instance, origin=None, **kwargs):
+    if is_resume_deletion(origin):
+        # Rebuilding the document now would recreate it for a resume that is about to be deleted
+        return
+
+    resumes_changed([instance.resume_id])
+
+@receiver(m2m_changed, sender=Resume.skills.through)
+@receiver(m2m_changed, sender=Resume.subareas_of_interest.through)
+def resume_relation_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # pk_set is not provided on clear, so collect the resumes before the rows are gone
+        instance._cleared_resume_ids = list(instance.resume_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        resumes_changed(pk_set if reverse else [instance.pk])
+    elif action == 'post_clear':
+        resumes_changed(getattr(instance, '_cleared_resume_ids', []) if reverse else [instance.pk])
+
+@receiver(pre_delete, sender=Skill)
+@receiver(pre_delete, sender=SubareaOfInterest)
+def lookup_deleting(sender, instance, **kwargs):
+    # The through rows are removed without signals, so remember who referenced the row
+    instance._resume_ids = list(instance.resume_set.values_list('pk', flat=True))
+
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=SubareaOfInterest)
+def lookup_deleted(sender, instance, **kwargs):
+    resumes_changed(getattr(instance, '_resume_ids', []))
+
+def lookup_changed(sender, instance, **kwargs):
+    # Lookup names show up in expanded payloads, so every cached resume read depends on them
+    response_cache.bump_on_commit('resume')
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=JobTitle)
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Course)
+def searchable_lookup_saved(sender, instance, created, **kwargs):
+    # Their names are copied into the search entries; documents only hold the ids
+    if not created:
+        index_resumes(get_lookup_resume_ids(instance))
+
+for model in LOOKUP_MODELS:
+    post_save.connect(lookup_changed, sender=model)
+    post_delete.connect(lookup_changed, sender=model)
+
+@receiver(post_save, sender=Candidate)
+def candidate_saved(sender, instance, created, **kwargs):
+    if not created:
+        resumes_changed(instance.resumes.values_list('pk', flat=True))
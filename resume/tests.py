@@ -1,3 +1,345 @@
+from candidate.models import Candidate, Gender
+from counter.models import Counter
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from employee.models import Employee
+from rest_framework.test import APIClient
+from validate_docbr import CPF
+from .filters import ResumeFilter
+from .models import *
+from .serializers import ResumeSerializer, ResumeValuesSerializer
+import datetime
 
-# Create your tests here.
+class ResumeTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = Employee.objects.create_user(username='ana', password='senha-segura-123', first_name='Ana')
+        cls.gender = Gender.objects.create(name='Feminino')
+        cls.status = StatusResume.objects.create(name='Novo')
+        cls.area = AreaOfInterest.objects.create(name='Tecnologia')
+        cls.subarea = SubareaOfInterest.objects.create(name='Desenvolvimento', area_of_interest=cls.area)
+        cls.skills = [Skill.objects.create(name=name) for name in ('Python', 'Django', 'SQL')]
+        cls.institution = Institution.objects.create(name='Unicamp')
+        cls.course = Course.objects.create(name='Ciência da Computação')
+        cls.company = Company.objects.create(name='ACME')
+        cls.job_title = JobTitle.objects.create(name='Desenvolvedor')
+        cls.language = Language.objects.create(name='Inglês')
+        cls.level = LanguageLevel.objects.create(name='Avançado', rank=3)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def create_candidate(self, first_name='Maria', last_name='Silva'):
+        return Candidate.objects.create(first_name=first_name, last_name=last_name, date_of_birth=datetime.date(1990, 5, 17), gender=self.gender, cpf=CPF().generate())
+
+    def create_resume(self, candidate=None, **kwargs):
+        kwargs.setdefault('summary', 'Desenvolvedora Python')
+        resume = Resume.objects.create(candidate=candidate or self.create_candidate(), status=self.status, employee=self.employee, **kwargs)
+        resume.skills.set(self.skills)
+        resume.subareas_of_interest.set([self.subarea])
+        Education.objects.create(resume=resume, institution=self.institution, course=self.course, start_date=datetime.date(2010, 2, 1), end_date=datetime.date(2014, 12, 1))
+        Experience.objects.create(resume=resume, company=self.company, job_title=self.job_title, start_date=datetime.date(2015, 1, 1))
+        ResumeLanguage.objects.create(resume=resume, language=self.language, level=self.level)
+
+        return resume
+
+class ResumeVersionTests(ResumeTestCase):
+    def assertRenameChangesVersion(self, expand, rename, field, value):
+        resume = self.create_resume()
+        urls = [reverse('get_resumes') + f'?expand={expand}', reverse('detail_resume', args=[resume.pk]) + f'?expand={expand}']
+        before = [self.client.get(url)['ETag'] for url in urls]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rename(resume)
+
+        responses = [self.client.get(url) for url in urls]
+        self.assertEqual(responses[0].json()['data']['resumes'][0][expand][field], value)
+        self.assertEqual(responses[1].json()['data']['resume'][expand][field], value)
+        self.assertNotEqual(before, [response['ETag'] for response in responses])
+
+    def test_expanded_status_rename_changes_version(self):
+        def rename(resume):
+            self.status.name = 'Em análise'
+            self.status.save()
+
+        self.assertRenameChangesVersion('status', rename, 'name', 'Em análise')
+
+    def test_expanded_candidate_rename_changes_version(self):
+        def rename(resume):
+            resume.candidate.first_name = 'Mariana'
+            resume.candidate.save()
+
+        self.assertRenameChangesVersion('candidate', rename, 'first_name', 'Mariana')
+
+    def test_child_and_relation_deletions_change_list_version(self):
+        resume = self.create_resume()
+        url = reverse('get_resumes')
+        changes = [
+            ('education', lambda: resume.educations.get().delete()),
+            ('skill remove', lambda: resume.skills.remove(self.skills[0])),
+            ('skill delete', lambda: self.skills[1].delete()),
+        ]
+
+        for label, change in changes:
+            with self.subTest(change=label):
+                etag = self.client.get(url)['ETag']
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    change()
+
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+class ResumeValuesSerializerTests(ResumeTestCase):
+    def test_output_matches_model_serializer(self):
+        self.create_resume()
+        self.create_resume(summary=None)
+        bare = Resume.objects.create(candidate=self.create_candidate('João', 'Souza'), status=self.status)
+        Education.objects.create(resume=bare, institution=self.institution, course=self.course, start_date=datetime.date(2019, 3, 1))
+        queryset = Resume.objects.order_by('-created_at', 'id')
+
+        values = ResumeValuesSerializer(list(ResumeValuesSerializer.get_queryset(queryset))).data
+        model = ResumeSerializer(ResumeSerializer.setup_eager_loading(queryset), many=True).data
+
+        self.assertEqual(len(values), queryset.count())
+        self.assertEqual(JSONRenderer().render(values), JSONRenderer().render(model))
+
+class ResumeSerializerTests(ResumeTestCase):
+    def get_payload(self, size):
+        return {
+            'candidate': str(self.create_candidate().pk),
+            'status': str(self.status.pk),
+            'summary': 'Desenvolvedora Python',
+            'skills': [str(skill.pk) for skill in self.skills[:size]],
+            'subareas_of_interest': [str(self.subarea.pk)],
+            'educations': [{'institution': str(self.institution.pk), 'course': str(self.course.pk), 'start_date': '01/02/2010'}] * size,
+            'experiences': [{'company': str(self.company.pk), 'job_title': str(self.job_title.pk), 'start_date': '01/01/2015'}] * size,
+            'languages': [{'language': str(self.language.pk), 'level': str(self.level.pk)}] * size,
+        }
+
+    def test_create_query_count_does_not_grow_with_children(self):
+        # Creates the maintained counter row, which is inserted once
+        self.create_resume()
+
+        for size in (1, 3):
+            with self.subTest(size=size):
+                serializer = ResumeSerializer(data=self.get_payload(size))
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+
+                with self.assertNumQueries(25):
+                    resume = serializer.save()
+
+                self.assertEqual(resume.educations.count(), size)
+                self.assertEqual(resume.skills.count(), size)
+
+class ResumeFilterPlanTests(ResumeTestCase):
+    def explain(self, params):
+        filterset = ResumeFilter({name: str(value) for name, value in params.items()}, queryset=Resume.objects.all())
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        # The first page of the list, as KeysetPagination reads it
+        sql, sql_params = filterset.qs.order_by('-created_at', 'id').values('pk')[:20].query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', sql_params)
+            return [row[3] for row in cursor.fetchall()]
+
+    def test_filters_seek_an_index(self):
+        resume = self.create_resume()
+        combinations = [
+            ({}, 'resumes_created_at_id_idx'),
+            ({'created_at__gte': '2020-01-01T00:00:00Z'}, 'resumes_created_at_id_idx'),
+            ({'status': self.status.pk}, 'resumes_status_created_idx'),
+            ({'employee': self.employee.pk}, 'resumes_employee_created_idx'),
+            ({'candidate': resume.candidate_id}, 'resumes_candidate_created_idx'),
+            ({'skills': f'{self.skills[0].pk},{self.skills[1].pk}'}, 'resumes_skills_skill_res_idx'),
+            ({'skills': self.skills[0].pk, 'skills_match': 'all'}, 'resumes_skills_skill_res_idx'),
+            ({'subareas': self.subarea.pk}, 'resumes_subareas_sub_res_idx'),
+            ({'areas': self.area.pk}, 'resumes_subareas_sub_res_idx'),
+            ({'language': self.language.pk}, 'resumes_langs_lang_level_idx'),
+            ({'language': self.language.pk, 'language_level': self.level.pk}, 'resumes_langs_lang_level_idx'),
+            ({'language_level': self.level.pk}, 'level_id=?'),
+            ({'company': self.company.pk}, 'experiences_company_resume_idx'),
+            ({'status': self.status.pk, 'skills': self.skills[0].pk}, 'resumes_skills_skill_res_idx'),
+        ]
+
+        for params, index in combinations:
+            with self.subTest(filters=list(params)):
+                plan = self.explain(params)
+                # Only the few language levels may be read in full, to compare their ranks
+                scans = [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
+
+                self.assertIn(index, ' '.join(plan))
+                self.assertEqual(len(scans), 1 if 'language_level' in params else 0, plan)
+
+class ResumeSearchTests(ResumeTestCase):
+    def search(self, query, **params):
+        response = self.client.get(reverse('search_resumes'), {'q': query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+
+        return response.json()
+
+    def get_ids(self, body):
+        return [resume['id'] for resume in body['data']['resumes']]
+
+    def test_best_match_comes_first(self):
+        # Skills weigh more than the summary
+        in_summary = Resume.objects.create(candidate=self.create_candidate('João', 'Souza'), status=self.status, summary='Aprendendo Python')
+        in_skills = self.create_resume(summary='Analista de dados')
+
+        body = self.search('python')
+
+        self.assertEqual(body['count'], 2)
+        self.assertEqual(self.get_ids(body), [str(in_skills.pk), str(in_summary.pk)])
+
+    def test_accents_and_case_are_ignored(self):
+        resume = self.create_resume()
+
+        for query in ('ciencia', 'COMPUTAÇÃO', 'Ciência computacao'):
+            with self.subTest(query=query):
+                self.assertEqual(self.get_ids(self.search(query)), [str(resume.pk)])
+
+    def test_star_matches_prefixes(self):
+        resume = self.create_resume()
+
+        self.assertEqual(self.get_ids(self.search('djan*')), [str(resume.pk)])
+        self.assertEqual(self.get_ids(self.search('djan')), [])
+
+    def test_operators_are_matched_as_text(self):
+        resume = self.create_resume()
+
+        for query in ('python OR', 'skills:python', 'NEAR(python sql)', '"python', 'python -sql', 'python^'):
+            with self.subTest(query=query):
+                body = self.search(query)
+
+                self.assertIn(self.get_ids(body), ([], [str(resume.pk)]))
+
+        self.assertEqual(self.get_ids(self.search('skills:python')), [])
+        self.assertEqual(self.get_ids(self.search('"python')), [str(resume.pk)])
+
+        for query in ('', '"*"', '()'):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('search_resumes'), {'q': query})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('q', response.json()['errors'])
+
+    def test_pages_follow_the_score_cursor(self):
+        resumes = [self.create_resume(candidate=self.create_candidate(name)) for name in ('Ana', 'Bia', 'Carla', 'Daniela', 'Eva')]
+        params = {'page_size': 2}
+        pages = []
+
+        while True:
+            body = self.search('python', **params)
+            self.assertEqual(body['count'], len(resumes))
+            pages.append(body)
+
+            if body['next'] is None:
+                break
+
+            params['cursor'] = body['next']
+
+        ids = [resume_id for page in pages for resume_id in self.get_ids(page)]
+
+        self.assertEqual(len(pages), 3)
+        self.assertCountEqual(ids, [str(resume.pk) for resume in resumes])
+        self.assertIsNone(pages[0]['previous'])
+
+        # Going back from the last page gives the page before it
+        previous = self.search('python', page_size=2, cursor=pages[-1]['previous'])
+        self.assertEqual(self.get_ids(previous), self.get_ids(pages[-2]))
+
+        response = self.client.get(reverse('search_resumes'), {'q': 'python', 'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_lookup_rename_is_reindexed(self):
+        resume = self.create_resume()
+        self.assertEqual(self.get_ids(self.search('acme')), [str(resume.pk)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.company.name = 'Globex'
+            self.company.save()
+
+        self.assertEqual(self.get_ids(self.search('acme')), [])
+        self.assertEqual(self.get_ids(self.search('globex')), [str(resume.pk)])
+
+class ResumeStatusTransitionTests(ResumeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.approved = StatusResume.objects.create(name='Aprovado')
+        self.resumes = [self.create_resume(candidate=self.create_candidate(name)) for name in ('Ana', 'Bia', 'Carla')]
+
+    def transition(self, payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('transition_resume_status'), {'status': str(self.approved.pk), **payload}, format='json')
+
+    def assertCountersMatch(self):
+        for status in (self.status, self.approved):
+            self.assertEqual(Counter.objects.total(Resume, status_id=status.pk), Resume.objects.filter(status=status).count())
+
+        self.assertEqual(Counter.objects.total(Resume), Resume.objects.count())
+
+    def test_transition_by_ids(self):
+        moved = self.resumes[:2]
+
+        response = self.transition({'ids': [str(resume.pk) for resume in moved]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 2)
+        self.assertEqual(set(Resume.objects.filter(status=self.approved)), set(moved))
+        self.assertCountersMatch()
+
+        # Resumes already in the status are not counted again
+        self.assertEqual(self.transition({'ids': [str(resume.pk) for resume in self.resumes]}).json()['count'], 1)
+        self.assertCountersMatch()
+
+    def test_transition_by_filter(self):
+        other = Skill.objects.create(name='Java')
+        self.resumes[0].skills.add(other)
+
+        response = self.transition({'filter': {'skills': str(other.pk)}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(list(Resume.objects.filter(status=self.approved)), [self.resumes[0]])
+        self.assertCountersMatch()
+
+    def test_invalid_requests_move_nothing(self):
+        payloads = [
+            ({'filter': {'skill': str(self.skills[0].pk)}}, 'filter'),
+            ({'filter': {'created_at__gte': 'yesterday'}}, 'filter'),
+            ({}, 'non_field_errors'),
+            ({'ids': [str(self.resumes[0].pk)], 'filter': {'status': str(self.status.pk)}}, 'non_field_errors'),
+        ]
+
+        for payload, field in payloads:
+            with self.subTest(payload=payload):
+                response = self.transition(payload)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json()['errors'])
+                self.assertFalse(Resume.objects.filter(status=self.approved).exists())
+
+    def test_documents_and_cached_reads_follow_the_transition(self):
+        resume = self.resumes[0]
+        detail = reverse('detail_resume', args=[resume.pk])
+        list_url = reverse('get_resumes')
+        self.assertEqual(self.client.get(detail).json()['data']['resume']['status'], str(self.status.pk))
+        self.client.get(list_url)
+        self.assertEqual(self.client.get(detail)['X-Cache'], 'HIT')
+
+        self.transition({'ids': [str(resume.pk)]})
+
+        response = self.client.get(detail)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['data']['resume']['status'], str(self.approved.pk))
+        self.assertEqual(ResumeDocument.objects.get(pk=resume.pk).document['status'], str(self.approved.pk))
+
+        statuses = {item['id']: item['status'] for item in self.client.get(list_url).json()['data']['resumes']}
+        self.assertEqual(statuses[str(resume.pk)], str(self.approved.pk))
+        self.assertEqual(statuses[str(self.resumes[1].pk)], str(self.status.pk))
@@ -3,7 +3,10 @@ from .views import *
 
 urlpatterns = [
     path('', GetResumes.as_view(), name='get_resumes'),
+    path('search/', SearchResumes.as_view(), name='search_resumes'),
+    path('export/', ExportResumes.as_view(), name='export_resumes'),
     path('create/', CreateResume.as_view(), name='create_resume'),
+    path('status/', TransitionResumeStatus.as_view(), name='transition_resume_status'),
     path('<uuid:pk>/detail/', DetailResume.as_view(), name='detail_resume'),
     path('<uuid:pk>/update/', UpdateResume.as_view(), name='update_resume'),
     path('<uuid:pk>/delete/', DeleteResume.as_view(), name='delete_resume'),
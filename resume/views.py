@@ -1,27 +1,202 @@
+from counter.models import Counter
+from django.db.models import OuterRef, Subquery
 from rest_framework import response, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
+from utils.cache import cached_response
+from utils.conditional import conditional_response, get_last_modified
+from utils.helpers import QuerysetHelper, RequestHelper
+from utils.pagination import KeysetPagination
+from utils.streaming import QuerysetStreamer
 from uuid import UUID
-from .models import Resume
-from .serializers import ResumeSerializer
+from .documents import get_document, get_documents
+from .filters import ResumeFilter
+from .models import Education, Experience, Resume, ResumeDocument, ResumeLanguage
+from .search import build_query, count_matches, search
+from .serializers import ResumeSerializer, ResumeStatusTransitionSerializer, ResumeValuesSerializer
+
+def get_expanded(request):
+    expand = RequestHelper.get_list_param(request.query_params, 'expand')
+
+    return ResumeSerializer.resolve_fields(expand=expand)[1]
+
+def get_resumes_version(request):
+    # Rows embedded by ?expand= can change without touching the resumes that reference them
+    expanded = [ResumeSerializer.expandable_fields[name].Meta.model.objects.all() for name in get_expanded(request)]
+    # Documents are rebuilt on child deletions and M2M changes, which leave no updated_at behind
+    last_modified = get_last_modified(
+        Resume.objects.all(), ResumeDocument.objects.all(), Education.objects.all(), Experience.objects.all(), ResumeLanguage.objects.all(), *expanded
+    )
+
+    return last_modified, Counter.objects.total(Resume)
+
+def get_resume_version(request, pk):
+    children = {
+        f'{model._meta.db_table}_updated_at': Subquery(model.objects.filter(resume=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1])
+        for model in (Education, Experience, ResumeLanguage)
+    }
+    expanded = [f'{name}__updated_at' for name in get_expanded(request)]
+    # The document is rebuilt on child deletions and M2M changes, which leave no updated_at behind
+    row = Resume.objects.filter(pk=pk).annotate(**children).values_list('updated_at', 'document__updated_at', *children, *expanded).first()
+
+    if row is None:
+        return None
+
+    return max(value for value in row if value is not None), ''
 
 # Create your views here.
 class GetResumes(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request: ['resume', 'resume:list'])
+    @conditional_response(get_resumes_version)
     def get(self, request):
         try:
-            resumes = Resume.objects.all()
-            serializer = ResumeSerializer(resumes, many=True)
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+            paginator = KeysetPagination(ordering=['-created_at', 'id'])
+            filtered = QuerysetHelper.apply_filters(Resume.objects.all(), ResumeFilter, request.query_params)
+
+            if fields is None and expand is None:
+                # The full representation is built from values() rows, skipping ModelSerializer instantiation
+                resumes = ResumeValuesSerializer.get_queryset(filtered)
+                page = paginator.paginate_queryset(resumes, request)
+                serializer = ResumeValuesSerializer(page)
+            else:
+                resumes = ResumeSerializer.setup_eager_loading(filtered, fields=fields, expand=expand)
+                page = paginator.paginate_queryset(resumes, request)
+                serializer = ResumeSerializer(page, many=True, fields=fields, expand=expand)
+
+            # The maintained counter only knows the total
+            if QuerysetHelper.has_filters(ResumeFilter, request.query_params):
+                count = filtered.count()
+            else:
+                count = Counter.objects.total(Resume)
+
             data = {
                 'status': 'success',
-                'count': resumes.count(),
+                'count': count,
+                'next': paginator.next_cursor,
+                'previous': paginator.previous_cursor,
                 'data': {
                     'resumes': serializer.data
                 }
             }
 
             return response.Response(data=data, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+class SearchResumes(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @cached_response(lambda request: ['resume', 'resume:list'])
+    def get(self, request):
+        try:
+            query = build_query(request.query_params.get('q'))
+
+            if not query:
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'q': [
+                            'This field is required.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            def fetch(position, reverse, limit):
+                if position is not None:
+                    try:
+                        position = [float(position[0]), UUID(str(position[1]))]
+                    except (TypeError, ValueError):
+                        raise ValidationError({'cursor': ['Invalid cursor.']})
+
+                return [{'score': score, 'id': resume_id} for resume_id, score in search(query, limit, after=position, reverse=reverse)]
+
+            # Best bm25 score first; the resume id breaks ties so the cursor position is unique
+            paginator = KeysetPagination(ordering=['score', 'id'])
+            page = paginator.paginate(fetch, request)
+            documents = get_documents([row['id'] for row in page])
+
+            data = {
+                'status': 'success',
+                'count': count_matches(query),
+                'next': paginator.next_cursor,
+                'previous': paginator.previous_cursor,
+                'data': {
+                    'resumes': [documents[row['id']] for row in page if row['id'] in documents]
+                }
+            }
+
+            return response.Response(data=data, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+class ExportResumes(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            output = request.query_params.get('output', 'json')
+
+            if output not in QuerysetStreamer.content_types:
+                data = {
+                    'status': 'error',
+                    'errors': {
+                        'output': [
+                            'Output must be one of: json, ndjson.'
+                        ]
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+            filtered = QuerysetHelper.apply_filters(Resume.objects.order_by('-created_at', 'id'), ResumeFilter, request.query_params)
+            resumes = ResumeSerializer.setup_eager_loading(filtered, fields=fields, expand=expand)
+            streamer = QuerysetStreamer(resumes, ResumeSerializer, fields=fields, expand=expand)
+
+            return streamer.response(output, filename='resumes')
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             data = {
                 'status': 'error',
@@ -73,14 +248,25 @@ class CreateResume(APIView):
 class DetailResume(APIView):
     permission_classes = [IsAuthenticated]
 
+    @cached_response(lambda request, pk: ['resume', f'resume:{pk}'])
+    @conditional_response(get_resume_version)
     def get(self, request, pk):
         try:
-            resume = Resume.objects.get(pk=pk)
-            serializer = ResumeSerializer(resume)
+            fields = RequestHelper.get_list_param(request.query_params, 'fields')
+            expand = RequestHelper.get_list_param(request.query_params, 'expand')
+
+            if expand is None:
+                # Served from the materialized document, a single primary key read
+                document = get_document(pk)
+                resume_data = {name: value for name, value in document.items() if fields is None or name in fields}
+            else:
+                resume = ResumeSerializer.setup_eager_loading(Resume.objects.all(), fields=fields, expand=expand).get(pk=pk)
+                resume_data = ResumeSerializer(resume, fields=fields, expand=expand).data
+
             data = {
                 'status': 'success',
                 'data': {
-                    'resume': serializer.data
+                    'resume': resume_data
                 }
             }
 
@@ -124,6 +310,13 @@ class UpdateResume(APIView):
                 'errors': formatted_errors
             }
 
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
             return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Resume.DoesNotExist:
             data = {
@@ -161,6 +354,13 @@ class UpdateResume(APIView):
                 'errors': formatted_errors
             }
 
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except ValidationError as e:
+            data = {
+                'status': 'error',
+                'errors': e.detail
+            }
+
             return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
         except Resume.DoesNotExist:
             data = {
@@ -181,6 +381,41 @@ class UpdateResume(APIView):
 
             return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class TransitionResumeStatus(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ResumeStatusTransitionSerializer(data=request.data)
+
+        try:
+            if serializer.is_valid():
+                count = serializer.save()
+                data = {
+                    'status': 'success',
+                    'count': count,
+                    'data': {
+                        'status': str(serializer.validated_data['status'].pk)
+                    }
+                }
+
+                return response.Response(data=data, status=status.HTTP_200_OK)
+
+            data = {
+                'status': 'error',
+                'errors': serializer.errors
+            }
+
+            return response.Response(data=data, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            data = {
+                'status': 'error',
+                'errors': [
+                    str(e)
+                ]
+            }
+
+            return response.Response(data=data, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
 class DeleteResume(APIView):
     permission_classes = [IsAuthenticated]
 
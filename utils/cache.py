@@ -0,0 +1,137 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from functools import wraps
+from rest_framework import response, status
+import hashlib
+import time
+
+class ResponseCache:
+    """
+    Cache of view payloads keyed on path, normalized query params and permission scope.
+
+    Every key embeds the current version of its namespaces (e.g. 'resume' and 'resume:<pk>'); bumping a namespace makes the old entries
+    unreachable, so invalidation never has to enumerate keys.
+    """
+    prefix = 'response_cache'
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+
+    def get_versions(self, namespaces):
+        keys = [f'{self.prefix}:version:{namespace}' for namespace in namespaces]
+        versions = self.cache.get_many(keys)
+
+        for key in keys:
+            if key not in versions:
+                # A fresh, never reused starting point, in case the old version was evicted while entries survived
+                self.cache.add(key, time.time_ns(), timeout=None)
+                versions[key] = self.cache.get(key)
+
+        return [versions[key] for key in keys]
+
+    def bump(self, *namespaces):
+        for namespace in namespaces:
+            key = f'{self.prefix}:version:{namespace}'
+
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, time.time_ns(), timeout=None)
+
+    def bump_on_commit(self, *namespaces):
+        # Bumping before commit would let a concurrent read cache the old rows under the new version
+        transaction.on_commit(lambda: self.bump(*namespaces))
+
+    def make_key(self, request, namespaces):
+        query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.lists()))
+        versions = self.get_versions(namespaces)
+        payload = '|'.join([request.path, query, get_permission_scope(request), *map(str, versions)])
+
+        return f'{self.prefix}:{hashlib.sha256(payload.encode()).hexdigest()}'
+
+    def record(self, outcome):
+        key = f'{self.prefix}:{outcome}'
+
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.add(key, 1, timeout=None)
+
+    def stats(self):
+        values = self.cache.get_many([f'{self.prefix}:hits', f'{self.prefix}:misses'])
+
+        return {
+            'hits': values.get(f'{self.prefix}:hits', 0),
+            'misses': values.get(f'{self.prefix}:misses', 0),
+            'ttl': self.timeout,
+        }
+
+response_cache = ResponseCache()
+
+def get_permission_scope(request):
+    user = request.user
+
+    if user.is_superuser:
+        return 'superuser'
+
+    if user.is_staff:
+        return 'staff'
+
+    return 'authenticated' if user.is_authenticated else 'anonymous'
+
+def cached_response(namespaces_func):
+    """
+    Serve a successful view payload from the response cache; `namespaces_func(request, *args, **kwargs)` lists the namespaces it depends on.
+
+    The ETag/Last-Modified validators are cached with the payload, so conditional requests are answered from the cache as well.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_cache.make_key(request, namespaces_func(request, *args, **kwargs))
+            entry = response_cache.cache.get(key)
+
+            if entry is not None:
+                response_cache.record('hits')
+                validators = entry['headers']
+                last_modified = validators.get('Last-Modified')
+                result = get_conditional_response(
+                    request,
+                    etag=validators.get('ETag'),
+                    last_modified=parse_http_date_safe(last_modified) if last_modified else None
+                )
+
+                if result is None:
+                    result = response.Response(data=entry['data'], status=status.HTTP_200_OK)
+
+                for header, value in validators.items():
+                    result[header] = value
+
+                result['X-Cache'] = 'HIT'
+
+                return result
+
+            response_cache.record('misses')
+            result = method(self, request, *args, **kwargs)
+
+            if result.status_code == status.HTTP_200_OK and isinstance(result, response.Response):
+                entry = {
+                    'data': result.data,
+                    'headers': {header: result[header] for header in ('ETag', 'Last-Modified') if result.has_header(header)},
+                }
+                response_cache.cache.set(key, entry, response_cache.timeout)
+                result['X-Cache'] = 'MISS'
+
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,50 @@
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from functools import wraps
+import hashlib
+
+def conditional_response(version_func):
+    """
+    Answer If-None-Match/If-Modified-Since with a 304 before the view serializes anything.
+
+    `version_func(request, *args, **kwargs)` returns `(last_modified, token)` or None when the resource does not exist; the strong ETag covers
+    the path, the query string (fields, expand, cursor...), the last modification and the token.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            version = version_func(request, *args, **kwargs)
+
+            if version is None or version[0] is None:
+                return method(self, request, *args, **kwargs)
+
+            last_modified, token = version
+            query = '&'.join(f'{key}={value}' for key, value in sorted(request.query_params.items()))
+            payload = '|'.join([request.path, query, last_modified.isoformat(), str(token)])
+            etag = quote_etag(hashlib.sha256(payload.encode()).hexdigest()[:40])
+            timestamp = int(last_modified.timestamp())
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+            if response is None:
+                response = method(self, request, *args, **kwargs)
+
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(timestamp))
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+def get_last_modified(*querysets):
+    """
+    Return the latest updated_at across the given querysets, one indexed MAX() per queryset.
+    """
+    values = [queryset.aggregate(last_modified=Max('updated_at'))['last_modified'] for queryset in querysets]
+    values = [value for value in values if value is not None]
+
+    return max(values) if values else None
@@ -0,0 +1,37 @@
+from django.db import models
+from .text import normalize_text
+
+class NormalizedCharField(models.CharField):
+    """
+    Shadow column holding the normalized value of another field of the model, recomputed on every save.
+
+    Indexed, it turns accent- and case-insensitive prefix searches into index range seeks (see QuerysetHelper.apply_search). The value is
+    written in pre_save, which save() and bulk_create() call; writes that skip it (queryset.update(), bulk_update()) must recompute it.
+    """
+    def __init__(self, *args, source=None, normalizer=normalize_text, **kwargs):
+        self.source = source
+        self.normalizer = normalizer
+        kwargs.setdefault('max_length', 255)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+
+        if self.normalizer is not normalize_text:
+            kwargs['normalizer'] = self.normalizer
+
+        for key, default in (('blank', True), ('default', ''), ('editable', False)):
+            if kwargs.get(key, not default) == default:
+                kwargs.pop(key, None)
+
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = self.normalizer(getattr(model_instance, self.source))
+        setattr(model_instance, self.attname, value)
+
+        return value
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections, transaction
+from django.utils import timezone
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class FileCleaner:
+    """
+    Delete stored files on a background thread once the transaction that orphaned them has committed.
+
+    A rolled-back transaction never schedules anything, and a file still referenced by a row when the cleaner gets to it is kept. Files
+    modified during the last `grace` seconds are kept too: a deduplicating storage touches a file when a new upload reuses it, before the
+    row referencing it is committed. Anything skipped is left to the orphaned media collector.
+    """
+    def __init__(self, max_workers=1, grace=600):
+        self.max_workers = max_workers
+        self.grace = grace
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='file-cleaner')
+
+            return self.executor
+
+    def delete_on_commit(self, model, field_name, name, companions=()):
+        """
+        Schedule `name` for deletion, along with `companions` (files derived from it, such as thumbnails) when it goes.
+        """
+        storage = model._meta.get_field(field_name).storage
+
+        transaction.on_commit(lambda: self.get_executor().submit(self.delete, model, field_name, name, storage, companions))
+
+    def is_recent(self, storage, name):
+        try:
+            modified = storage.get_modified_time(name)
+        except (NotImplementedError, OSError):
+            return False
+
+        return (timezone.now() - modified).total_seconds() < self.grace
+
+    def delete(self, model, field_name, name, storage, companions=()):
+        try:
+            if model._default_manager.filter(**{field_name: name}).exists() or self.is_recent(storage, name):
+                return False
+
+            storage.delete(name)
+
+            for companion in companions:
+                storage.delete(companion)
+
+            return True
+        except Exception:
+            logger.exception('Could not delete %s', name)
+
+            return False
+        finally:
+            # Worker threads get their own connections, which Django only closes for request threads
+            connections.close_all()
+
+file_cleaner = FileCleaner()
@@ -1,21 +1,94 @@
 from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from .fields import NormalizedCharField
 
 class QuerysetHelper:
     @staticmethod
     def apply_filters(queryset, filterset_class, params):
         if filterset_class:
             filterset = filterset_class(params, queryset=queryset)
-            if filterset.is_valid():
-                return filterset.qs
+            if not filterset.is_valid():
+                # Ignoring an invalid filter would answer with unfiltered rows
+                raise ValidationError(filterset.errors)
+            return filterset.qs
         return queryset
 
     @staticmethod
-    def apply_search(queryset, search_query, fields):
-        if search_query:
+    def has_filters(filterset_class, params):
+        return any(params.get(name) not in (None, '') for name in filterset_class.base_filters)
+
+    @staticmethod
+    def get_normalized_field(model, path):
+        """
+        Return the NormalizedCharField that shadows the field at the end of `path` (e.g. 'contacts__email'), or None.
+        """
+        *relations, name = path.split('__')
+
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+
+        return next((field for field in model._meta.concrete_fields if isinstance(field, NormalizedCharField) and field.source == name), None)
+
+    @staticmethod
+    def apply_search(queryset, search_query, fields, tokens=None, phrase=False):
+        """
+        Keep the rows where every word of `search_query` matches at least one of `fields`; with `phrase`, the whole query is matched as a
+        single term instead (e.g. "sao pa" against a lookup name).
+
+        Fields with a NormalizedCharField shadow match words as accent- and case-insensitive prefixes of the normalized value, through a range
+        that seeks its index; other fields fall back to icontains. Matches through relations are `pk IN (subquery)`, so rows are never
+        duplicated and no DISTINCT is needed.
+
+        `tokens` is an optional model of word starts (a foreign key to the searched model, `field` and `token`, kept up to date by its owner,
+        e.g. candidate.search): shadowed fields are then matched at the start of any word, with the same range seek on the token index.
+        """
+        if not search_query:
+            return queryset
+
+        model = queryset.model
+
+        if tokens is not None:
+            owner = next(field.name for field in tokens._meta.concrete_fields if field.is_relation and field.related_model is model)
+
+        for word in [search_query] if phrase else search_query.split():
             queries = Q()
-            for field in fields:
-                queries |= Q(**{f"{field}__icontains": search_query})
-            queryset = queryset.filter(queries).distinct()
+            token_paths = {}
+
+            for path in fields:
+                shadow = QuerysetHelper.get_normalized_field(model, path)
+
+                if shadow is None:
+                    condition = Q(**{f'{path}__icontains': word})
+                else:
+                    value = shadow.normalizer(word)
+
+                    # A word without anything the shadow keeps (e.g. letters for a phone number) cannot match it
+                    if not value:
+                        continue
+
+                    if tokens is not None:
+                        # Fields sharing a normalizer are matched with a single seek
+                        token_paths.setdefault(value, []).append(path)
+                        continue
+
+                    lookup = '__'.join([*path.split('__')[:-1], shadow.name])
+                    # Every string starting with `value` sorts between it and `value` followed by the highest code point
+                    condition = Q(**{f'{lookup}__gte': value, f'{lookup}__lt': value + '\U0010ffff'})
+
+                if '__' in path:
+                    condition = Q(pk__in=model.objects.filter(condition).values('pk'))
+
+                queries |= condition
+
+            for value, paths in token_paths.items():
+                rows = tokens.objects.filter(field__in=paths, token__gte=value, token__lt=value + '\U0010ffff')
+                queries |= Q(pk__in=rows.values(owner))
+
+            if not queries:
+                return queryset.none()
+
+            queryset = queryset.filter(queries)
+
         return queryset
 
     @staticmethod
@@ -24,3 +97,119 @@ class QuerysetHelper:
             return queryset.order_by(ordering)
         return queryset
 
+
+
+class RequestHelper:
+    @staticmethod
+    def get_list_param(params, name):
+        value = params.get(name)
+
+        if value is None:
+            return None
+
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+class BulkHelper:
+    @staticmethod
+    def create_children(model, parent_field, parent, items):
+        """
+        Insert every item of a nested collection with a single multi-row INSERT; returns the created instances.
+        """
+        if not items:
+            return []
+
+        return model.objects.bulk_create([model(**{parent_field: parent}, **item) for item in items])
+
+    @staticmethod
+    def add_many_to_many(instance, name, targets):
+        """
+        Link `targets` to a freshly created `instance` with a single INSERT into the through table.
+
+        Unlike add()/set() this neither reads the existing rows nor sends m2m_changed, so it is only meant for instances created in the same
+        transaction, whose post_save receivers already cover the new rows.
+        """
+        field = instance._meta.get_field(name)
+        through = field.remote_field.through
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        target_ids = dict.fromkeys(getattr(item, 'pk', item) for item in targets)
+
+        if not target_ids:
+            return []
+
+        return through.objects.bulk_create([through(**{f'{source}_id': instance.pk, f'{target}_id': target_id}) for target_id in target_ids])
+
+    @staticmethod
+    def reconcile_children(model, parent_field, parent, items, name):
+        """
+        Make the children of `parent` match `items` in a fixed number of queries, whatever the size of the collection.
+
+        Items with an id update that child, items without one are created and children missing from `items` are deleted: one SELECT, then at
+        most one UPDATE, one INSERT and one DELETE. Only the columns that actually changed are written. Raises a ValidationError keyed on
+        `name` when an id is repeated or does not belong to `parent`.
+        """
+        existing = model.objects.filter(**{parent_field: parent}).in_bulk()
+        errors = {}
+        seen = set()
+        to_create = []
+        to_update = []
+        update_fields = set()
+
+        for index, item in enumerate(items):
+            item = dict(item)
+            pk = item.pop('id', None)
+
+            if pk is None:
+                to_create.append(model(**{parent_field: parent}, **item))
+                continue
+
+            if pk in seen:
+                errors[index] = {'id': [f'Duplicated id "{pk}".']}
+                continue
+
+            seen.add(pk)
+            child = existing.get(pk)
+
+            if child is None:
+                errors[index] = {'id': [f'Invalid id "{pk}" - object does not exist or does not belong to this record.']}
+                continue
+
+            changed = []
+
+            for key, value in item.items():
+                field = model._meta.get_field(key)
+
+                if field.is_relation:
+                    current, new = getattr(child, field.attname), getattr(value, 'pk', value)
+                else:
+                    current, new = getattr(child, key), value
+
+                if current != new:
+                    setattr(child, key, value)
+                    changed.append(key)
+
+            if changed:
+                to_update.append(child)
+                update_fields.update(changed)
+
+        if errors:
+            raise ValidationError({name: [errors.get(index, {}) for index in range(len(items))]})
+
+        if to_update:
+            # bulk_update skips Field.pre_save, so auto_now columns and the normalized copies of changed fields are computed here
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False) or (isinstance(field, NormalizedCharField) and field.source in update_fields):
+                    for child in to_update:
+                        field.pre_save(child, add=False)
+
+                    update_fields.add(field.name)
+
+            model.objects.bulk_update(to_update, sorted(update_fields))
+
+        if to_create:
+            model.objects.bulk_create(to_create)
+
+        removed = existing.keys() - seen
+
+        if removed:
+            model.objects.filter(pk__in=removed).delete()
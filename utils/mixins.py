@@ -0,0 +1,99 @@
+class EagerLoadingMixin:
+    select_related_fields = {}
+    prefetch_related_fields = {}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Apply the select_related/prefetch_related plan declared by the serializer, keyed by the serializer field that needs it.
+        """
+        select_related = list(cls.select_related_fields.values())
+        prefetch_related = list(cls.prefetch_related_fields.values())
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
+class DynamicFieldsMixin(EagerLoadingMixin):
+    """
+    Accept `fields` and `expand` to render a subset of the serializer fields.
+
+    `fields` keeps only the listed fields; `expand` renders the foreign keys declared in `expandable_fields` as nested objects instead of primary keys.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+
+        super().__init__(*args, **kwargs)
+
+        requested, expanded = self.resolve_fields(fields, expand)
+
+        for name in list(self.fields):
+            if name not in requested:
+                self.fields.pop(name)
+
+        for name in expanded:
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+
+    @classmethod
+    def resolve_fields(cls, fields=None, expand=None):
+        expanded = [name for name in expand or [] if name in cls.expandable_fields]
+        requested = [name for name in cls.Meta.fields if fields is None or name in fields or name in expanded]
+
+        return requested, expanded
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, fields=None, expand=None):
+        """
+        Apply only the part of the eager-loading plan the requested fields need, and defer the columns nobody asked for.
+        """
+        requested, expanded = cls.resolve_fields(fields, expand)
+        select_related = [cls.select_related_fields[name] for name in requested if name in cls.select_related_fields] + expanded
+        prefetch_related = [cls.prefetch_related_fields[name] for name in requested if name in cls.prefetch_related_fields]
+        deferred = cls.get_deferred_fields(queryset.model, requested)
+
+        for name in expanded:
+            related_model = queryset.model._meta.get_field(name).related_model
+            related_fields = cls.expandable_fields[name].Meta.fields
+            deferred += [
+                f'{name}__{field.name}' for field in related_model._meta.concrete_fields
+                if not field.primary_key and field.name not in related_fields
+            ]
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        if deferred:
+            queryset = queryset.defer(*deferred)
+
+        return queryset
+
+    @classmethod
+    def get_deferred_fields(cls, model, requested):
+        sources = set()
+
+        for name in requested:
+            declared = cls._declared_fields.get(name)
+            source = getattr(declared, 'source', None) or name
+
+            if source == '*':
+                return []
+
+            sources.add(source.split('.')[0])
+
+        # Columns of the default ordering stay loaded so cursors can be built without extra queries
+        sources.update(field.lstrip('-') for field in model._meta.ordering)
+
+        return [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in sources
+        ]
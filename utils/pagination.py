@@ -0,0 +1,136 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+import base64
+import binascii
+import json
+
+class KeysetPagination:
+    """
+    Opaque-cursor pagination over a fixed, unique ordering (seek method).
+
+    Every page is fetched with a WHERE clause on the ordering columns instead of an OFFSET, so the cost of a page does not depend on how deep it is.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, ordering, page_size=None, max_page_size=None):
+        self.ordering = ordering
+        self.page_size = page_size or getattr(settings, 'PAGE_SIZE', 50)
+        self.max_page_size = max_page_size or getattr(settings, 'MAX_PAGE_SIZE', 500)
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def paginate_queryset(self, queryset, request):
+        def fetch(position, reverse, limit):
+            ordering = [self.invert(field) for field in self.ordering] if reverse else self.ordering
+            rows = queryset.order_by(*ordering)
+
+            if position is not None:
+                rows = rows.filter(self.build_seek_filter(queryset.model, ordering, position))
+
+            return list(rows[:limit])
+
+        return self.paginate(fetch, request)
+
+    def paginate(self, fetch, request):
+        """
+        Paginate any source that can seek: `fetch(position, reverse, limit)` returns up to `limit` rows after the decoded cursor position
+        (before it, nearest first, when `reverse`), as objects or dicts exposing the ordering fields.
+        """
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        rows = fetch(position, reverse, page_size + 1)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        if reverse:
+            rows.reverse()
+
+        has_next = position is not None if reverse else has_more
+        has_previous = has_more if reverse else position is not None
+
+        self.next_cursor = self.encode_cursor(rows[-1], reverse=False) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], reverse=True) if rows and has_previous else None
+
+        return rows
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+
+        if page_size is None:
+            return self.page_size
+
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: ['A valid integer is required.']})
+
+        if page_size < 1:
+            raise ValidationError({self.page_size_query_param: ['Ensure this value is greater than or equal to 1.']})
+
+        return min(page_size, self.max_page_size)
+
+    def build_seek_filter(self, model, ordering, position):
+        """
+        Expand (a, b, c) > (x, y, z) into the equivalent OR of prefixes, honouring the direction of each column.
+
+        The bound on the leading column is repeated as a plain range so SQLite can seek on the ordering index.
+        """
+        fields = [field.lstrip('-') for field in ordering]
+
+        try:
+            values = [model._meta.get_field(field).to_python(value) for field, value in zip(fields, position)]
+        except DjangoValidationError:
+            raise ValidationError({self.cursor_query_param: ['Invalid cursor.']})
+
+        lookups = ['lt' if field.startswith('-') else 'gt' for field in ordering]
+
+        seek = Q()
+        for index, (field, lookup) in enumerate(zip(fields, lookups)):
+            condition = Q(**{f'{field}__{lookup}': values[index]})
+
+            for previous_field, previous_value in zip(fields[:index], values[:index]):
+                condition &= Q(**{previous_field: previous_value})
+
+            seek |= condition
+
+        leading_lookup = 'lte' if lookups[0] == 'lt' else 'gte'
+
+        return Q(**{f'{fields[0]}__{leading_lookup}': values[0]}) & seek
+
+    def encode_cursor(self, row, reverse):
+        position = []
+
+        for field in self.ordering:
+            name = field.lstrip('-')
+            value = row[name] if isinstance(row, dict) else getattr(row, name)
+            position.append(value if isinstance(value, (str, int, float, bool)) or value is None else str(value))
+
+        payload = json.dumps({'p': position, 'r': reverse}, separators=(',', ':'))
+
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        if not cursor:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            position = payload['p']
+            reverse = bool(payload['r'])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise ValidationError({self.cursor_query_param: ['Invalid cursor.']})
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: ['Invalid cursor.']})
+
+        return position, reverse
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
@@ -0,0 +1,98 @@
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from urllib.parse import quote
+import re
+
+range_pattern = re.compile(r'^bytes=(?P<start>\d*)-(?P<end>\d*)$')
+
+def parse_range(header, size):
+    """
+    Return the (start, end) inclusive byte range asked for by a single-range Range header, None to send the whole file, or False when the
+    range cannot be satisfied.
+    """
+    match = range_pattern.match(header.strip()) if header else None
+
+    # Missing, malformed or multi-range headers get the whole file, as RFC 9110 allows
+    if match is None or not (match['start'] or match['end']):
+        return None
+
+    if not match['start']:
+        length = int(match['end'])
+
+        return (max(size - length, 0), size - 1) if length and size else False
+
+    start = int(match['start'])
+    end = min(int(match['end']), size - 1) if match['end'] else size - 1
+
+    if start >= size or start > end:
+        return False
+
+    return start, end
+
+def iter_range(file, start, end, chunk_size=64 * 1024):
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            yield chunk
+
+def send_file(request, storage, name, content_type, etag=None, cache_control=None):
+    """
+    Respond with a stored file once the view has authorized the request.
+
+    With SENDFILE_BACKEND set, the body is left to the web server in front of Django: 'x-accel-redirect' (nginx) points at the internal
+    SENDFILE_URL location, 'x-sendfile' (Apache, lighttpd) at the file path; the server then handles Range requests itself. Without it, the
+    file is streamed by Django, which honors a single byte range and If-Range.
+    """
+    headers = {'Accept-Ranges': 'bytes'}
+
+    if etag:
+        headers['ETag'] = etag
+
+    if cache_control:
+        headers['Cache-Control'] = cache_control
+
+    response = get_conditional_response(request, etag=etag)
+
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+
+        return response
+
+    backend = settings.SENDFILE_BACKEND
+
+    if backend == 'x-accel-redirect':
+        headers['X-Accel-Redirect'] = settings.SENDFILE_URL + quote(name)
+    elif backend == 'x-sendfile':
+        headers['X-Sendfile'] = storage.path(name)
+
+    if backend:
+        # nginx keeps Content-Type, Cache-Control and ETag from this response
+        return HttpResponse(content_type=content_type, headers=headers)
+
+    size = storage.size(name)
+    if_range = request.headers.get('If-Range')
+    byte_range = parse_range(request.headers.get('Range'), size) if not if_range or if_range == etag else None
+
+    if byte_range is False:
+        headers['Content-Range'] = f'bytes */{size}'
+
+        return HttpResponse(status=416, headers=headers)
+
+    if byte_range is None:
+        return FileResponse(storage.open(name), content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    headers['Content-Length'] = str(end - start + 1)
+
+    return StreamingHttpResponse(iter_range(storage.open(name), start, end), status=206, content_type=content_type, headers=headers)
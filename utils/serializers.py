@@ -0,0 +1,136 @@
+from django.db import models
+from rest_framework import serializers
+from collections import defaultdict
+import uuid
+
+class ValuesSerializer:
+    """
+    Read-only serializer that builds the same output as a ModelSerializer from values() rows.
+
+    Columns are read with values(), many-to-many fields become lists of primary keys and `children` (reverse foreign keys) are fetched once per page and grouped by parent.
+    Dates and datetimes go through the DRF fields, so the DATE_FORMAT/DATETIME_FORMAT settings and the active timezone apply exactly as in the ModelSerializer.
+    `computed` maps an output field to `(column, function)`, for values derived from a single column.
+    """
+    model = None
+    fields = []
+    parent_field = None
+    children = {}
+    computed = {}
+
+    datetime_field = serializers.DateTimeField()
+    date_field = serializers.DateField()
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def get_columns(cls):
+        columns = [cls.model._meta.pk.name]
+
+        for name in cls.fields:
+            if name in cls.computed:
+                name = cls.computed[name][0]
+
+            if name in cls.children or name in columns:
+                continue
+
+            if not cls.model._meta.get_field(name).many_to_many:
+                columns.append(name)
+
+        return columns
+
+    @classmethod
+    def get_queryset(cls, queryset):
+        return queryset.values(*cls.get_columns())
+
+    @classmethod
+    def get_formatter(cls, field):
+        if isinstance(field, models.DateTimeField):
+            return cls.datetime_field.to_representation
+
+        if isinstance(field, models.DateField):
+            return cls.date_field.to_representation
+
+        return cls.format_value
+
+    @staticmethod
+    def format_value(value):
+        if isinstance(value, uuid.UUID):
+            return str(value)
+
+        return value
+
+    @classmethod
+    def get_formatters(cls):
+        return {
+            name: cls.get_formatter(cls.model._meta.get_field(name))
+            for name in cls.get_columns()
+        }
+
+    @classmethod
+    def get_many_to_many(cls, name, ids):
+        field = cls.model._meta.get_field(name)
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        ordering = [
+            f'-{target}__{column[1:]}' if column.startswith('-') else f'{target}__{column}'
+            for column in field.related_model._meta.ordering
+        ]
+        rows = field.remote_field.through.objects.filter(**{f'{source}__in': ids}).order_by(*ordering).values_list(f'{source}_id', f'{target}_id')
+        grouped = defaultdict(list)
+
+        for parent_id, target_id in rows:
+            grouped[parent_id].append(cls.format_value(target_id))
+
+        return grouped
+
+    @classmethod
+    def get_children(cls, ids):
+        rows = cls.model.objects.filter(**{f'{cls.parent_field}__in': ids}).values(cls.parent_field, *cls.get_columns())
+        grouped = defaultdict(list)
+
+        for item in cls(rows).data:
+            grouped[item.pop(cls.parent_field)].append(item)
+
+        return grouped
+
+    def serialize(self, rows):
+        rows = list(rows)
+        pk = self.model._meta.pk.name
+        ids = [row[pk] for row in rows]
+        formatters = self.get_formatters()
+        related = {}
+
+        for name in self.fields:
+            if name in self.computed:
+                continue
+
+            if name in self.children:
+                related[name] = self.children[name].get_children(ids) if ids else {}
+            elif name not in formatters:
+                related[name] = self.get_many_to_many(name, ids) if ids else {}
+
+        data = []
+
+        for row in rows:
+            item = {}
+
+            if self.parent_field:
+                item[self.parent_field] = row[self.parent_field]
+
+            for name in self.fields:
+                if name in self.computed:
+                    column, function = self.computed[name]
+                    item[name] = function(row[column])
+                elif name in related:
+                    item[name] = related[name].get(row[pk], [])
+                else:
+                    item[name] = formatters[name](row[name])
+
+            data.append(item)
+
+        return data
+
+    @property
+    def data(self):
+        return self.serialize(self.rows)
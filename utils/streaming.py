@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from itertools import islice
+
+class QuerysetStreamer:
+    """
+    Serialize a queryset chunk by chunk and yield the encoded bytes, so memory stays bounded by the chunk size instead of the table size.
+    """
+    content_types = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson',
+    }
+
+    def __init__(self, queryset, serializer_class, chunk_size=None, **serializer_kwargs):
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.chunk_size = chunk_size or getattr(settings, 'EXPORT_CHUNK_SIZE', 500)
+        self.serializer_kwargs = serializer_kwargs
+        self.renderer = JSONRenderer()
+
+    def iter_chunks(self):
+        # iterator() with a chunk_size runs the queryset's prefetches once per chunk
+        rows = self.queryset.iterator(chunk_size=self.chunk_size)
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+
+            if not chunk:
+                break
+
+            serializer = self.serializer_class(chunk, many=True, **self.serializer_kwargs)
+
+            yield [self.renderer.render(item) for item in serializer.data]
+
+    def iter_json(self):
+        separator = b''
+
+        yield b'['
+
+        for items in self.iter_chunks():
+            yield separator + b','.join(items)
+            separator = b','
+
+        yield b']'
+
+    def iter_ndjson(self):
+        for items in self.iter_chunks():
+            yield b''.join(item + b'\n' for item in items)
+
+    def response(self, output='json', filename=None):
+        stream = self.iter_ndjson() if output == 'ndjson' else self.iter_json()
+        response = StreamingHttpResponse(stream, content_type=self.content_types[output])
+
+        if filename:
+            response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+
+        return response
@@ -0,0 +1,31 @@
+import unicodedata
+
+def normalize_text(value):
+    """
+    Fold text for matching: accents stripped, case folded and whitespace collapsed, so "  João " and "joao" compare equal.
+    """
+    if not value:
+        return ''
+
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+    return ' '.join(stripped.casefold().split())
+
+def normalize_digits(value):
+    """
+    Keep only the digits, so formatted and unformatted phone numbers or documents compare equal.
+    """
+    if not value:
+        return ''
+
+    return ''.join(char for char in str(value) if char.isdigit())
+
+def get_word_starts(value):
+    """
+    Return the tails of a normalized value that start a word, longest first: "maria.silva@gmail.com" gives "maria.silva@gmail.com",
+    "silva@gmail.com", "gmail.com" and "com", so a prefix match on any of them matches the start of a word.
+    """
+    starts = [index for index, char in enumerate(value) if char.isalnum() and (index == 0 or not value[index - 1].isalnum())]
+
+    return [value[index:] for index in starts]
@@ -0,0 +1,17 @@
+from rest_framework import response, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from .cache import response_cache
+
+class ResponseCacheStats(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        data = {
+            'status': 'success',
+            'data': {
+                'response_cache': response_cache.stats()
+            }
+        }
+
+        return response.Response(data=data, status=status.HTTP_200_OK)